@@ -206,7 +206,7 @@ CREATE INDEX IF NOT EXISTS idx_detections_camera_id ON detections(camera_id);
 
 CREATE TABLE IF NOT EXISTS animal_tracks (
     id BIGSERIAL PRIMARY KEY,
-    track_id INTEGER UNIQUE NOT NULL,
+    track_id INTEGER NOT NULL,
     animal_type TEXT NOT NULL CHECK (animal_type IN ('cow', 'buffalo', 'unknown')),
     first_seen TIMESTAMP WITH TIME ZONE,
     last_seen TIMESTAMP WITH TIME ZONE,
@@ -214,7 +214,8 @@ CREATE TABLE IF NOT EXISTS animal_tracks (
     frame_count INTEGER DEFAULT 0,
     camera_id TEXT,
     user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT animal_tracks_camera_track_key UNIQUE (camera_id, track_id, first_seen)
 );
 
 -- Indexes for animal_tracks
@@ -314,6 +315,7 @@ CREATE TABLE IF NOT EXISTS cameras (
     rtsp_url TEXT,
     location TEXT,
     is_active BOOLEAN DEFAULT TRUE,
+    roi JSONB, -- Detection polygons: [[[x, y], ...], ...], 0-1 fractions or pixels
     user_id UUID REFERENCES auth.users(id) ON DELETE CASCADE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -0,0 +1,64 @@
+"""
+Benchmark YOLOv8 per-image latency on each CPU inference backend.
+
+Usage (from python_backend/):
+    python benchmarks/benchmark_backends.py
+    python benchmarks/benchmark_backends.py --model models/cow_buffalo_detector.pt --video sample.mp4
+    python benchmarks/benchmark_backends.py --backends pytorch onnx openvino --frames 100
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.benchmark_batch_inference import load_frames  # noqa: E402
+from services.batch_inference import predict_batch  # noqa: E402
+from services.model_backends import backend_available, load_model  # noqa: E402
+
+
+def benchmark(model, frames):
+    """Per-image latencies in milliseconds (batch size 1)."""
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        predict_batch(model, [frame])
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLOv8 weights")
+    parser.add_argument("--video", default=None, help="Video to sample frames from")
+    parser.add_argument("--frames", type=int, default=50, help="Images per backend")
+    parser.add_argument("--imgsz", type=int, default=640, help="Blank frame size")
+    parser.add_argument("--backends", nargs="+", default=["pytorch", "onnx", "openvino"])
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.imgsz)
+
+    print(f"{'backend':>10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'speedup':>8}")
+    baseline = None
+    for backend in args.backends:
+        if not backend_available(backend):
+            print(f"{backend:>10}  skipped (runtime not installed)")
+            continue
+
+        model = load_model(args.model, backend)
+        predict_batch(model, frames[:1])  # warm up
+
+        latencies = benchmark(model, frames)
+        mean = latencies.mean()
+        baseline = baseline or mean
+        print(
+            f"{backend:>10} {mean:>9.1f} {np.percentile(latencies, 50):>9.1f} "
+            f"{np.percentile(latencies, 95):>9.1f} {baseline / mean:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
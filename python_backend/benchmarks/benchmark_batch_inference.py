@@ -0,0 +1,76 @@
+"""
+Benchmark YOLOv8 throughput (frames/sec) against inference batch size.
+
+Usage (from python_backend/):
+    python benchmarks/benchmark_batch_inference.py
+    python benchmarks/benchmark_batch_inference.py --video sample.mp4 --sizes 1 2 4 8 16
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.batch_inference import autotune_batch_size, predict_batch  # noqa: E402
+
+
+def load_frames(video_path, count, imgsz):
+    """Read `count` frames from a video, or make blank frames if none given."""
+    if not video_path:
+        return [np.zeros((imgsz, imgsz, 3), dtype=np.uint8) for _ in range(count)]
+
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+
+    if not frames:
+        raise SystemExit(f"No frames could be read from {video_path}")
+    return frames
+
+
+def benchmark(model, frames, batch_size):
+    """Frames/sec for running all frames through the model in batches."""
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        predict_batch(model, frames[i:i + batch_size])
+    return len(frames) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="yolov8n.pt", help="YOLOv8 weights")
+    parser.add_argument("--video", default=None, help="Video to sample frames from")
+    parser.add_argument("--frames", type=int, default=64, help="Frames per measurement")
+    parser.add_argument("--imgsz", type=int, default=640, help="Blank frame size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    model = YOLO(args.model)
+    frames = load_frames(args.video, args.frames, args.imgsz)
+
+    # Warm up
+    predict_batch(model, frames[:1])
+
+    print(f"{'batch':>6} {'frames/sec':>12} {'speedup':>8}")
+    baseline = None
+    for size in args.sizes:
+        fps = benchmark(model, frames, size)
+        baseline = baseline or fps
+        print(f"{size:>6} {fps:>12.2f} {fps / baseline:>7.2f}x")
+
+    print(f"\nAuto-tuned batch size: {autotune_batch_size(model)}")
+
+
+if __name__ == "__main__":
+    main()
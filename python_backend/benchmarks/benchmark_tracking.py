@@ -0,0 +1,71 @@
+"""
+Benchmark ByteTracker frame time against herd size, with and without the spatial grid.
+
+Simulates a herd of animals walking around a yard with noisy detections
+and times ByteTracker.update per frame.
+
+Usage (from python_backend/):
+    python benchmarks/benchmark_tracking.py
+    python benchmarks/benchmark_tracking.py --herds 50 200 800 --frames 200
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.detections import DETECTION_DTYPE, Detections  # noqa: E402
+from services.tracking_service import ByteTracker  # noqa: E402
+
+
+def simulate(herd, frames, box_size=60, spacing=90, seed=0):
+    """Per-frame detections of a herd walking with constant velocities."""
+    rng = np.random.default_rng(seed)
+    side = np.sqrt(herd) * spacing
+    positions = rng.uniform(0, side, (herd, 2))
+    velocities = rng.uniform(-1.5, 1.5, (herd, 2))
+
+    for _ in range(frames):
+        positions += velocities
+        data = np.empty(herd, dtype=DETECTION_DTYPE)
+        data["box"] = np.hstack([positions, positions + box_size]) + rng.normal(0, 1, (herd, 4))
+        data["score"] = rng.uniform(0.3, 0.95, herd)
+        data["class_id"] = 0
+        yield Detections(data)
+
+
+def benchmark(herd, frames, grid_min_pairs):
+    """Mean and p95 update time in ms, and the number of IDs handed out."""
+    tracker = ByteTracker(grid_min_pairs=grid_min_pairs)
+    times = []
+    for detections in simulate(herd, frames):
+        start = time.perf_counter()
+        tracker.update(detections)
+        times.append((time.perf_counter() - start) * 1000.0)
+
+    # Skip the first frames while tracks are being created
+    times = np.array(times[5:])
+    return times.mean(), np.percentile(times, 95), tracker.next_id - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--herds", type=int, nargs="+", default=[25, 50, 100, 200, 400, 800])
+    parser.add_argument("--frames", type=int, default=100, help="Frames per run")
+    args = parser.parse_args()
+
+    print(f"{'herd':>6} {'dense ms':>9} {'p95':>7} {'grid ms':>9} {'p95':>7} {'speedup':>8} {'ids d/g':>10}")
+    for herd in args.herds:
+        dense_mean, dense_p95, dense_ids = benchmark(herd, args.frames, grid_min_pairs=sys.maxsize)
+        grid_mean, grid_p95, grid_ids = benchmark(herd, args.frames, grid_min_pairs=0)
+        print(
+            f"{herd:>6} {dense_mean:>9.2f} {dense_p95:>7.2f} {grid_mean:>9.2f} {grid_p95:>7.2f} "
+            f"{dense_mean / grid_mean:>7.1f}x {f'{dense_ids}/{grid_ids}':>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
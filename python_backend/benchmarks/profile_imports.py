@@ -0,0 +1,67 @@
+"""
+Report where import time goes when the backend starts.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+prints the slowest modules and the cumulative time per top-level package.
+
+Usage (from python_backend/):
+    python benchmarks/profile_imports.py
+    python benchmarks/profile_imports.py --module services.detection_service --top 30
+"""
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def profile(module):
+    """List of (module name, self µs, cumulative µs) in import order."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        tail = "\n".join(completed.stderr.strip().splitlines()[-5:])
+        raise SystemExit(f"Importing {module} failed:\n{tail}")
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--top", type=int, default=20, help="Modules to list")
+    args = parser.parse_args()
+
+    rows = profile(args.module)
+    total_us = sum(self_us for _, self_us, _ in rows)
+
+    # Self time summed per top-level package
+    packages = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+
+    print(f"Importing {args.module}: {total_us / 1e6:.2f}s, {len(rows)} modules\n")
+
+    print(f"{'package':<30} {'seconds':>8} {'share':>7}")
+    for name, us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<30} {us / 1e6:>8.3f} {us / total_us:>6.1%}")
+
+    print(f"\n{'module (cumulative)':<50} {'seconds':>8}")
+    for name, _, cumulative_us in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{name:<50} {cumulative_us / 1e6:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,11 +24,71 @@ class Settings(BaseSettings):
     UDDER_MODEL: str = os.getenv("UDDER_MODEL", "udder_detector.pt")
     POSE_MODEL: str = os.getenv("POSE_MODEL", "yolov8n-pose.pt")
     LAMENESS_MODEL: str = os.getenv("LAMENESS_MODEL", "lameness_classifier.pkl")
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "pytorch")  # pytorch, onnx or openvino
+    MODEL_PRELOAD: bool = os.getenv("MODEL_PRELOAD", "False").lower() == "true"  # load at import, before fork
+    EXPORT_DIR: Path = Path(os.getenv("EXPORT_DIR", os.path.join(os.getenv("MODELS_DIR", "./models"), "exported")))
+    
+    # INT8 quantization (cow/buffalo and udder detectors)
+    INT8_ENABLED: bool = os.getenv("INT8_ENABLED", "False").lower() == "true"
+    INT8_CALIBRATION_DIR: Path = Path(os.getenv("INT8_CALIBRATION_DIR", "./data/calibration"))
+    INT8_CALIBRATION_IMAGES: int = int(os.getenv("INT8_CALIBRATION_IMAGES", "200"))
+    INT8_MIN_AGREEMENT: float = float(os.getenv("INT8_MIN_AGREEMENT", "0.9"))  # box F1 vs FP32
+    
+    # Inference
+    MODEL_INPUT_SIZE: int = int(os.getenv("MODEL_INPUT_SIZE", "640"))  # YOLO letterbox size
+    INFERENCE_BATCH_SIZE: int = int(os.getenv("INFERENCE_BATCH_SIZE", "0"))  # 0 = auto-tune
+    VIDEO_SEEK_THRESHOLD: int = int(os.getenv("VIDEO_SEEK_THRESHOLD", "0"))  # frames, 0 = never seek
+    FAST_SCAN_INTERVAL: float = float(os.getenv("FAST_SCAN_INTERVAL", "2.0"))  # seconds
+    VIDEO_SEGMENT_WORKERS: int = int(os.getenv("VIDEO_SEGMENT_WORKERS", "1"))  # 0 = one per core
+    VIDEO_MIN_SEGMENT_SECONDS: float = float(os.getenv("VIDEO_MIN_SEGMENT_SECONDS", "30"))
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "1"))
+    INFERENCE_QUEUE_SIZE: int = int(os.getenv("INFERENCE_QUEUE_SIZE", "16"))
+    INFERENCE_TORCH_THREADS: int = int(os.getenv("INFERENCE_TORCH_THREADS", "0"))  # process-wide, 0 = all cores
+    INFERENCE_QUEUE_TIMEOUT: float = float(os.getenv("INFERENCE_QUEUE_TIMEOUT", "5.0"))  # seconds
+    DETECT_BATCH_WINDOW_MS: float = float(os.getenv("DETECT_BATCH_WINDOW_MS", "5"))  # 0 = no micro-batching
+    DETECT_MAX_BATCH_SIZE: int = int(os.getenv("DETECT_MAX_BATCH_SIZE", "0"))  # 0 = inference batch size
+    
+    # Uploads
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+    
+    # Background jobs
+    JOBS_DIR: Path = Path(os.getenv("JOBS_DIR", "./data/jobs"))
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_QUEUE_SIZE: int = int(os.getenv("JOB_QUEUE_SIZE", "32"))
+    JOB_RETENTION_HOURS: int = int(os.getenv("JOB_RETENTION_HOURS", "24"))
+    
+    # Result cache
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "True").lower() == "true"
+    RESULT_CACHE_DIR: Path = Path(os.getenv("RESULT_CACHE_DIR", "./data/result_cache"))
+    RESULT_CACHE_MAX_MB: int = int(os.getenv("RESULT_CACHE_MAX_MB", "512"))
     
     # Camera
     CAMERA_RTSP_URL: Optional[str] = os.getenv("CAMERA_RTSP_URL", None)
     CAMERA_FPS: int = int(os.getenv("CAMERA_FPS", "30"))
+    CAMERA_DETECT_INTERVAL: int = int(os.getenv("CAMERA_DETECT_INTERVAL", "1"))  # detect every Nth frame, track all
+    VIDEO_TRACK_DETECT_INTERVAL: int = int(os.getenv("VIDEO_TRACK_DETECT_INTERVAL", "1"))  # uploaded videos: detect every Nth frame
+    VIDEO_TRACK_PARTIAL_FRAMES: int = int(os.getenv("VIDEO_TRACK_PARTIAL_FRAMES", "300"))  # partial results every N frames
+    TRACK_HISTORY_SIZE: int = int(os.getenv("TRACK_HISTORY_SIZE", "256"))  # positions kept per track
+    TRACK_HISTORY_DOWNSAMPLE: bool = os.getenv("TRACK_HISTORY_DOWNSAMPLE", "False").lower() == "true"  # thin old positions
+    TRACK_GRID_MIN_PAIRS: int = int(os.getenv("TRACK_GRID_MIN_PAIRS", "160000"))  # tracks x detections to use the spatial grid
+    TRACK_EVENT_UPDATE_INTERVAL: float = float(os.getenv("TRACK_EVENT_UPDATE_INTERVAL", "1.0"))  # seconds between track_updated events
+    TRACK_EVENTS_TO_DB: bool = os.getenv("TRACK_EVENTS_TO_DB", "False").lower() == "true"  # save ended tracks to animal_tracks
+    REID_ENABLED: bool = os.getenv("REID_ENABLED", "False").lower() == "true"  # relink tracks by appearance
+    REID_MIN_SIMILARITY: float = float(os.getenv("REID_MIN_SIMILARITY", "0.9"))  # cosine similarity to relink
+    REID_TTL_SECONDS: float = float(os.getenv("REID_TTL_SECONDS", "300"))  # how long departed animals can be relinked
+    REID_INDEX_PARTITIONS: int = int(os.getenv("REID_INDEX_PARTITIONS", "0"))  # IVF partitions, 0 = brute force
+    TRACKER_IDLE_SECONDS: float = float(os.getenv("TRACKER_IDLE_SECONDS", "600"))  # evict unused camera trackers
+    TRACKING_WORKERS: int = int(os.getenv("TRACKING_WORKERS", "0"))  # 0 = track in the API process
+    TRACKING_SHARDS: str = os.getenv("TRACKING_SHARDS", "")  # e.g. "barn-1:0,yard-2:1", others hashed
+    TRACKING_SNAPSHOT_PATH: Path = Path(os.getenv("TRACKING_SNAPSHOT_PATH", "./data/tracking_snapshot.npz"))
+    TRACKING_SNAPSHOT_INTERVAL: float = float(os.getenv("TRACKING_SNAPSHOT_INTERVAL", "30"))  # seconds, 0 = off
+    TRACKING_SNAPSHOT_MAX_AGE: float = float(os.getenv("TRACKING_SNAPSHOT_MAX_AGE", "300"))  # resume only if newer
     DETECTION_CONFIDENCE: float = float(os.getenv("DETECTION_CONFIDENCE", "0.5"))
+    TRACK_LOW_CONFIDENCE: float = float(os.getenv("TRACK_LOW_CONFIDENCE", "0.1"))  # ByteTrack second-stage matches
+    
+    # Startup
+    LAZY_SERVICES: str = os.getenv("LAZY_SERVICES", "")  # e.g. "milking,lameness": load on first use
+    READINESS_SERVICES: str = os.getenv("READINESS_SERVICES", "detection")  # required by /health/ready
     
     # Database
     DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
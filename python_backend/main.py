@@ -1,13 +1,13 @@
 """FastAPI Backend for Cattle AI Monitoring System."""
 import asyncio
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 from typing import List, Dict, Any
 import cv2
-import numpy as np
 from datetime import datetime
+import json
 import logging
 
 from config import settings
@@ -17,12 +17,22 @@ from services.milking_service import MilkingService
 from services.lameness_service import LamenessService
 from services.database_service import DatabaseService
 from services.video_processing_service import VideoProcessingService
+from services.image_decode import decode_image
+from services.camera_roi import camera_roi
+from services.inference_executor import InferenceBusyError
+from services.quantization import int8_reports
+from services.job_service import JobService, QueueFullError
+from services.model_registry import default_model_paths, model_registry
+from services.service_startup import ServiceStartup, ServiceUnavailableError
+from services.upload_service import UploadStream, get_active_upload, remove_file, save_upload
 from models.schemas import (
     AnimalDetection,
     TrackingInfo,
     MilkingStatus,
     LamenessStatus,
-    CameraStream
+    CameraStream,
+    JobStatus,
+    VideoJob
 )
 
 # Configure logging
@@ -52,6 +62,21 @@ milking_service = MilkingService()
 lameness_service = LamenessService()
 db_service = DatabaseService()
 video_processing_service = VideoProcessingService()
+job_service = JobService()
+startup = ServiceStartup()
+
+# Background tasks started at startup, kept referenced until they finish
+background_tasks = set()
+
+# Load models in the parent process so forked workers (gunicorn --preload)
+# share their pages copy-on-write instead of each loading a copy
+if settings.MODEL_PRELOAD:
+    model_paths = {**default_model_paths(), "video": video_processing_service.model_path}
+    model_registry.preload(
+        (weights, settings.INT8_ENABLED and name in ("detection", "udder"))
+        for name, weights in model_paths.items()
+        if weights
+    )
 
 
 # ==================== STARTUP & SHUTDOWN ====================
@@ -61,25 +86,90 @@ async def startup_event():
     """Initialize services on startup."""
     logger.info("🚀 Starting Cattle AI Backend...")
     
+    # ML models and database connect concurrently in the background;
+    # /health/ready reports when detection is warm
+    lazy = {name.strip() for name in settings.LAZY_SERVICES.split(",") if name.strip()}
+    startup.register("detection", detection_service.initialize, lazy="detection" in lazy)
+    startup.register("milking", milking_service.initialize, lazy="milking" in lazy)
+    startup.register("lameness", lameness_service.initialize, lazy="lameness" in lazy)
+    startup.register("database", db_service.initialize)
+    startup.start()
+    
     try:
-        # Initialize ML models
-        await detection_service.initialize()
-        await milking_service.initialize()
-        await lameness_service.initialize()
+        # Start background video job workers
+        await job_service.start()
         
-        # Initialize database connection
-        await db_service.initialize()
-        
-        logger.info("✅ All services initialized successfully")
+        # Resume tracks from the last checkpoint
+        await tracking_service.start()
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
         raise
+    
+    start_background_task(log_startup_complete())
+    if settings.TRACK_EVENTS_TO_DB:
+        start_background_task(save_ended_tracks())
+
+
+def start_background_task(coro):
+    """Run coro as a background task that is cancelled on shutdown."""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_task_done)
+
+
+def background_task_done(task: asyncio.Task):
+    """Forget a finished background task and log what it raised."""
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_coro().__name__} failed: {task.exception()!r}")
+
+
+async def log_startup_complete():
+    """Log once every eagerly initialized service has finished loading."""
+    await startup.wait_all()
+    failed = [name for name, s in startup.status().items() if s["state"] == "failed"]
+    if failed:
+        logger.error(f"❌ Services failed to initialize: {', '.join(failed)}")
+    else:
+        logger.info("✅ All services initialized successfully")
+
+
+async def save_ended_tracks():
+    """Save camera tracks to animal_tracks as their track_ended events arrive."""
+    try:
+        await startup.wait_ready("database")
+    except ServiceUnavailableError as e:
+        logger.error(f"⚠️ Not saving ended tracks: {e}")
+        return
+    
+    async for delta in tracking_service.subscribe():
+        for event in delta["events"]:
+            if event["event"] != "track_ended":
+                continue
+            tracking = TrackingInfo(
+                track_id=event["track_id"],
+                animal_type=event["animal_type"],
+                first_seen=event["first_seen"],
+                last_seen=event["last_seen"],
+                positions=[],
+                confidence_avg=event["confidence"],
+                frame_count=event["detections"]
+            )
+            await db_service.save_tracking(tracking, camera_id=delta["camera_id"])
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("🛑 Shutting down Cattle AI Backend...")
+    for task in list(background_tasks):
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await job_service.stop()
+    video_processing_service.shutdown()
+    detection_service.shutdown()
+    milking_service.shutdown()
+    await tracking_service.stop()
     await db_service.close()
 
 
@@ -106,12 +196,208 @@ async def health_check():
             "tracking": tracking_service.is_ready(),
             "milking": milking_service.is_ready(),
             "lameness": lameness_service.is_ready(),
+            "jobs": job_service.is_ready(),
             "database": await db_service.health_check()
         },
+        "startup": startup.status(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive", "timestamp": datetime.utcnow().isoformat()}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 once the READINESS_SERVICES (default: detection)
+    are initialized, 503 before. Includes per-service/model state.
+    """
+    required = [name.strip() for name in settings.READINESS_SERVICES.split(",") if name.strip()]
+    ready = all(startup.is_ready(name) for name in required)
+    
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "required": required,
+            "services": startup.status(),
+            "models": [
+                {"weights": m["weights"], "loaded": m["loaded"]}
+                for m in model_registry.stats()["models"]
+            ],
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    )
+
+
+# ==================== BACKGROUND VIDEO JOBS ====================
+
+async def run_video_process_job(job: VideoJob, progress) -> Dict[str, Any]:
+    """Full video analysis job (detection, milking, lameness)."""
+    import os
+    import uuid
+    
+    # A streamed upload may still be arriving; analysis follows it
+    upload = get_active_upload(job.video_path)
+    if upload is None and not os.path.exists(job.video_path):
+        raise RuntimeError("Video upload did not complete")
+    
+    # Process video through ML pipeline (served from cache for known uploads)
+    results = await video_processing_service.process_video(
+        job.video_path,
+        progress=progress,
+        content_hash=job.params.get("content_hash"),
+        upload=upload
+    )
+    if upload is not None and upload.failed:
+        raise RuntimeError("Video upload was interrupted")
+    
+    # Generate unique cattle ID if not provided
+    cattle_id = job.params.get("cattle_id") or ""
+    if not cattle_id.strip():
+        cattle_id = f"COW-{uuid.uuid4().hex[:8].upper()}"
+    
+    # Save results to database for real-time dashboard updates
+    progress("database", 0.0)
+    try:
+        await startup.wait_ready("database")
+        await db_service.save_video_processing_results(cattle_id, results)
+        logger.info(f"✅ Video processing results saved to database for {cattle_id}")
+    except Exception as db_error:
+        logger.error(f"⚠️ Failed to save to database: {db_error}")
+        # Continue even if DB save fails
+    progress("database", 1.0)
+    
+    return {
+        **results,
+        "cattle_id": cattle_id,
+        "timestamp": datetime.utcnow().isoformat(),
+        "saved_to_database": True
+    }
+
+
+async def run_detect_animals_job(job: VideoJob, progress) -> Dict[str, Any]:
+    """Animal detection and counting job."""
+    results = await video_processing_service.detect_animals(
+        job.video_path,
+        fast_scan=job.params.get("fast_scan", False),
+        progress=progress,
+        content_hash=job.params.get("content_hash")
+    )
+    
+    return {
+        "success": True,
+        **results,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+async def run_detect_video_job(job: VideoJob, progress) -> Dict[str, Any]:
+    """Detection and tracking job."""
+    await startup.wait_ready("detection")
+    
+    partial_every = settings.VIDEO_TRACK_PARTIAL_FRAMES if job.params.get("partial") else 0
+    async for results in tracking_service.stream_video(
+        job.video_path,
+        detection_service,
+        partial_every=partial_every,
+        progress=lambda fraction: progress("tracking", fraction)
+    ):
+        if results["partial"]:
+            # Sent to job subscribers with the next progress update
+            job.result = {"success": True, "results": results}
+    progress("tracking", 1.0)
+    
+    return {
+        "success": True,
+        "results": results,
         "timestamp": datetime.utcnow().isoformat()
     }
 
 
+async def run_lameness_job(job: VideoJob, progress) -> Dict[str, Any]:
+    """Gait analysis job."""
+    await startup.wait_ready("lameness")
+    lameness_result = await lameness_service.analyze_gait(job.video_path, progress=progress)
+    
+    # Save to database if animal_id provided
+    animal_id = job.params.get("animal_id")
+    if animal_id:
+        await startup.wait_ready("database")
+        await db_service.save_lameness_status(animal_id, lameness_result)
+    
+    return {
+        "success": True,
+        "lameness": lameness_result.dict(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+job_service.register("video_process", run_video_process_job)
+job_service.register("video_detect_animals", run_detect_animals_job)
+job_service.register("detect_video", run_detect_video_job)
+job_service.register("lameness", run_lameness_job)
+
+# Job kinds whose results VideoProcessingService caches by upload content hash
+CACHED_ANALYSES = {
+    "video_process": "process_video",
+    "video_detect_animals": "detect_animals"
+}
+
+
+async def submit_video_job(kind: str, file: UploadFile, params: Dict[str, Any], wait: bool):
+    """
+    Save an uploaded video and queue a job for it.
+    
+    With wait=True the request waits (without blocking the event loop) and
+    returns the job result; otherwise it returns the job ID immediately.
+    """
+    video_path = str(job_service.upload_path(file.filename))
+    content_hash = await save_upload(file, video_path)
+    
+    # Content hash keys the result cache; cached jobs skip the queue
+    params = {**params, "content_hash": content_hash}
+    analysis = CACHED_ANALYSES.get(kind)
+    immediate = analysis is not None and await video_processing_service.has_cached_result(
+        analysis, params["content_hash"], fast_scan=params.get("fast_scan", False)
+    )
+    
+    try:
+        job = job_service.submit(kind, video_path, params, immediate=immediate)
+    except BaseException as e:
+        remove_file(video_path)
+        if isinstance(e, QueueFullError):
+            raise HTTPException(status_code=503, detail=str(e))
+        raise
+    
+    return await job_response(job, wait)
+
+
+async def job_response(job: VideoJob, wait: bool):
+    """Job result once finished (wait=True), or 202 with the job ID."""
+    if not wait:
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "job_id": job.job_id,
+            "status": job.status.value,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    
+    job = await job_service.wait(job.job_id)
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    return job.result
+
+
+def job_summary(job: VideoJob) -> Dict[str, Any]:
+    """Job status without the (possibly large) result."""
+    return json.loads(job.json(exclude={"result", "video_path", "params"}))
+
+
 # ==================== DETECTION ENDPOINTS ====================
 
 @app.post("/api/detect")
@@ -125,56 +411,60 @@ async def detect_animals(file: UploadFile = File(...)):
         List of detected animals with bounding boxes and confidence
     """
     try:
-        # Read image
+        # Read image, decoded no larger than the model input needs
         contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image, (sx, sy) = decode_image(contents)
+        if image is None:
+            raise HTTPException(status_code=400, detail="Could not decode image")
+        
+        # Run detection on the inference executor
+        await startup.wait_ready("detection")
+        detections = await detection_service.detect_async(image)
         
-        # Run detection
-        detections = detection_service.detect(image)
+        # Boxes in original image coordinates
+        detections = detections.scaled(sx, sy)
+        
+        # Build response models once, at the API boundary
+        animals = detections.to_models()
         
         # Save to database
-        for detection in detections:
+        for detection in animals:
             await db_service.save_detection(detection)
         
         return {
             "success": True,
-            "count": len(detections),
-            "detections": [d.dict() for d in detections],
+            "count": len(animals),
+            "detections": [d.dict() for d in animals],
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
+    except (InferenceBusyError, ServiceUnavailableError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Detection error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/detect-video")
-async def detect_video(file: UploadFile = File(...)):
+async def detect_video(file: UploadFile = File(...), wait: bool = True, partial: bool = False):
     """
     Process video for animal detection and tracking.
     
     - **file**: Video file (MP4, AVI)
+    - **wait**: Wait for the result (default) or return a job ID immediately
+    - **partial**: Publish partial counts as the job's result while it runs
+      (see /ws/jobs/{job_id})
     
     Returns:
-        Detection and tracking results for the entire video
+        Unique animal counts, per-track dwell times and trajectories for the entire video
     """
     try:
-        # Save uploaded video temporarily
-        video_path = f"/tmp/{file.filename}"
-        contents = await file.read()
-        with open(video_path, "wb") as f:
-            f.write(contents)
-        
-        # Process video
-        results = await tracking_service.process_video(video_path)
-        
-        return {
-            "success": True,
-            "results": results,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return await submit_video_job("detect_video", file, {"partial": partial}, wait)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Video processing error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -198,12 +488,50 @@ async def get_tracking_stats():
 
 
 @app.get("/api/tracking/animals")
-async def get_tracked_animals():
-    """Get all currently tracked animals."""
+async def get_tracked_animals(positions: bool = False):
+    """Get all currently tracked animals; ?positions=true adds each track's position history."""
+    try:
+        animals = await tracking_service.get_tracked_animals(positions=positions)
+        return {
+            "success": True,
+            "count": len(animals),
+            "animals": animals,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Get tracked animals error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/tracking/cameras/{camera_id}/stats")
+async def get_camera_tracking_stats(camera_id: str):
+    """Get tracking statistics of one camera."""
+    try:
+        stats = await tracking_service.get_stats(camera_id)
+        if stats is None:
+            raise HTTPException(status_code=404, detail="No tracker for this camera")
+        
+        return {
+            "success": True,
+            "camera_id": camera_id,
+            "stats": stats,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Tracking stats error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/tracking/cameras/{camera_id}/animals")
+async def get_camera_tracked_animals(camera_id: str, positions: bool = False):
+    """Get currently tracked animals of one camera; ?positions=true adds each track's position history."""
     try:
-        animals = await tracking_service.get_tracked_animals()
+        animals = await tracking_service.get_tracked_animals(camera_id, positions)
         return {
             "success": True,
+            "camera_id": camera_id,
             "count": len(animals),
             "animals": animals,
             "timestamp": datetime.utcnow().isoformat()
@@ -224,13 +552,15 @@ async def detect_milking_status(file: UploadFile = File(...), animal_id: str = N
     - **animal_id**: Optional animal ID for tracking
     """
     try:
-        # Read image
+        # Read image, decoded no larger than the model input needs
         contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image, scale = decode_image(contents)
+        if image is None:
+            raise HTTPException(status_code=400, detail="Could not decode image")
         
-        # Detect milking status
-        status = milking_service.detect_milking_status(image)
+        # Detect milking status on the inference executor
+        await startup.wait_ready("milking")
+        status = await milking_service.detect_milking_status_async(image, scale)
         
         # Save to database if animal_id provided
         if animal_id:
@@ -242,6 +572,10 @@ async def detect_milking_status(file: UploadFile = File(...), animal_id: str = N
             "timestamp": datetime.utcnow().isoformat()
         }
         
+    except HTTPException:
+        raise
+    except (InferenceBusyError, ServiceUnavailableError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Milking detection error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -250,33 +584,19 @@ async def detect_milking_status(file: UploadFile = File(...), animal_id: str = N
 # ==================== LAMENESS DETECTION ENDPOINTS ====================
 
 @app.post("/api/lameness/detect")
-async def detect_lameness(file: UploadFile = File(...), animal_id: str = None):
+async def detect_lameness(file: UploadFile = File(...), animal_id: str = None, wait: bool = True):
     """
     Detect lameness from video showing animal walking.
     
     - **file**: Video file showing the animal walking
     - **animal_id**: Optional animal ID for tracking
+    - **wait**: Wait for the result (default) or return a job ID immediately
     """
     try:
-        # Save video temporarily
-        video_path = f"/tmp/{file.filename}"
-        contents = await file.read()
-        with open(video_path, "wb") as f:
-            f.write(contents)
-        
-        # Analyze gait and detect lameness
-        lameness_result = await lameness_service.analyze_gait(video_path)
-        
-        # Save to database if animal_id provided
-        if animal_id:
-            await db_service.save_lameness_status(animal_id, lameness_result)
-        
-        return {
-            "success": True,
-            "lameness": lameness_result.dict(),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return await submit_video_job("lameness", file, {"animal_id": animal_id}, wait)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Lameness detection error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -313,11 +633,15 @@ async def camera_stream(websocket: WebSocket, camera_id: str):
     """
     Real-time camera stream with ML processing.
     
-    Processes frames and sends detection results via WebSocket.
+    Processes frames and sends detection results via WebSocket, with
+    track events (track_started, track_updated, track_lost, track_ended)
+    and updated totals instead of the full list of tracked animals.
     """
     await manager.connect(websocket)
     
     try:
+        await startup.wait_ready("detection")
+        
         # Get camera stream URL from database
         camera_info = await db_service.get_camera(camera_id)
         
@@ -325,27 +649,53 @@ async def camera_stream(websocket: WebSocket, camera_id: str):
             await websocket.send_json({"error": "Camera not found"})
             return
         
+        # Detection regions; None runs detection on the whole frame
+        roi = camera_roi(camera_info)
+        
         # Initialize video capture
         cap = cv2.VideoCapture(camera_info.get("rtsp_url", 0))
         
+        # Detection runs on every Nth frame; tracks are predicted in between
+        interval = max(1, settings.CAMERA_DETECT_INTERVAL)
+        
+        frame_index = 0
+        
         while True:
-            ret, frame = cap.read()
+            # Read off the event loop; live frames are processed as they arrive,
+            # so output is never held back waiting for a batch to fill
+            ret, frame = await asyncio.to_thread(cap.read)
             if not ret:
                 break
             
-            # Run detection
-            detections = detection_service.detect(frame)
+            detections = None
+            if frame_index % interval == 0:
+                # Run detection; waits for a slot when the inference queue is full.
+                # Low-confidence detections are kept for the tracker's second stage.
+                conf = settings.TRACK_LOW_CONFIDENCE
+                if roi is None:
+                    detections = (await detection_service.detect_batch_async([frame], conf))[0]
+                else:
+                    detections = roi.filter(
+                        (await detection_service.detect_batch_async([roi.crop(frame)], conf))[0]
+                    )
+            frame_index += 1
             
-            # Track animals
-            tracked = tracking_service.update(frame, detections)
+            # Track animals; only what changed is sent
+            delta = await tracking_service.update_async(camera_id, detections, frame)
             
-            # Send results
-            await websocket.send_json({
-                "camera_id": camera_id,
-                "detections": [d.dict() for d in detections],
-                "tracking": tracked,
-                "timestamp": datetime.utcnow().isoformat()
-            })
+            # Frames without detection or track events have nothing to send
+            if detections is not None or delta["events"]:
+                if detections is not None:
+                    confident = detections[detections.scores >= settings.DETECTION_CONFIDENCE].to_dicts()
+                else:
+                    confident = []
+                
+                await websocket.send_json({
+                    **delta,
+                    "detections": confident,
+                    "detected": detections is not None,
+                    "timestamp": datetime.utcnow().isoformat()
+                })
             
             # Control frame rate
             await asyncio.sleep(1.0 / settings.CAMERA_FPS)
@@ -360,12 +710,37 @@ async def camera_stream(websocket: WebSocket, camera_id: str):
     finally:
         if 'cap' in locals():
             cap.release()
+            # Tracks still open when the stream stops are ended (and saved)
+            await tracking_service.end_camera(camera_id)
+
+
+@app.websocket("/ws/tracking/events")
+async def tracking_events_stream(websocket: WebSocket, camera_id: str = None):
+    """
+    Stream track event deltas of all cameras, or of one with ?camera_id=.
+    
+    The first message holds the currently tracked animals; each following
+    message is one camera frame's events with that camera's updated totals.
+    """
+    await websocket.accept()
+    
+    try:
+        await websocket.send_json({
+            "tracked_animals": await tracking_service.get_tracked_animals(camera_id),
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        
+        async for delta in tracking_service.subscribe(camera_id):
+            await websocket.send_json(delta)
+    
+    except WebSocketDisconnect:
+        logger.info("Tracking event stream disconnected")
 
 
 # ==================== VIDEO PROCESSING ENDPOINTS ====================
 
 @app.post("/api/video/process")
-async def process_video_upload(file: UploadFile = File(...), cattle_id: str = ""):
+async def process_video_upload(file: UploadFile = File(...), cattle_id: str = "", wait: bool = True):
     """
     Process uploaded video with YOLOv8 for complete analysis:
     1. Animal detection and counting (cattle, buffalo filtering)
@@ -373,79 +748,177 @@ async def process_video_upload(file: UploadFile = File(...), cattle_id: str = ""
     3. Lameness detection
     
     Returns comprehensive results and saves to database for real-time updates.
+    With wait=false, returns a job ID to poll at /api/jobs/{job_id}.
     """
-    import tempfile
-    import os
-    import uuid
-    
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            video_path = tmp_file.name
+        return await submit_video_job("video_process", file, {"cattle_id": cattle_id}, wait)
         
-        # Process video through ML pipeline
-        results = await video_processing_service.process_video(video_path)
-        
-        # Generate unique cattle ID if not provided
-        if not cattle_id or cattle_id.strip() == "":
-            cattle_id = f"COW-{uuid.uuid4().hex[:8].upper()}"
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Video processing error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/video/process/stream")
+async def process_video_stream(request: Request, cattle_id: str = "", wait: bool = True):
+    """
+    Same analysis as /api/video/process for a video sent as the raw
+    request body (Content-Type: application/octet-stream).
+    
+    Analysis starts while the upload is still arriving. This works for
+    streamable containers (MPEG-TS, fragmented MP4, MJPEG); for other
+    formats decoding begins once enough of the file is available.
+    """
+    try:
+        video_path = str(job_service.upload_path(request.headers.get("x-filename")))
         
-        # Save results to database for real-time dashboard updates
         try:
-            await db_service.save_video_processing_results(cattle_id, results)
-            logger.info(f"✅ Video processing results saved to database for {cattle_id}")
-        except Exception as db_error:
-            logger.error(f"⚠️ Failed to save to database: {db_error}")
-            # Continue even if DB save fails
+            job = job_service.submit("video_process", video_path, {"cattle_id": cattle_id})
+        except QueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e))
         
-        # Clean up temp file
-        os.unlink(video_path)
+        # Registered before the first await, so the job always finds it
+        upload = UploadStream(video_path)
+        await upload.receive(request.stream())
         
-        return {
-            **results,
-            "cattle_id": cattle_id,
-            "timestamp": datetime.utcnow().isoformat(),
-            "saved_to_database": True
-        }
+        return await job_response(job, wait)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Video processing error: {e}")
+        logger.error(f"Video stream processing error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/video/detect-animals")
-async def detect_animals_in_video(file: UploadFile = File(...)):
+async def detect_animals_in_video(file: UploadFile = File(...), fast_scan: bool = False, wait: bool = True):
     """
     Detect and classify animals in video using YOLOv8.
     Returns cattle count, buffalo count, and filters out other animals.
-    """
-    import tempfile
-    import os
     
+    - **fast_scan**: Only analyze keyframe-spaced frames for a rough count
+    - **wait**: Wait for the result (default) or return a job ID immediately
+    """
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            video_path = tmp_file.name
-        
-        results = await video_processing_service.detect_animals(video_path)
-        os.unlink(video_path)
-        
-        return {
-            "success": True,
-            **results,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        return await submit_video_job(
+            "video_detect_animals", file, {"fast_scan": fast_scan}, wait
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Animal detection error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ==================== JOB ENDPOINTS ====================
+
+@app.get("/api/jobs")
+async def list_jobs(limit: int = 50):
+    """List recent background video jobs."""
+    jobs = job_service.list_jobs(limit)
+    return {
+        "success": True,
+        "count": len(jobs),
+        "jobs": [job_summary(job) for job in jobs],
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get job status and per-stage progress."""
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "success": True,
+        "job": job_summary(job),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Get the result of a finished job."""
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    
+    return job.result
+
+
+@app.websocket("/ws/jobs/{job_id}")
+async def job_stream(websocket: WebSocket, job_id: str):
+    """
+    Stream job status and progress updates.
+    
+    Sends one message per update and a final message including the result.
+    Jobs that publish partial results include them as "partial_result".
+    """
+    await websocket.accept()
+    
+    try:
+        if job_service.get(job_id) is None:
+            await websocket.send_json({"error": "Job not found"})
+            return
+        
+        async for job in job_service.subscribe(job_id):
+            message = job_summary(job)
+            if job.status == JobStatus.COMPLETED:
+                message["result"] = json.loads(json.dumps(job.result, default=str))
+            elif job.result is not None:
+                # Partial result published by a running job
+                message["partial_result"] = json.loads(json.dumps(job.result, default=str))
+            await websocket.send_json(message)
+        
+        await websocket.close()
+    
+    except WebSocketDisconnect:
+        logger.info(f"Job {job_id} stream disconnected")
+
+
 # ==================== STATISTICS & ANALYTICS ====================
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get video result cache hit/miss counters and size."""
+    return {
+        "success": True,
+        "cache": video_processing_service.result_cache.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@app.get("/api/inference/stats")
+async def get_inference_stats():
+    """Get detection and udder inference queue depth, wait times and micro-batch sizes."""
+    return {
+        "success": True,
+        "detection": detection_service.executor.stats(),
+        "milking": milking_service.executor.stats(),
+        "batching": detection_service.batcher.stats() if detection_service.batcher else None,
+        "int8": int8_reports(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@app.get("/api/models/stats")
+async def get_model_stats():
+    """Get loaded models with load time and resident memory per model."""
+    return {
+        "success": True,
+        **model_registry.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
 @app.get("/api/stats/daily")
 async def get_daily_stats():
     """Get daily statistics."""
@@ -0,0 +1,162 @@
+"""Array-backed container for one frame's detections."""
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from models.schemas import AnimalDetection, AnimalType, BoundingBox
+
+# One row per detection: xyxy box, confidence and model class id
+DETECTION_DTYPE = np.dtype([
+    ("box", np.float32, (4,)),
+    ("score", np.float32),
+    ("class_id", np.int16)
+])
+
+# Detector class ids for cow (0) and buffalo (1)
+ANIMAL_CLASSES = {
+    0: AnimalType.COW,
+    1: AnimalType.BUFFALO
+}
+
+
+def class_animal_type(class_id: int) -> AnimalType:
+    """Animal type of a detector class id."""
+    return ANIMAL_CLASSES.get(int(class_id), AnimalType.UNKNOWN)
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Element-wise IoU of two broadcastable (..., 4) arrays of xyxy boxes."""
+    a, b = boxes_a[..., :4], boxes_b[..., :4]
+    inter = (
+        np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+        * np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    )
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU of two sets of xyxy boxes.
+
+    Args:
+        boxes_a: (N, 4) boxes
+        boxes_b: (M, 4) boxes
+
+    Returns:
+        (N, M) IoU matrix
+    """
+    return box_iou(boxes_a[:, None, :4], boxes_b[None, :, :4])
+
+
+class Detections:
+    """
+    Detections for one frame as a numpy structured array.
+
+    Boxes, scores and class ids are copied out of the model result in a
+    single device-to-host transfer and filtered with array operations.
+    Pydantic AnimalDetection objects are only built on request, at the API
+    boundary.
+    """
+
+    __slots__ = ("data", "timestamp")
+
+    def __init__(self, data: Optional[np.ndarray] = None, timestamp: Optional[datetime] = None):
+        self.data = np.empty(0, dtype=DETECTION_DTYPE) if data is None else data
+        self.timestamp = timestamp or datetime.utcnow()
+
+    @classmethod
+    def from_result(cls, result, class_ids: Iterable[int] = tuple(ANIMAL_CLASSES)) -> "Detections":
+        """
+        Extract detections of the given classes from one YOLOv8 result.
+
+        Args:
+            result: Ultralytics Results for one image
+            class_ids: Model class ids to keep (others are rejected)
+        """
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return cls()
+
+        # Rows are x1, y1, x2, y2, [track id,] confidence, class
+        raw = boxes.data.cpu().numpy()
+        classes = raw[:, -1].astype(np.int16)
+        keep = np.isin(classes, list(class_ids))
+
+        data = np.empty(int(keep.sum()), dtype=DETECTION_DTYPE)
+        data["box"] = raw[keep, :4]
+        data["score"] = raw[keep, -2]
+        data["class_id"] = classes[keep]
+        return cls(data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index) -> "Detections":
+        """Subset by slice, index array or boolean mask."""
+        return Detections(np.atleast_1d(self.data[index]), self.timestamp)
+
+    def scaled(self, sx: float, sy: float) -> "Detections":
+        """Copy with boxes scaled by (sx, sy), e.g. back to full image size."""
+        data = self.data.copy()
+        data["box"] *= np.array([sx, sy, sx, sy], dtype=np.float32)
+        return Detections(data, self.timestamp)
+
+    def shifted(self, dx: float, dy: float) -> "Detections":
+        """Copy with boxes moved by (dx, dy), e.g. from a crop to the full frame."""
+        data = self.data.copy()
+        data["box"] += np.array([dx, dy, dx, dy], dtype=np.float32)
+        return Detections(data, self.timestamp)
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """(N, 4) float32 xyxy boxes."""
+        return self.data["box"]
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self.data["score"]
+
+    @property
+    def class_ids(self) -> np.ndarray:
+        return self.data["class_id"]
+
+    def animal_type(self, index: int) -> AnimalType:
+        return class_animal_type(self.data["class_id"][index])
+
+    def bounding_box(self, index: int) -> BoundingBox:
+        x1, y1, x2, y2 = self.data["box"][index].tolist()
+        return BoundingBox(x1=x1, y1=y1, x2=x2, y2=y2)
+
+    def to_models(self) -> List[AnimalDetection]:
+        """Build AnimalDetection objects (e.g. for the database)."""
+        return [
+            AnimalDetection(
+                detection_id=str(uuid.uuid4()),
+                animal_type=self.animal_type(i),
+                confidence=float(self.data["score"][i]),
+                bounding_box=self.bounding_box(i),
+                timestamp=self.timestamp
+            )
+            for i in range(len(self.data))
+        ]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """JSON-ready dicts with the same fields as AnimalDetection.dict()."""
+        timestamp = self.timestamp.isoformat()
+        boxes = self.data["box"].tolist()
+        scores = self.data["score"].tolist()
+
+        return [
+            {
+                "detection_id": str(uuid.uuid4()),
+                "animal_type": self.animal_type(i).value,
+                "confidence": scores[i],
+                "bounding_box": dict(zip(("x1", "y1", "x2", "y2"), boxes[i])),
+                "timestamp": timestamp
+            }
+            for i in range(len(self.data))
+        ]
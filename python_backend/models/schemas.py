@@ -146,3 +146,35 @@ class HealthStats(BaseModel):
     healthy_animals: int
     alerts_count: int
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class JobStatus(str, Enum):
+    """Background job state."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class VideoJob(BaseModel):
+    """Background video processing job."""
+    job_id: str = Field(..., description="Unique job ID")
+    kind: str
+    status: JobStatus = JobStatus.QUEUED
+    params: Dict[str, Any] = {}
+    video_path: Optional[str] = None
+    progress: Dict[str, float] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+    
+    class Config:
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
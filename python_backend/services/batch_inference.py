@@ -0,0 +1,124 @@
+"""Batched multi-frame inference helpers for Ultralytics models."""
+import os
+import time
+import numpy as np
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Batch sizes tried when auto-tuning
+AUTOTUNE_CANDIDATES = (1, 2, 4, 8)
+
+# Auto-tuned batch size per weights file (keyed by the model's ckpt_path, or id of the model object without one)
+_tuned_batch_sizes: Dict[Any, int] = {}
+
+
+def predict_batch(model, frames: Sequence[np.ndarray], **kwargs) -> List[Any]:
+    """
+    Run one model call on several frames.
+
+    Args:
+        model: Ultralytics YOLO model
+        frames: Frames (BGR) to run as a single batch
+        **kwargs: Extra predict arguments (conf, verbose, ...)
+
+    Returns:
+        One Results object per frame, in input order
+    """
+    if not frames:
+        return []
+    kwargs.setdefault('verbose', False)
+    return list(model(list(frames), **kwargs))
+
+
+def iter_batched(
+    model,
+    items: Iterable[Tuple[Any, np.ndarray]],
+    batch_size: int,
+    **kwargs
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Collect frames into batches and yield per-frame results in order.
+
+    Args:
+        model: Ultralytics YOLO model
+        items: Iterable of (payload, frame); payload is passed through untouched
+        batch_size: Number of frames per model call
+        **kwargs: Extra predict arguments
+
+    Yields:
+        (payload, Results) for every input item, in input order
+    """
+    batch_size = max(1, int(batch_size))
+    payloads, frames = [], []
+
+    for payload, frame in items:
+        payloads.append(payload)
+        frames.append(frame)
+
+        if len(frames) >= batch_size:
+            yield from zip(payloads, predict_batch(model, frames, **kwargs))
+            payloads, frames = [], []
+
+    if frames:
+        yield from zip(payloads, predict_batch(model, frames, **kwargs))
+
+
+def autotune_batch_size(
+    model,
+    candidates: Sequence[int] = AUTOTUNE_CANDIDATES,
+    imgsz: int = 640,
+    repeats: int = 2
+) -> int:
+    """
+    Pick the batch size with the highest frames/sec on this machine.
+
+    Runs the model on blank frames for each candidate size; on failure falls
+    back to a CPU-count heuristic.
+    """
+    try:
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        predict_batch(model, [dummy])  # warm up
+
+        best_size, best_fps = 1, 0.0
+        for size in candidates:
+            frames = [dummy] * size
+            start = time.perf_counter()
+            for _ in range(repeats):
+                predict_batch(model, frames)
+            fps = size * repeats / (time.perf_counter() - start)
+
+            logger.debug(f"Batch size {size}: {fps:.1f} frames/sec")
+            if fps > best_fps:
+                best_size, best_fps = size, fps
+
+        return best_size
+
+    except Exception as e:
+        logger.warning(f"Batch size auto-tune failed ({e}), using CPU heuristic")
+        return max(1, min(8, (os.cpu_count() or 1) // 2))
+
+
+def resolve_batch_size(model, configured: int = None) -> int:
+    """
+    Batch size to use for a model.
+
+    Uses `configured` (or settings.INFERENCE_BATCH_SIZE) when positive,
+    otherwise auto-tunes once per model and caches the result.
+    """
+    if configured is None:
+        configured = settings.INFERENCE_BATCH_SIZE
+    if configured and configured > 0:
+        return configured
+    if model is None:
+        return 1
+
+    # Registry instances of the same weights share one tuned size
+    key = getattr(model, 'ckpt_path', None) or id(model)
+    if key not in _tuned_batch_sizes:
+        _tuned_batch_sizes[key] = autotune_batch_size(model)
+        logger.info(f"Auto-tuned inference batch size: {_tuned_batch_sizes[key]}")
+    return _tuned_batch_sizes[key]
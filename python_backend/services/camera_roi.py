@@ -0,0 +1,140 @@
+"""Per-camera regions of interest for detection."""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import cv2
+import numpy as np
+
+from models.detections import Detections
+
+logger = logging.getLogger(__name__)
+
+
+class CameraROI:
+    """
+    Polygon regions of one camera that detection runs in.
+
+    Frames are cropped to the bounding rectangle of all polygons before
+    detection, and detections whose bottom-centre (where the animal
+    stands) falls outside the polygons are dropped. The crop rectangle and
+    polygon mask are computed once per frame size, not per frame.
+    """
+
+    def __init__(self, polygons: List[np.ndarray]):
+        """
+        Args:
+            polygons: (N, 2) point arrays, as 0-1 fractions of the frame
+                      when every coordinate is <= 1, otherwise pixels
+        """
+        self.polygons = polygons
+        self.normalized = all(float(p.max()) <= 1.0 for p in polygons)
+        self._frame_shape: Optional[Tuple[int, int]] = None
+        self._rect = (0, 0, 0, 0)
+        self._mask: Optional[np.ndarray] = None
+
+    @classmethod
+    def parse(cls, roi: Any) -> Optional["CameraROI"]:
+        """
+        Build from a `cameras.roi` value: a list of polygons of [x, y] points.
+
+        Returns:
+            None when the camera has no ROI (use the whole frame)
+        """
+        if isinstance(roi, str):
+            roi = json.loads(roi)
+        if not roi:
+            return None
+
+        polygons = [np.asarray(points, dtype=np.float32).reshape(-1, 2) for points in roi]
+        if any(len(p) < 3 for p in polygons) or any((p < 0).any() for p in polygons):
+            raise ValueError("ROI polygons need at least 3 points with non-negative coordinates")
+        return cls(polygons)
+
+    def _prepare(self, frame_shape: Tuple[int, int]):
+        """Compute the crop rectangle and the mask inside it for one frame size."""
+        height, width = frame_shape
+        scale = np.array([width, height], dtype=np.float32) if self.normalized else 1.0
+        points = [np.round(p * scale).astype(np.int32) for p in self.polygons]
+
+        stacked = np.concatenate(points)
+        x1, y1 = np.clip(stacked.min(axis=0), 0, [width - 1, height - 1])
+        x2, y2 = np.clip(stacked.max(axis=0) + 1, 1, [width, height])
+
+        mask = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+        cv2.fillPoly(mask, [p - [x1, y1] for p in points], 1)
+
+        self._frame_shape = frame_shape
+        self._rect = (int(x1), int(y1), int(x2), int(y2))
+        self._mask = mask.astype(bool)
+
+        logger.info(
+            f"ROI for {width}x{height} frames: crop {x2 - x1}x{y2 - y1} at ({x1}, {y1}), "
+            f"{self.area_fraction:.0%} of the frame inside the polygons"
+        )
+
+    @property
+    def rect(self) -> Tuple[int, int, int, int]:
+        """Crop rectangle (x1, y1, x2, y2) for the last frame size seen."""
+        return self._rect
+
+    @property
+    def area_fraction(self) -> float:
+        """Share of the frame inside the polygons."""
+        if self._mask is None:
+            return 1.0
+        height, width = self._frame_shape
+        return float(self._mask.sum()) / (height * width)
+
+    def crop(self, frame: np.ndarray) -> np.ndarray:
+        """View of the frame cut to the ROI bounding rectangle (no copy)."""
+        if frame.shape[:2] != self._frame_shape:
+            self._prepare(frame.shape[:2])
+        x1, y1, x2, y2 = self._rect
+        return frame[y1:y2, x1:x2]
+
+    def filter(self, detections: Detections) -> Detections:
+        """
+        Keep detections made on `crop()` output that stand inside the polygons.
+
+        Returns:
+            The kept detections in full-frame coordinates
+        """
+        if len(detections) == 0:
+            return detections.shifted(*self._rect[:2])
+
+        mask_h, mask_w = self._mask.shape
+        boxes = detections.boxes
+        cx = np.clip(((boxes[:, 0] + boxes[:, 2]) / 2).astype(np.intp), 0, mask_w - 1)
+        cy = np.clip(boxes[:, 3].astype(np.intp), 0, mask_h - 1)
+
+        inside = self._mask[cy, cx]
+        return detections[inside].shifted(*self._rect[:2])
+
+
+# camera_id -> (raw ROI value, parsed ROI), reused across connections
+_camera_rois: Dict[str, Tuple[str, Optional[CameraROI]]] = {}
+
+
+def camera_roi(camera_info: Dict[str, Any]) -> Optional[CameraROI]:
+    """
+    The ROI for a `cameras` record, parsed once per camera.
+
+    Returns:
+        None when the camera has no (valid) ROI
+    """
+    camera_id = str(camera_info.get("camera_id"))
+    raw = json.dumps(camera_info.get("roi"), sort_keys=True)
+
+    cached = _camera_rois.get(camera_id)
+    if cached is not None and cached[0] == raw:
+        return cached[1]
+
+    try:
+        roi = CameraROI.parse(camera_info.get("roi"))
+    except (ValueError, TypeError) as e:
+        logger.warning(f"⚠️ Ignoring invalid ROI for camera {camera_id}: {e}")
+        roi = None
+
+    _camera_rois[camera_id] = (raw, roi)
+    return roi
@@ -1,8 +1,7 @@
 """Database service for Supabase integration."""
 import logging
-from typing import Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from supabase import create_client, Client
 import asyncio
 
 from config import settings
@@ -13,6 +12,9 @@ from models.schemas import (
     LamenessStatus
 )
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,12 +22,15 @@ class DatabaseService:
     """Service for database operations with Supabase."""
     
     def __init__(self):
-        self.client: Optional[Client] = None
+        self.client: Optional["Client"] = None
         self._ready = False
     
     async def initialize(self):
         """Initialize Supabase client."""
         try:
+            # Imported here so the supabase stack loads off the startup path
+            from supabase import create_client
+            
             self.client = create_client(
                 settings.SUPABASE_URL,
                 settings.SUPABASE_SERVICE_KEY
@@ -93,8 +98,8 @@ class DatabaseService:
     
     # ==================== TRACKING ====================
     
-    async def save_tracking(self, tracking: TrackingInfo) -> Dict:
-        """Save tracking information."""
+    async def save_tracking(self, tracking: TrackingInfo, camera_id: Optional[str] = None) -> Dict:
+        """Save tracking information (track IDs are unique per camera and start time)."""
         try:
             data = {
                 "track_id": tracking.track_id,
@@ -102,10 +107,13 @@ class DatabaseService:
                 "first_seen": tracking.first_seen.isoformat(),
                 "last_seen": tracking.last_seen.isoformat(),
                 "confidence_avg": tracking.confidence_avg,
-                "frame_count": tracking.frame_count
+                "frame_count": tracking.frame_count,
+                "camera_id": camera_id
             }
             
-            result = self.client.table('animal_tracks').upsert(data).execute()
+            result = self.client.table('animal_tracks').upsert(
+                data, on_conflict="camera_id,track_id,first_seen"
+            ).execute()
             return result.data[0] if result.data else {}
             
         except Exception as e:
@@ -1,15 +1,18 @@
 """Animal detection service using YOLOv8."""
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import logging
+from concurrent.futures import Future
 from pathlib import Path
-import uuid
-from datetime import datetime
 
 from config import settings
-from models.schemas import AnimalDetection, AnimalType, BoundingBox
+from models.detections import ANIMAL_CLASSES, Detections
+from models.schemas import AnimalType
+from services.batch_inference import iter_batched, resolve_batch_size
+from services.inference_executor import InferenceExecutor
+from services.micro_batcher import MicroBatcher
+from services.model_registry import model_registry
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +25,11 @@ class DetectionService:
     
     def __init__(self):
         self.model = None
-        self.class_names = {
-            0: AnimalType.COW,
-            1: AnimalType.BUFFALO
-        }
+        self.model_path = None
         self.confidence_threshold = settings.DETECTION_CONFIDENCE
+        self.batch_size = 1
+        self.executor = InferenceExecutor("detection")
+        self.batcher = None
         self._ready = False
     
     async def initialize(self):
@@ -37,18 +40,33 @@ class DetectionService:
             # Check if custom model exists
             if model_path.exists():
                 logger.info(f"Loading custom model from {model_path}")
-                self.model = YOLO(str(model_path))
+                self.model_path = str(model_path)
             else:
                 logger.warning(f"Custom model not found at {model_path}")
                 logger.info("Loading default YOLOv8 model (use for testing only)")
                 # For testing, use default model (you'll need to train custom one)
-                self.model = YOLO("yolov8n.pt")
+                self.model_path = "yolov8n.pt"
                 logger.warning("⚠️ Using default model - train custom model for production!")
+            self.model = model_registry.get(self.model_path, int8=settings.INT8_ENABLED)
             
             # Warm up the model
             dummy_img = np.zeros((640, 640, 3), dtype=np.uint8)
             self.model(dummy_img, verbose=False)
             
+            # Frames per model call for batched (video/camera) detection
+            self.batch_size = resolve_batch_size(self.model)
+            
+            # Dedicated inference threads for request/stream detection
+            self.executor.start(self._create_worker_model)
+            
+            # Group concurrent single-image requests into batched calls
+            if settings.DETECT_BATCH_WINDOW_MS > 0:
+                self.batcher = MicroBatcher(
+                    self.detect_batch_async,
+                    settings.DETECT_MAX_BATCH_SIZE or self.batch_size,
+                    settings.DETECT_BATCH_WINDOW_MS / 1000.0
+                )
+            
             self._ready = True
             logger.info("✅ Detection service initialized")
             
@@ -60,7 +78,72 @@ class DetectionService:
         """Check if service is ready."""
         return self._ready and self.model is not None
     
-    def detect(self, image: np.ndarray) -> List[AnimalDetection]:
+    def shutdown(self):
+        """Stop the micro-batcher and inference worker threads."""
+        if self.batcher is not None:
+            self.batcher.shutdown()
+        self.executor.shutdown()
+    
+    def _create_worker_model(self):
+        """Model for one inference worker thread, sharing the registry's weights."""
+        return model_registry.instance(self.model_path, int8=settings.INT8_ENABLED)
+    
+    async def detect_async(self, image: np.ndarray) -> Detections:
+        """
+        Detect animals in image on the inference executor.
+        
+        Concurrent calls within DETECT_BATCH_WINDOW_MS share one batched
+        model call. Waits for a free slot when the inference queue is full.
+        
+        Args:
+            image: Input image (BGR format)
+            
+        Returns:
+            Cow/buffalo detections
+            
+        Raises:
+            InferenceBusyError: If no slot frees up within INFERENCE_QUEUE_TIMEOUT
+        """
+        if not self.is_ready():
+            logger.error("Detection service not initialized")
+            return Detections()
+        
+        if self.batcher is not None:
+            return await self.batcher.submit(image)
+        return await self.executor.run(self._detect_with, image)
+    
+    async def detect_batch_async(self, images: List[np.ndarray], conf: Optional[float] = None) -> List[Detections]:
+        """
+        Batched detect_async: one list of detections per image, in input order.
+        
+        Args:
+            images: Input images (BGR format)
+            conf: Minimum confidence (default DETECTION_CONFIDENCE), e.g.
+                  lower for tracking's low-confidence association
+        """
+        if not self.is_ready():
+            logger.error("Detection service not initialized")
+            return [Detections() for _ in images]
+        
+        return await self.executor.run(self._detect_batch_with, images, conf)
+    
+    def submit_batch(self, images: List[np.ndarray], conf: Optional[float] = None) -> Future:
+        """
+        detect_batch_async for background jobs: queue the batch on the
+        inference workers from any thread or event loop.
+        
+        Returns:
+            Future of the detections per image, in input order
+        """
+        if not self.is_ready():
+            logger.error("Detection service not initialized")
+            future = Future()
+            future.set_result([Detections() for _ in images])
+            return future
+        
+        return self.executor.submit(self._detect_batch_with, images, conf)
+    
+    def detect(self, image: np.ndarray) -> Detections:
         """
         Detect animals in image.
         
@@ -68,90 +151,96 @@ class DetectionService:
             image: Input image (BGR format)
             
         Returns:
-            List of AnimalDetection objects
+            Cow/buffalo detections
         """
         if not self.is_ready():
             logger.error("Detection service not initialized")
-            return []
+            return Detections()
         
+        return self._detect_with(self.model, image)
+    
+    def _detect_with(self, model, image: np.ndarray) -> Detections:
+        """Run detection on one image with the given model instance."""
         try:
             # Run inference
-            results = self.model(image, conf=self.confidence_threshold, verbose=False)
-            
-            detections = []
-            
-            for result in results:
-                boxes = result.boxes
-                
-                for box in boxes:
-                    cls_id = int(box.cls[0])
-                    
-                    # Only process cow (0) and buffalo (1)
-                    # Reject all other classes (dog, cat, goat, etc.)
-                    if cls_id not in [0, 1]:
-                        continue
-                    
-                    # Extract bounding box
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    confidence = float(box.conf[0])
-                    
-                    # Create detection object
-                    detection = AnimalDetection(
-                        detection_id=str(uuid.uuid4()),
-                        animal_type=self.class_names.get(cls_id, AnimalType.UNKNOWN),
-                        confidence=confidence,
-                        bounding_box=BoundingBox(
-                            x1=float(x1),
-                            y1=float(y1),
-                            x2=float(x2),
-                            y2=float(y2)
-                        ),
-                        timestamp=datetime.utcnow()
-                    )
-                    
-                    detections.append(detection)
+            results = model(image, conf=self.confidence_threshold, verbose=False)
+            detections = self._parse_result(results[0])
             
             logger.info(f"Detected {len(detections)} animals")
             return detections
             
         except Exception as e:
             logger.error(f"Detection error: {e}")
-            return []
+            return Detections()
     
-    def draw_detections(self, image: np.ndarray, detections: List[AnimalDetection]) -> np.ndarray:
+    def detect_batch(self, images: List[np.ndarray]) -> List[Detections]:
+        """
+        Detect animals in several images with batched model calls.
+        
+        Args:
+            images: Input images (BGR format)
+            
+        Returns:
+            Detections per image, in input order
+        """
+        if not self.is_ready():
+            logger.error("Detection service not initialized")
+            return [Detections() for _ in images]
+        
+        return self._detect_batch_with(self.model, images)
+    
+    def _detect_batch_with(self, model, images: List[np.ndarray], conf: Optional[float] = None) -> List[Detections]:
+        """Run batched detection with the given model instance."""
+        try:
+            batched = iter_batched(
+                model,
+                ((None, image) for image in images),
+                self.batch_size,
+                conf=self.confidence_threshold if conf is None else conf
+            )
+            return [self._parse_result(result) for _, result in batched]
+            
+        except Exception as e:
+            logger.error(f"Batch detection error: {e}")
+            return [Detections() for _ in images]
+    
+    def _parse_result(self, result) -> Detections:
+        """
+        Convert one frame's YOLOv8 result to cow/buffalo detections.
+        
+        Only cow (0) and buffalo (1) are kept; all other classes (dog, cat,
+        goat, etc.) are rejected.
+        """
+        return Detections.from_result(result, ANIMAL_CLASSES)
+    
+    def draw_detections(self, image: np.ndarray, detections: Detections) -> np.ndarray:
         """
         Draw bounding boxes on image.
         
         Args:
             image: Input image
-            detections: List of detections
+            detections: Detections for the image
             
         Returns:
             Annotated image
         """
         annotated = image.copy()
         
-        for det in detections:
-            bbox = det.bounding_box
+        for i, (x1, y1, x2, y2) in enumerate(detections.boxes.astype(int).tolist()):
+            animal_type = detections.animal_type(i)
             
             # Color based on animal type
-            color = (0, 255, 0) if det.animal_type == AnimalType.COW else (255, 0, 0)
+            color = (0, 255, 0) if animal_type == AnimalType.COW else (255, 0, 0)
             
             # Draw rectangle
-            cv2.rectangle(
-                annotated,
-                (int(bbox.x1), int(bbox.y1)),
-                (int(bbox.x2), int(bbox.y2)),
-                color,
-                2
-            )
+            cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
             
             # Draw label
-            label = f"{det.animal_type.value}: {det.confidence:.2f}"
+            label = f"{animal_type.value}: {detections.scores[i]:.2f}"
             cv2.putText(
                 annotated,
                 label,
-                (int(bbox.x1), int(bbox.y1) - 10),
+                (x1, y1 - 10),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 0.5,
                 color,
@@ -0,0 +1,163 @@
+"""In-process nearest-neighbour index of unit vectors with expiring entries."""
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class EmbeddingIndex:
+    """
+    Cosine-similarity index kept as numpy arrays, for a few thousand to a
+    few hundred thousand entries.
+
+    Entries expire `ttl` seconds after they were added. Small indexes are
+    searched brute force with one matrix product. With `partitions`, an
+    IVF-style coarse quantizer is trained once the index holds 8 entries
+    per partition (and retrained whenever it doubles): entries are
+    bucketed by their nearest centroid and a query only scores the
+    buckets of its `probes` nearest centroids.
+    """
+
+    def __init__(self, dim: int, ttl: float, partitions: int = 0, probes: int = 4,
+                 initial_slots: int = 64):
+        """
+        Args:
+            dim: Vector dimension
+            ttl: Seconds an entry stays searchable
+            partitions: IVF partitions, 0 = always brute force
+            probes: Partitions scored per query
+            initial_slots: Slots allocated up front (grows by doubling)
+        """
+        self.dim = dim
+        self.ttl = ttl
+        self.partitions = partitions
+        self.probes = max(1, probes)
+
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.labels = np.zeros(0, dtype=np.int64)
+        self.expires = np.zeros(0, dtype=np.float64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.lists = np.zeros(0, dtype=np.int32)
+        self.keys: List[Optional[Hashable]] = []
+        self._slot_of: Dict[Hashable, int] = {}
+
+        self.centroids: Optional[np.ndarray] = None
+        self._trained_size = 0
+
+        self._grow(initial_slots)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def _grow(self, slots: int):
+        def extend(array: np.ndarray) -> np.ndarray:
+            return np.concatenate([array, np.zeros((slots,) + array.shape[1:], dtype=array.dtype)])
+
+        self.vectors, self.labels, self.expires = extend(self.vectors), extend(self.labels), extend(self.expires)
+        self.alive, self.lists = extend(self.alive), extend(self.lists)
+        self.keys.extend([None] * slots)
+
+    def add(self, keys: Sequence[Hashable], vectors: np.ndarray, labels: np.ndarray, now: float):
+        """Insert or replace entries; labels restrict which entries a query may match."""
+        self.remove(keys)
+        free = np.flatnonzero(~self.alive)
+        if len(free) < len(keys):
+            self._grow(max(len(keys) - len(free), len(self.alive)))
+            free = np.flatnonzero(~self.alive)
+        slots = free[:len(keys)]
+
+        self.vectors[slots] = vectors
+        self.labels[slots] = labels
+        self.expires[slots] = now + self.ttl
+        self.alive[slots] = True
+        for key, slot in zip(keys, slots.tolist()):
+            self.keys[slot] = key
+            self._slot_of[key] = slot
+
+        if self.partitions and len(self) >= max(8 * self.partitions, 2 * self._trained_size):
+            self._train()
+        elif self.centroids is not None:
+            self.lists[slots] = np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def remove(self, keys: Sequence[Hashable]):
+        """Drop entries by key; unknown keys are ignored."""
+        for key in keys:
+            slot = self._slot_of.pop(key, None)
+            if slot is not None:
+                self.alive[slot] = False
+                self.keys[slot] = None
+
+    def evict(self, now: float) -> int:
+        """Drop expired entries; returns how many."""
+        expired = np.flatnonzero(self.alive & (self.expires <= now))
+        self.remove([self.keys[slot] for slot in expired.tolist()])
+        return len(expired)
+
+    def search(self, queries: np.ndarray, labels: np.ndarray,
+               now: float) -> Tuple[List[Optional[Hashable]], np.ndarray]:
+        """
+        Most similar live entry with the same label, per query.
+
+        Returns:
+            Best key per query (None if there is no candidate) and its
+            cosine similarity (-1 if none)
+        """
+        self.evict(now)
+        best = np.full(len(queries), -np.inf, dtype=np.float32)
+        best_slots = np.full(len(queries), -1, dtype=np.int64)
+
+        if len(queries) and len(self):
+            if self.centroids is None:
+                self._score(np.arange(len(queries)), np.flatnonzero(self.alive), queries, labels, best, best_slots)
+            else:
+                # Score each probed partition once, against all queries probing it
+                probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :self.probes]
+                for partition in np.unique(probes).tolist():
+                    rows = np.flatnonzero((probes == partition).any(axis=1))
+                    slots = np.flatnonzero(self.alive & (self.lists == partition))
+                    self._score(rows, slots, queries, labels, best, best_slots)
+
+        found = best_slots >= 0
+        best_keys = [self.keys[slot] if slot >= 0 else None for slot in best_slots.tolist()]
+        return best_keys, np.where(found, best, -1.0).astype(np.float32)
+
+    def _score(self, rows: np.ndarray, slots: np.ndarray, queries: np.ndarray, labels: np.ndarray,
+               best: np.ndarray, best_slots: np.ndarray):
+        """Update the best match of queries[rows] with the given slots, in place."""
+        if not len(rows) or not len(slots):
+            return
+
+        similarity = queries[rows] @ self.vectors[slots].T
+        similarity[labels[rows][:, None] != self.labels[slots][None, :]] = -np.inf
+        top = np.argmax(similarity, axis=1)
+        top_similarity = similarity[np.arange(len(rows)), top]
+
+        better = top_similarity > best[rows]
+        best[rows[better]] = top_similarity[better]
+        best_slots[rows[better]] = slots[top[better]]
+
+    def _train(self, iterations: int = 8, sample_per_partition: int = 64):
+        """Spherical k-means on a sample of the live entries; reassigns every entry."""
+        slots = np.flatnonzero(self.alive)
+        rng = np.random.default_rng(0)
+        sample = self.vectors[rng.choice(slots, min(len(slots), sample_per_partition * self.partitions), replace=False)]
+        centroids = sample[rng.choice(len(sample), self.partitions, replace=False)]
+
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind="stable")
+            used, starts = np.unique(assignment[order], return_index=True)
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            # Empty partitions keep their previous centroid
+            centroids[used] = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        self.centroids = centroids
+        self.lists[slots] = np.argmax(self.vectors[slots] @ centroids.T, axis=1)
+        self._trained_size = len(slots)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self),
+            "slots": len(self.alive),
+            "partitions": 0 if self.centroids is None else len(self.centroids),
+            "bytes": self.vectors.nbytes + self.labels.nbytes + self.expires.nbytes + self.lists.nbytes
+        }
@@ -0,0 +1,194 @@
+"""
+Frame sampler that only decodes the frames it returns.
+
+`cap.read()` on every frame pays for full decode and BGR conversion even for
+frames that are thrown away. The sampler advances with `cap.grab()` and only
+calls `cap.retrieve()` for sampled frames; long gaps can be skipped with a
+seek instead, and a keyframe fast-scan mode jumps between timestamps.
+"""
+import cv2
+import numpy as np
+from typing import Iterator, Sequence, Tuple
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSampler:
+    """
+    Iterate over the sampled frames of a video.
+
+    Frames are numbered from 1, and frame N is sampled when N is a multiple
+    of any of `sample_rates` (the convention used by the video consumers).
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        sample_rates: Sequence[int] = (1,),
+        start_frame: int = 1,
+        end_frame: int = None,
+        seek_threshold: int = None,
+        fast_scan: bool = False,
+        fast_scan_interval: float = None,
+        upload=None
+    ):
+        """
+        Args:
+            video_path: Path to video file
+            sample_rates: Sample every Nth frame for each N given
+            start_frame: First frame (1-based) of the range to sample
+            end_frame: Last frame (inclusive) of the range, None = end of video
+            seek_threshold: Seek instead of grab() when the gap to the next
+                sampled frame exceeds this many frames (0 = never seek)
+            fast_scan: Only decode one frame every `fast_scan_interval`
+                seconds, seeking by timestamp (rough counting)
+            fast_scan_interval: Seconds between fast-scan frames
+            upload: UploadStream still being received; the sampler waits
+                for more data instead of stopping at the end of the file
+        """
+        self.video_path = video_path
+        self.sample_rates = sorted(set(max(1, int(r)) for r in sample_rates))
+        self.start_frame = max(1, start_frame)
+        self.end_frame = end_frame
+        self.seek_threshold = (
+            settings.VIDEO_SEEK_THRESHOLD if seek_threshold is None else seek_threshold
+        )
+        self.fast_scan = fast_scan
+        self.fast_scan_interval = (
+            settings.FAST_SCAN_INTERVAL if fast_scan_interval is None else fast_scan_interval
+        )
+        self.upload = upload
+        self._cap = None
+        self._resumed_complete = False
+
+        # Frames in the video (from the container) and frames advanced over
+        # (decoded or skipped), for progress reporting
+        self.total_frames = 0
+        self.frames_advanced = 0
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the sampled range advanced over so far (0-1)."""
+        end = self.end_frame or self.total_frames
+        span = end - self.start_frame + 1
+        if span <= 0:
+            return 0.0
+        return min(1.0, max(0.0, (self.frames_advanced - self.start_frame + 1) / span))
+
+    def wants(self, frame_index: int) -> bool:
+        """Whether the (1-based) frame index is sampled."""
+        return any(frame_index % rate == 0 for rate in self.sample_rates)
+
+    def next_wanted(self, frame_index: int) -> int:
+        """First sampled frame index after `frame_index`."""
+        return min((frame_index // rate + 1) * rate for rate in self.sample_rates)
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        self._cap = cv2.VideoCapture(self._source_path())
+
+        try:
+            # A growing upload may not be decodable until more has arrived
+            while not self._cap.isOpened() and self._resume(0):
+                pass
+
+            if not self._cap.isOpened():
+                logger.error(f"Failed to open video: {self.video_path}")
+                return
+
+            self.total_frames = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+            if self.fast_scan:
+                yield from self._iter_fast_scan(self._cap)
+            else:
+                yield from self._iter_sampled()
+        finally:
+            self._cap.release()
+
+    def _source_path(self) -> str:
+        return self.upload.current_path if self.upload is not None else self.video_path
+
+    def _resume(self, frame_index: int) -> bool:
+        """
+        Called when reading a growing upload hit the end of the data so far:
+        wait for more, reopen the capture and seek back to `frame_index`.
+
+        Returns:
+            False when there is nothing more to read
+        """
+        upload = self.upload
+        if upload is None or self._resumed_complete:
+            return False
+
+        if not upload.wait_for_data(upload.bytes_received):
+            return False
+        self._resumed_complete = upload.complete
+
+        self._cap.release()
+        self._cap = cv2.VideoCapture(upload.current_path)
+        if self._cap.isOpened() and frame_index:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        return True
+
+    def _iter_sampled(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """grab() every frame, retrieve() only sampled ones; seek over long gaps."""
+        cap = self._cap
+        frame_index = 0
+
+        if self.start_frame > 1:
+            if cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame - 1):
+                frame_index = self.start_frame - 1
+            else:
+                # Backend cannot seek: grab() up to the start of the range
+                while frame_index < self.start_frame - 1 and cap.grab():
+                    frame_index += 1
+
+        while True:
+            target = self.next_wanted(frame_index)
+            if self.end_frame is not None and target > self.end_frame:
+                break
+
+            gap = target - frame_index - 1
+
+            if self.seek_threshold and gap > self.seek_threshold:
+                # Position so that the next grab() lands on the target frame
+                if cap.set(cv2.CAP_PROP_POS_FRAMES, target - 1):
+                    frame_index = target - 1
+
+            if not cap.grab():
+                if self._resume(frame_index):
+                    cap = self._cap
+                    continue
+                break
+
+            frame_index += 1
+            self.frames_advanced = frame_index
+
+            if frame_index != target:
+                continue
+
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+
+            yield frame_index, frame
+
+    def _iter_fast_scan(self, cap) -> Iterator[Tuple[int, np.ndarray]]:
+        """Seek by timestamp to one frame per interval."""
+        fps = cap.get(cv2.CAP_PROP_FPS) or settings.CAMERA_FPS
+        step = max(1, int(round(fps * self.fast_scan_interval)))
+
+        for position in range(0, max(self.total_frames, 1), step):
+            cap.set(cv2.CAP_PROP_POS_MSEC, position * 1000.0 / fps)
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            # POS_FRAMES points past the frame just read (1-based index)
+            frame_index = int(cap.get(cv2.CAP_PROP_POS_FRAMES)) or position + 1
+            self.frames_advanced = frame_index
+
+            yield frame_index, frame
@@ -0,0 +1,93 @@
+"""Reduced-resolution decoding of uploaded images."""
+import struct
+from typing import Optional, Tuple
+import logging
+
+import cv2
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# JPEG DCT scaling factors OpenCV can decode at directly, largest first
+REDUCED_MODES = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+)
+
+# JPEG start-of-frame markers (baseline, progressive, ...) carrying the size
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    (width, height) from a JPEG header without decoding it.
+
+    Returns:
+        None if `data` is not a JPEG or the header is truncated
+    """
+    if data[:2] != b"\xff\xd8":
+        return None
+
+    pos = 2
+    while pos + 9 < len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            # Fill byte
+            pos += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            return width, height
+        segment_length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        pos += 2 + segment_length
+    return None
+
+
+def reduction_factor(width: int, height: int, target_size: int) -> int:
+    """Largest JPEG reduction that keeps the long side at or above target_size."""
+    long_side = max(width, height)
+    for factor, _ in REDUCED_MODES:
+        if long_side // factor >= target_size:
+            return factor
+    return 1
+
+
+def decode_image(data: bytes, target_size: int = None) -> Tuple[Optional[np.ndarray], Tuple[float, float]]:
+    """
+    Decode an uploaded image no larger than the model needs.
+
+    JPEGs are decoded at 1/2, 1/4 or 1/8 scale (libjpeg DCT scaling) when
+    the long side stays at or above `target_size`, since YOLO letterboxes
+    to its input size anyway. Other formats are decoded at full size.
+
+    Args:
+        data: Encoded image bytes
+        target_size: Model input size (settings.MODEL_INPUT_SIZE)
+
+    Returns:
+        (BGR image or None if undecodable, (sx, sy)) where multiplying
+        x/y coordinates by sx/sy maps them back to the full-size image
+    """
+    target_size = target_size or settings.MODEL_INPUT_SIZE
+    buffer = np.frombuffer(data, np.uint8)
+
+    size = jpeg_size(data)
+    factor = reduction_factor(*size, target_size) if size else 1
+    flags = dict(REDUCED_MODES).get(factor, cv2.IMREAD_COLOR)
+
+    image = cv2.imdecode(buffer, flags)
+    if image is None or factor == 1:
+        return image, (1.0, 1.0)
+
+    # EXIF orientation may have swapped the axes relative to the header
+    width, height = size
+    decoded_h, decoded_w = image.shape[:2]
+    if (decoded_w > decoded_h) != (width > height):
+        width, height = height, width
+
+    return image, (width / decoded_w, height / decoded_h)
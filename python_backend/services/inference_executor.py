@@ -0,0 +1,176 @@
+"""Bounded thread-pool executor for model inference."""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import logging
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBusyError(Exception):
+    """Raised when no inference slot frees up within the queue timeout."""
+
+
+class InferenceExecutor:
+    """
+    Runs model calls on dedicated worker threads.
+
+    At most `workers + queue_size` calls are admitted at once; further
+    callers wait for a slot (backpressure) and get InferenceBusyError after
+    `queue_timeout` seconds. Ultralytics predictors are not thread-safe, so
+    every worker thread holds its own model from `model_factory`.
+
+    torch's intra-op thread pool is process-wide, so `torch_threads` is
+    the total all workers share; it is set once when the executor starts.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workers: int = None,
+        queue_size: int = None,
+        torch_threads: int = None,
+        queue_timeout: float = None
+    ):
+        self.name = name
+        self.workers = workers or settings.INFERENCE_WORKERS
+        self.queue_size = settings.INFERENCE_QUEUE_SIZE if queue_size is None else queue_size
+        self.torch_threads = (
+            torch_threads
+            or settings.INFERENCE_TORCH_THREADS
+            or max(self.workers, os.cpu_count() or 1)
+        )
+        self.queue_timeout = (
+            settings.INFERENCE_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        )
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._local = threading.local()
+        self._model_factory: Optional[Callable[[], Any]] = None
+        self._stats_lock = threading.Lock()
+
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_times = deque(maxlen=1000)
+
+    def start(self, model_factory: Callable[[], Any]):
+        """
+        Start the worker threads.
+
+        Args:
+            model_factory: Called once in each worker thread to get its model
+        """
+        self._model_factory = model_factory
+        try:
+            import torch
+            torch.set_num_threads(self.torch_threads)
+        except ImportError:
+            pass
+        self._slots = asyncio.Semaphore(self.workers + self.queue_size)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix=f"{self.name}-inference",
+            initializer=self._init_worker
+        )
+        logger.info(
+            f"{self.name} inference executor: {self.workers} workers, "
+            f"queue {self.queue_size}, {self.torch_threads} torch threads (process-wide)"
+        )
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _init_worker(self):
+        self._local.model = self._model_factory()
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run fn(model, *args) on a worker thread.
+
+        Raises:
+            InferenceBusyError: If the queue stayed full for queue_timeout seconds
+        """
+        if self._pool is None:
+            raise RuntimeError(f"{self.name} inference executor not started")
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self.rejected += 1
+            raise InferenceBusyError(f"{self.name} inference queue is full")
+
+        with self._stats_lock:
+            self.pending += 1
+        submitted = time.perf_counter()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._pool, self._call, submitted, fn, args
+            )
+        finally:
+            with self._stats_lock:
+                self.pending -= 1
+            self._slots.release()
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        """
+        Queue fn(model, *args) on a worker thread from any thread.
+
+        Unlike run(), the call bypasses the admission queue: meant for
+        background jobs that run on their own event loop and keep only a
+        call or two in flight.
+        """
+        if self._pool is None:
+            raise RuntimeError(f"{self.name} inference executor not started")
+
+        with self._stats_lock:
+            self.pending += 1
+        future = self._pool.submit(self._call, time.perf_counter(), fn, args)
+        future.add_done_callback(self._submitted_done)
+        return future
+
+    def _submitted_done(self, future: Future):
+        with self._stats_lock:
+            self.pending -= 1
+
+    def _call(self, submitted: float, fn: Callable[..., Any], args: tuple) -> Any:
+        with self._stats_lock:
+            self._wait_times.append(time.perf_counter() - submitted)
+            self.running += 1
+        try:
+            return fn(self._local.model, *args)
+        finally:
+            with self._stats_lock:
+                self.running -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and queue wait time statistics."""
+        with self._stats_lock:
+            waits = np.array(self._wait_times) * 1000.0
+            return {
+                "workers": self.workers,
+                "torch_threads": self.torch_threads,
+                "queue_capacity": self.queue_size,
+                "queue_depth": self.pending - self.running,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_ms_avg": float(waits.mean()) if waits.size else 0.0,
+                "wait_ms_p95": float(np.percentile(waits, 95)) if waits.size else 0.0,
+                "wait_ms_max": float(waits.max()) if waits.size else 0.0
+            }
@@ -0,0 +1,344 @@
+"""Background job queue for CPU-bound video processing."""
+import asyncio
+import json
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+import logging
+
+from config import settings
+from models.schemas import JobStatus, VideoJob
+from services.upload_service import remove_file
+
+logger = logging.getLogger(__name__)
+
+# Progress callback handed to job handlers: progress(stage, fraction)
+ProgressCallback = Callable[[str, float], None]
+
+# Job handler: async handler(job, progress) -> result dict
+JobHandler = Callable[[VideoJob, ProgressCallback], Awaitable[Dict[str, Any]]]
+
+
+def _json_default(value: Any):
+    """JSON fallback for job records (datetimes, enums, numpy scalars)."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobService:
+    """
+    Bounded background job queue.
+
+    Jobs are persisted to a local SQLite file so queued (and interrupted)
+    jobs are picked up again after a restart. Each job runs its handler on
+    a dedicated worker thread with its own event loop, so CPU-bound video
+    work never blocks the API event loop.
+    """
+
+    def __init__(self):
+        self.workers = settings.JOB_WORKERS
+        self.jobs: Dict[str, VideoJob] = {}
+        self.handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        # Immediate jobs' tasks, referenced until they finish
+        self._immediate: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._ready = False
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the handler that runs jobs of the given kind."""
+        self.handlers[kind] = handler
+
+    async def start(self):
+        """Open the job store, re-queue unfinished jobs and start workers."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=settings.JOB_QUEUE_SIZE)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="video-job"
+        )
+
+        settings.JOBS_DIR.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(settings.JOBS_DIR / "jobs.db"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT, created_at TEXT, data TEXT)"
+        )
+        self._db.commit()
+
+        requeued = self._load_jobs()
+
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(i)))
+
+        self._ready = True
+        logger.info(f"✅ Job service started ({self.workers} workers, {requeued} jobs re-queued)")
+
+    async def stop(self):
+        """Stop workers; unfinished jobs stay persisted for the next start."""
+        self._ready = False
+        for task in self._tasks + list(self._immediate):
+            task.cancel()
+        self._tasks = []
+        self._immediate.clear()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def is_ready(self) -> bool:
+        """Check if service is ready."""
+        return self._ready
+
+    def upload_path(self, filename: Optional[str]) -> Path:
+        """Unique path in the job directory for an uploaded video."""
+        suffix = Path(filename or "").suffix or ".mp4"
+        return settings.JOBS_DIR / f"upload-{uuid.uuid4().hex}{suffix}"
+
+    def submit(
+        self,
+        kind: str,
+        video_path: str,
+        params: Dict[str, Any] = None,
+        immediate: bool = False
+    ) -> VideoJob:
+        """
+        Queue a job.
+
+        Args:
+            kind: Registered handler name
+            video_path: Uploaded video; deleted when the job finishes
+            params: Handler parameters (must be JSON serializable)
+            immediate: Start right away outside the bounded pool, for jobs
+                known to be cheap (e.g. served from the result cache)
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If JOB_QUEUE_SIZE jobs are already waiting
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = VideoJob(
+            job_id=str(uuid.uuid4()),
+            kind=kind,
+            params=params or {},
+            video_path=video_path
+        )
+
+        if immediate:
+            self.jobs[job.job_id] = job
+            self._persist(job)
+            task = asyncio.create_task(self._run(job, executor=None))
+            self._immediate.add(task)
+            task.add_done_callback(self._immediate.discard)
+            return job
+
+        try:
+            self._queue.put_nowait(job.job_id)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({settings.JOB_QUEUE_SIZE} jobs waiting)")
+
+        self.jobs[job.job_id] = job
+        self._persist(job)
+        logger.info(f"Queued {kind} job {job.job_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        """Get a job by ID."""
+        return self.jobs.get(job_id)
+
+    def list_jobs(self, limit: int = 50) -> List[VideoJob]:
+        """Most recent jobs first."""
+        jobs = sorted(self.jobs.values(), key=lambda j: j.created_at, reverse=True)
+        return jobs[:limit]
+
+    async def wait(self, job_id: str) -> VideoJob:
+        """Wait until the job has finished and return it."""
+        async for job in self.subscribe(job_id):
+            if job.is_finished:
+                return job
+        return self.jobs[job_id]
+
+    async def subscribe(self, job_id: str):
+        """
+        Async iterator of job snapshots: the current state, then one
+        snapshot per status or progress change until the job finishes.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+
+        updates: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(updates)
+
+        try:
+            yield job.copy()
+            while not job.is_finished:
+                job = await updates.get()
+                yield job
+        finally:
+            self._subscribers[job_id].remove(updates)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    # ==================== WORKERS ====================
+
+    async def _worker(self, index: int):
+        """Take job IDs off the queue and run them on the executor."""
+        while True:
+            job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+
+            try:
+                if job is not None and not job.is_finished:
+                    await self._run(job, self._executor)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {index} error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: VideoJob, executor: Optional[ThreadPoolExecutor]):
+        """
+        Run one job's handler off the event loop and record the outcome.
+
+        `executor` None runs on the event loop's default thread pool.
+        """
+        handler = self.handlers[job.kind]
+
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        job.progress = {}
+        job.result = None
+        self._persist(job)
+        self._publish(job)
+
+        def progress(stage: str, fraction: float):
+            # Called from the worker thread; publish at most once per 1%
+            fraction = round(min(1.0, max(0.0, fraction)), 2)
+            if job.progress.get(stage) == fraction:
+                return
+            job.progress = {**job.progress, stage: fraction}
+            self._loop.call_soon_threadsafe(self._publish, job)
+
+        try:
+            result = await self._loop.run_in_executor(
+                executor,
+                lambda: asyncio.run(handler(job, progress))
+            )
+            job.result = result
+            job.status = JobStatus.COMPLETED
+            logger.info(f"Job {job.job_id} completed")
+        except asyncio.CancelledError:
+            # Shutting down: the job stays persisted as running and is
+            # re-queued on the next start
+            raise
+        except Exception as e:
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            logger.error(f"Job {job.job_id} failed: {e}")
+
+        job.finished_at = datetime.utcnow()
+        self._cleanup_files(job)
+        self._persist(job)
+        self._publish(job)
+
+    def _publish(self, job: VideoJob):
+        """Send a job snapshot to websocket/wait subscribers."""
+        subscribers = self._subscribers.get(job.job_id)
+        if not subscribers:
+            return
+        snapshot = job.copy(deep=True)
+        for updates in subscribers:
+            updates.put_nowait(snapshot)
+
+    def _cleanup_files(self, job: VideoJob):
+        """Delete the uploaded video (and any partial upload) once the job has finished."""
+        if job.video_path:
+            remove_file(job.video_path)
+            remove_file(f"{job.video_path}.part")
+
+    # ==================== PERSISTENCE ====================
+
+    def _persist(self, job: VideoJob):
+        """Write the job to the local job store."""
+        if self._db is None:
+            return
+
+        data = json.dumps(job.dict(), default=_json_default)
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                (job.job_id, job.status.value, job.created_at.isoformat(), data)
+            )
+            self._db.commit()
+
+    def _load_jobs(self) -> int:
+        """
+        Load persisted jobs, drop finished ones past JOB_RETENTION_HOURS and
+        re-queue jobs that were queued or running when the process stopped.
+
+        Returns:
+            Number of re-queued jobs
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=settings.JOB_RETENTION_HOURS)
+        expired = []
+        requeued = 0
+
+        with self._db_lock:
+            rows = self._db.execute("SELECT data FROM jobs ORDER BY created_at").fetchall()
+
+        for (data,) in rows:
+            try:
+                job = VideoJob.parse_raw(data)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable job record: {e}")
+                continue
+
+            if job.is_finished:
+                if job.finished_at and job.finished_at < cutoff:
+                    expired.append(job.job_id)
+                    continue
+            elif job.kind in self.handlers and not self._queue.full():
+                job.status = JobStatus.QUEUED
+                job.progress = {}
+                self._queue.put_nowait(job.job_id)
+                requeued += 1
+            else:
+                job.status = JobStatus.FAILED
+                job.error = "Job could not be resumed after restart"
+                job.finished_at = datetime.utcnow()
+                self._cleanup_files(job)
+                self._persist(job)
+
+            self.jobs[job.job_id] = job
+
+        if expired:
+            with self._db_lock:
+                self._db.executemany("DELETE FROM jobs WHERE job_id = ?", [(j,) for j in expired])
+                self._db.commit()
+
+        return requeued
@@ -0,0 +1,107 @@
+"""Constant-velocity Kalman filter over many boxes at once."""
+from typing import Optional
+
+import numpy as np
+
+# Process noise per frame, relative to box size (as in ByteTrack)
+STD_POSITION = 1.0 / 20
+STD_VELOCITY = 1.0 / 160
+
+
+def _xyxy_to_cxcywh(boxes: np.ndarray) -> np.ndarray:
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    wh = boxes[:, 2:] - boxes[:, :2]
+    return np.hstack([boxes[:, :2] + wh / 2, wh])
+
+
+class BoxKalmanFilter:
+    """
+    Kalman filters for all tracks of a tracker, stored as stacked arrays.
+
+    Row i holds the state (cx, cy, w, h and their velocities per frame)
+    and covariance of one track; predict and update run on all rows with
+    batched numpy operations instead of one filter object per track.
+    """
+
+    def __init__(self):
+        # Constant-velocity transition and position-only measurement
+        self._F = np.eye(8)
+        self._F[:4, 4:] = np.eye(4)
+        self._H = np.eye(4, 8)
+
+        self.mean = np.zeros((0, 8))
+        self.covariance = np.zeros((0, 8, 8))
+
+    def __len__(self) -> int:
+        return len(self.mean)
+
+    def _size_std(self, sizes: np.ndarray, factor: float) -> np.ndarray:
+        """(N, 4) standard deviations scaled by box width (x, w) and height (y, h)."""
+        w, h = np.maximum(sizes[:, 0], 1.0), np.maximum(sizes[:, 1], 1.0)
+        return factor * np.stack([w, h, w, h], axis=1)
+
+    def add(self, boxes: np.ndarray):
+        """Append rows for new tracks, starting at rest at the given xyxy boxes."""
+        measured = _xyxy_to_cxcywh(boxes)
+        mean = np.hstack([measured, np.zeros_like(measured)])
+
+        std = np.hstack([
+            self._size_std(measured[:, 2:], 2 * STD_POSITION),
+            self._size_std(measured[:, 2:], 10 * STD_VELOCITY)
+        ])
+        covariance = np.zeros((len(measured), 8, 8))
+        covariance[:, np.arange(8), np.arange(8)] = std ** 2
+
+        self.mean = np.vstack([self.mean, mean])
+        self.covariance = np.concatenate([self.covariance, covariance])
+
+    def keep(self, mask: np.ndarray):
+        """Drop the rows where mask is False."""
+        self.mean = self.mean[mask]
+        self.covariance = self.covariance[mask]
+
+    def predict(self):
+        """Advance every row by one frame."""
+        if not len(self.mean):
+            return
+
+        std = np.hstack([
+            self._size_std(self.mean[:, 2:4], STD_POSITION),
+            self._size_std(self.mean[:, 2:4], STD_VELOCITY)
+        ])
+        self.mean = self.mean @ self._F.T
+        self.covariance = self._F @ self.covariance @ self._F.T
+        self.covariance[:, np.arange(8), np.arange(8)] += std ** 2
+
+        # Keep boxes from collapsing when size velocities overshoot
+        self.mean[:, 2:4] = np.maximum(self.mean[:, 2:4], 1.0)
+
+    def update(self, rows: np.ndarray, boxes: np.ndarray):
+        """
+        Correct the given rows with measured xyxy boxes.
+
+        Args:
+            rows: (K,) row indices
+            boxes: (K, 4) boxes measured for those rows
+        """
+        if not len(rows):
+            return
+
+        mean, covariance = self.mean[rows], self.covariance[rows]
+        measured = _xyxy_to_cxcywh(boxes)
+
+        # Innovation covariance S = H P H^T + R, gain K = P H^T S^-1
+        std = self._size_std(mean[:, 2:4], STD_POSITION)
+        projected_cov = covariance[:, :4, :4].copy()
+        projected_cov[:, np.arange(4), np.arange(4)] += std ** 2
+        gain = np.linalg.solve(projected_cov, covariance[:, :4, :]).transpose(0, 2, 1)
+
+        innovation = measured - mean[:, :4]
+        self.mean[rows] = mean + np.einsum("kij,kj->ki", gain, innovation)
+        self.covariance[rows] = covariance - gain @ covariance[:, :4, :]
+
+    def boxes(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """(N, 4) xyxy boxes of the current state."""
+        mean = self.mean if rows is None else self.mean[rows]
+        half = mean[:, 2:4] / 2
+        return np.hstack([mean[:, :2] - half, mean[:, :2] + half]).astype(np.float32)
@@ -1,16 +1,16 @@
 """Lameness detection service using pose estimation and gait analysis."""
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 import logging
 from pathlib import Path
 import pickle
-from sklearn.ensemble import RandomForestClassifier
 from datetime import datetime
 
 from config import settings
 from models.schemas import LamenessStatus, LamenessLevel, GaitFeatures
+from services.batch_inference import iter_batched, resolve_batch_size
+from services.model_registry import model_registry
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,7 @@ class LamenessService:
     
     def __init__(self):
         self.pose_model = None
+        self.pose_model_path = None
         self.lameness_classifier = None
         self._ready = False
         
@@ -44,10 +45,11 @@ class LamenessService:
             
             if pose_model_path.exists():
                 logger.info(f"Loading pose model from {pose_model_path}")
-                self.pose_model = YOLO(str(pose_model_path))
+                self.pose_model_path = str(pose_model_path)
             else:
                 logger.info("Loading default YOLOv8-Pose model")
-                self.pose_model = YOLO("yolov8n-pose.pt")
+                self.pose_model_path = "yolov8n-pose.pt"
+            self.pose_model = model_registry.get(self.pose_model_path)
             
             # Load lameness classifier
             classifier_path = settings.MODELS_DIR / settings.LAMENESS_MODEL
@@ -71,19 +73,24 @@ class LamenessService:
         """Check if service is ready."""
         return self._ready and self.pose_model is not None
     
-    async def analyze_gait(self, video_path: str) -> LamenessStatus:
+    async def analyze_gait(
+        self,
+        video_path: str,
+        progress: Optional[Callable[[str, float], None]] = None
+    ) -> LamenessStatus:
         """
         Analyze gait from video and detect lameness.
         
         Args:
             video_path: Path to video showing animal walking
+            progress: Optional callback, called as progress("pose", fraction)
             
         Returns:
             LamenessStatus object
         """
         try:
             # Extract gait features from video
-            gait_features = self._extract_gait_features(video_path)
+            gait_features = self._extract_gait_features(video_path, progress)
             
             if gait_features is None:
                 return LamenessStatus(
@@ -126,7 +133,11 @@ class LamenessService:
                 )
             )
     
-    def _extract_gait_features(self, video_path: str) -> Optional[GaitFeatures]:
+    def _extract_gait_features(
+        self,
+        video_path: str,
+        progress: Optional[Callable[[str, float], None]] = None
+    ) -> Optional[GaitFeatures]:
         """
         Extract gait features from video.
         
@@ -138,6 +149,7 @@ class LamenessService:
         
         Args:
             video_path: Path to video
+            progress: Optional progress callback
             
         Returns:
             GaitFeatures object or None
@@ -154,20 +166,29 @@ class LamenessService:
         # Storage for keypoints across frames
         all_keypoints = []
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Run pose detection
-            results = self.pose_model(frame, verbose=False)
-            
-            for result in results:
+        def frames():
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield None, frame
+        
+        # Own predictor over the shared weights: gait jobs run concurrently
+        pose_model = model_registry.instance(self.pose_model_path)
+        
+        # Run pose detection in batches of frames
+        try:
+            for frame_index, (_, result) in enumerate(iter_batched(
+                pose_model, frames(), resolve_batch_size(pose_model)
+            ), 1):
+                if progress and total_frames > 0:
+                    progress("pose", frame_index / total_frames)
+                
                 if result.keypoints is not None:
                     keypoints = result.keypoints.xy[0].cpu().numpy()
                     all_keypoints.append(keypoints)
-        
-        cap.release()
+        finally:
+            cap.release()
         
         if len(all_keypoints) < 10:
             logger.warning("Insufficient keypoints detected")
@@ -1,13 +1,14 @@
 """Milking status detection service."""
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from typing import Optional
+from typing import Optional, Tuple
 import logging
 from pathlib import Path
 
 from config import settings
 from models.schemas import MilkingStatus, MilkingStatusEnum, UdderDetection, BoundingBox
+from services.inference_executor import InferenceExecutor
+from services.model_registry import model_registry
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +24,9 @@ class MilkingService:
     
     def __init__(self):
         self.udder_model = None
+        self.model_path = None
         self.udder_size_threshold = 5000  # pixels, adjust based on camera distance
+        self.executor = InferenceExecutor("milking")
         self._ready = False
     
     async def initialize(self):
@@ -33,7 +36,11 @@ class MilkingService:
             
             if model_path.exists():
                 logger.info(f"Loading udder model from {model_path}")
-                self.udder_model = YOLO(str(model_path))
+                self.model_path = str(model_path)
+                self.udder_model = model_registry.get(self.model_path, int8=settings.INT8_ENABLED)
+                
+                # Dedicated inference threads for request detection
+                self.executor.start(self._create_worker_model)
             else:
                 logger.warning(f"Udder model not found at {model_path}")
                 logger.info("Creating placeholder for udder detection")
@@ -51,19 +58,55 @@ class MilkingService:
         """Check if service is ready."""
         return self._ready
     
-    def detect_milking_status(self, image: np.ndarray) -> MilkingStatus:
+    def shutdown(self):
+        """Stop the inference worker threads."""
+        self.executor.shutdown()
+    
+    def _create_worker_model(self):
+        """Model for one inference worker thread, sharing the registry's weights."""
+        return model_registry.instance(self.model_path, int8=settings.INT8_ENABLED)
+    
+    async def detect_milking_status_async(
+        self,
+        image: np.ndarray,
+        scale: Tuple[float, float] = (1.0, 1.0)
+    ) -> MilkingStatus:
+        """
+        detect_milking_status on the inference executor.
+        
+        Waits for a free slot when the inference queue is full.
+        
+        Raises:
+            InferenceBusyError: If no slot frees up within INFERENCE_QUEUE_TIMEOUT
+        """
+        if self.udder_model is None:
+            return self.detect_milking_status(image, scale)
+        return await self.executor.run(self._detect_milking_status_with, image, scale)
+    
+    def _detect_milking_status_with(self, model, image: np.ndarray, scale: Tuple[float, float]) -> MilkingStatus:
+        return self.detect_milking_status(image, scale, model)
+    
+    def detect_milking_status(
+        self,
+        image: np.ndarray,
+        scale: Tuple[float, float] = (1.0, 1.0),
+        model=None
+    ) -> MilkingStatus:
         """
         Detect if animal is milking (lactating) or dry.
         
         Args:
             image: Input image showing the animal
+            scale: (sx, sy) from a reduced-resolution decode; boxes and udder
+                size are reported in full-size image coordinates
+            model: Udder model to use (default the shared one)
             
         Returns:
             MilkingStatus object
         """
         try:
             # Method 1: Udder detection and size analysis
-            udder_detection = self._detect_udder(image)
+            udder_detection = self._detect_udder(image, scale, model)
             
             # Determine status based on udder
             if udder_detection.detected:
@@ -98,17 +141,21 @@ class MilkingService:
                 confidence=0.0
             )
     
-    def _detect_udder(self, image: np.ndarray) -> UdderDetection:
+    def _detect_udder(self, image: np.ndarray, scale: Tuple[float, float] = (1.0, 1.0),
+                      model=None) -> UdderDetection:
         """
         Detect udder in image.
         
         Args:
             image: Input image
+            scale: (sx, sy) mapping image coordinates to the full-size image
+            model: Udder model to use (default the shared one)
             
         Returns:
             UdderDetection object
         """
-        if self.udder_model is None:
+        model = model or self.udder_model
+        if model is None:
             # Placeholder when model not available
             return UdderDetection(
                 detected=False,
@@ -117,7 +164,7 @@ class MilkingService:
         
         try:
             # Run udder detection
-            results = self.udder_model(image, conf=0.5, verbose=False)
+            results = model(image, conf=0.5, verbose=False)
             
             for result in results:
                 boxes = result.boxes
@@ -125,7 +172,7 @@ class MilkingService:
                 if len(boxes) > 0:
                     # Get first (highest confidence) detection
                     box = boxes[0]
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy() * np.array(scale * 2)
                     confidence = float(box.conf[0])
                     
                     # Calculate udder size
@@ -0,0 +1,120 @@
+"""
+Pluggable CPU inference backends for the YOLOv8 models.
+
+Weights are exported once per weights version to ONNX or OpenVINO and
+cached in EXPORT_DIR. Ultralytics serves exported models through the same
+predict()/Results interface as PyTorch, so callers do not change. PyTorch
+is used whenever the backend runtime is missing or the export fails.
+"""
+import importlib.util
+import shutil
+from pathlib import Path
+from typing import Any
+import logging
+
+from config import settings
+from services.result_cache import weights_version
+
+logger = logging.getLogger(__name__)
+
+# Packages each backend needs at runtime
+BACKEND_PACKAGES = {
+    "pytorch": ("torch",),
+    "onnx": ("onnx", "onnxruntime"),
+    "openvino": ("openvino",)
+}
+
+# Suffix of the exported artifact (OpenVINO exports a directory)
+EXPORT_SUFFIXES = {
+    "onnx": ".onnx",
+    "openvino": "_openvino_model"
+}
+
+
+def backend_available(backend: str) -> bool:
+    """Whether the packages a backend needs are installed."""
+    packages = BACKEND_PACKAGES.get(backend)
+    if packages is None:
+        return False
+    return all(importlib.util.find_spec(name) is not None for name in packages)
+
+
+def exported_path(weights: str, backend: str) -> Path:
+    """Cache location of the exported artifact for a weights file."""
+    stem = Path(weights).stem
+    return settings.EXPORT_DIR / f"{stem}-{weights_version(weights)}{EXPORT_SUFFIXES[backend]}"
+
+
+def export_model(model: Any, weights: str, backend: str) -> Path:
+    """
+    Export a loaded PyTorch model, reusing a cached export when present.
+
+    Args:
+        model: Ultralytics YOLO model loaded from `weights`
+        weights: Path of the .pt weights on disk
+        backend: "onnx" or "openvino"
+
+    Returns:
+        Path of the exported model file (ONNX) or directory (OpenVINO)
+    """
+    target = exported_path(weights, backend)
+    if target.exists():
+        return target
+
+    logger.info(f"Exporting {weights} to {backend} (first load only)")
+    # Dynamic input shapes keep batched inference working
+    exported = Path(model.export(format=backend, dynamic=True, verbose=False))
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(exported), str(target))
+    logger.info(f"Cached {backend} model at {target}")
+    return target
+
+
+def load_model(weights: str, backend: str = None, int8: bool = False) -> Any:
+    """
+    Load YOLOv8 weights on the configured inference backend.
+
+    Args:
+        weights: .pt weights path (or a name Ultralytics downloads)
+        backend: "pytorch", "onnx" or "openvino" (settings.INFERENCE_BACKEND)
+        int8: Prefer a calibrated INT8 ONNX model when it passes the
+            accuracy check (see services.quantization)
+
+    Returns:
+        Ultralytics YOLO model
+    """
+    from ultralytics import YOLO
+
+    backend = (backend or settings.INFERENCE_BACKEND).lower()
+    model = YOLO(weights)
+
+    if int8:
+        from services.quantization import resolve_int8_model
+        try:
+            int8_path = resolve_int8_model(model, model.ckpt_path or weights)
+            if int8_path:
+                return YOLO(int8_path, task=model.task)
+        except Exception as e:
+            logger.warning(f"INT8 quantization failed for {weights}, using FP32: {e}")
+
+    if backend == "pytorch":
+        return model
+
+    if backend not in EXPORT_SUFFIXES:
+        logger.warning(f"Unknown inference backend '{backend}', using PyTorch")
+        return model
+
+    if not backend_available(backend):
+        logger.warning(
+            f"{backend} backend requested but {', '.join(BACKEND_PACKAGES[backend])} "
+            f"not installed, using PyTorch for {weights}"
+        )
+        return model
+
+    try:
+        artifact = export_model(model, model.ckpt_path or weights, backend)
+        return YOLO(str(artifact), task=model.task)
+    except Exception as e:
+        logger.warning(f"{backend} export/load failed for {weights}, using PyTorch: {e}")
+        return model
@@ -0,0 +1,171 @@
+"""Process-wide registry of loaded YOLOv8 models."""
+import copy
+import gc
+import os
+import resource
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+
+from config import settings
+from services.model_backends import load_model
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Peak RSS (KiB on Linux) where /proc is not available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _weights_bytes(model: Any) -> int:
+    """Size of a PyTorch model's parameters and buffers (0 for exported models)."""
+    module = getattr(model, "model", None)
+    if module is None or isinstance(module, (str, Path)):
+        return 0
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class _Entry:
+    """One loaded weights file."""
+
+    def __init__(self, weights: str, backend: str, int8: bool):
+        self.weights = weights
+        self.backend = backend
+        self.int8 = int8
+        self.model: Any = None
+        self.lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+        self.load_seconds = 0.0
+        self.rss_delta_bytes = 0
+        self.weights_bytes = 0
+        self.instances = 0
+
+
+class ModelRegistry:
+    """
+    Loads each weights file once and shares it between services.
+
+    Models are loaded lazily on the first `get`. Ultralytics predictors
+    are not thread-safe, so code running inference concurrently on other
+    threads uses `instance`, which shares the loaded PyTorch weights but
+    has its own predictor.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str, bool], _Entry] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, weights: str, int8: bool) -> _Entry:
+        weights = str(weights)
+        key = (weights, settings.INFERENCE_BACKEND.lower(), int8)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = _Entry(*key)
+            return self._entries[key]
+
+    def get(self, weights: str, int8: bool = False) -> Any:
+        """
+        The shared model for a weights file, loading it on first use.
+
+        Args:
+            weights: Weights path (or a name Ultralytics downloads)
+            int8: Prefer the validated INT8 model (see services.quantization)
+        """
+        entry = self._entry(weights, int8)
+        if entry.model is not None:
+            return entry.model
+
+        with entry.lock:
+            if entry.model is None:
+                rss_before = _rss_bytes()
+                start = time.perf_counter()
+
+                model = load_model(entry.weights, int8=int8)
+                # Fuse conv+bn once here so instances never fuse concurrently
+                if _weights_bytes(model):
+                    model.fuse()
+
+                entry.load_seconds = time.perf_counter() - start
+                entry.rss_delta_bytes = max(0, _rss_bytes() - rss_before)
+                entry.weights_bytes = _weights_bytes(model)
+                entry.loaded_at = time.time()
+                entry.model = model
+                logger.info(
+                    f"Loaded {entry.weights} ({entry.backend}{', int8' if int8 else ''}) "
+                    f"in {entry.load_seconds:.1f}s, +{entry.rss_delta_bytes / 1e6:.0f} MB resident"
+                )
+        return entry.model
+
+    def instance(self, weights: str, int8: bool = False) -> Any:
+        """
+        A model for use on one thread, sharing the registry's weights.
+
+        PyTorch weights are shared; exported backends (ONNX/OpenVINO) open
+        their own runtime session per instance on first predict.
+        """
+        shared = self.get(weights, int8)
+        entry = self._entry(weights, int8)
+        entry.instances += 1
+
+        view = copy.copy(shared)
+        view.predictor = None
+        return view
+
+    def preload(self, models: Iterable[Tuple[str, bool]]):
+        """
+        Load models now, e.g. in the parent process before forking workers.
+
+        Freezes the garbage collector afterwards so forked workers keep
+        sharing the model pages copy-on-write.
+        """
+        for weights, int8 in models:
+            try:
+                self.get(weights, int8)
+            except Exception as e:
+                logger.error(f"Failed to preload {weights}: {e}")
+        gc.freeze()
+
+    def stats(self) -> Dict[str, Any]:
+        """Load time and resident memory per model."""
+        return {
+            "process_rss_bytes": _rss_bytes(),
+            "models": [
+                {
+                    "weights": entry.weights,
+                    "backend": entry.backend,
+                    "int8": entry.int8,
+                    "loaded": entry.model is not None,
+                    "load_seconds": entry.load_seconds,
+                    "rss_delta_bytes": entry.rss_delta_bytes,
+                    "weights_bytes": entry.weights_bytes,
+                    "instances": entry.instances
+                }
+                for entry in list(self._entries.values())
+            ]
+        }
+
+
+# Shared by all services in this process
+model_registry = ModelRegistry()
+
+
+def default_model_paths() -> Dict[str, Optional[str]]:
+    """Weights the detection, milking and lameness services load (None = no model)."""
+    def resolve(name: str, fallback: Optional[str]) -> Optional[str]:
+        path = settings.MODELS_DIR / name
+        return str(path) if path.exists() else fallback
+
+    return {
+        "detection": resolve(settings.COW_BUFFALO_MODEL, "yolov8n.pt"),
+        "udder": resolve(settings.UDDER_MODEL, None),
+        "pose": resolve(settings.POSE_MODEL, "yolov8n-pose.pt")
+    }
@@ -0,0 +1,244 @@
+"""
+INT8 post-training quantization of the YOLOv8 detectors.
+
+The FP32 ONNX export is statically quantized with ONNX Runtime, calibrated
+on sample frames from INT8_CALIBRATION_DIR. Before the INT8 model is used
+it is compared against FP32 on the same frames; if box agreement drops
+below INT8_MIN_AGREEMENT the FP32 model is kept. The outcome (speedup and
+accuracy delta) is written next to the quantized model and reused on later
+starts.
+"""
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+
+import cv2
+import numpy as np
+
+from config import settings
+from models.detections import iou_matrix
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Latest report per weights file, for the stats endpoint
+_reports: Dict[str, Dict[str, Any]] = {}
+
+
+def int8_reports() -> Dict[str, Dict[str, Any]]:
+    """Quantization reports of the models loaded in this process."""
+    return dict(_reports)
+
+
+def load_calibration_images(folder: Path = None, limit: int = None) -> List[np.ndarray]:
+    """Read up to `limit` BGR images from the calibration folder."""
+    folder = Path(folder or settings.INT8_CALIBRATION_DIR)
+    limit = limit or settings.INT8_CALIBRATION_IMAGES
+    if not folder.is_dir():
+        return []
+
+    images = []
+    for path in sorted(folder.iterdir()):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        image = cv2.imread(str(path))
+        if image is not None:
+            images.append(image)
+        if len(images) >= limit:
+            break
+    return images
+
+
+def letterbox(image: np.ndarray, size: int = 640) -> np.ndarray:
+    """
+    Model input tensor (1, 3, size, size) preprocessed as Ultralytics does:
+    aspect-preserving resize, grey (114) padding, BGR->RGB, scaled to [0, 1].
+    """
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = int(round(w * scale)), int(round(h * scale))
+
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - new_h) // 2, (size - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = cv2.resize(
+        image, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+
+    tensor = canvas[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+    return np.ascontiguousarray(tensor)
+
+
+def quantize_onnx(fp32_path: Path, int8_path: Path, images: List[np.ndarray], imgsz: int = 640):
+    """
+    Statically quantize an ONNX model to INT8 (QDQ format).
+
+    Args:
+        fp32_path: FP32 ONNX export
+        int8_path: Output path
+        images: Calibration frames (BGR)
+        imgsz: Model input size
+    """
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    )
+
+    input_name = onnx.load(str(fp32_path), load_external_data=False).graph.input[0].name
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self._frames: Iterator[np.ndarray] = iter(images)
+
+        def get_next(self):
+            frame = next(self._frames, None)
+            return None if frame is None else {input_name: letterbox(frame, imgsz)}
+
+    quantize_static(
+        str(fp32_path),
+        str(int8_path),
+        FrameReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True
+    )
+
+    # Keep the Ultralytics metadata (class names, stride, task) on the INT8 model
+    source = onnx.load(str(fp32_path))
+    quantized = onnx.load(str(int8_path))
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(source.metadata_props)
+    onnx.save(quantized, str(int8_path))
+
+
+def box_agreement(reference: np.ndarray, candidate: np.ndarray, iou_threshold: float = 0.5) -> Dict[str, float]:
+    """
+    Match candidate boxes to reference boxes of the same class.
+
+    Args:
+        reference, candidate: (N, 6) arrays of x1, y1, x2, y2, confidence, class
+
+    Returns:
+        Matched count, box counts and the summed IoU of the matches
+    """
+    if not len(reference) or not len(candidate):
+        return {"matched": 0, "reference": len(reference), "candidate": len(candidate), "iou_sum": 0.0}
+
+    iou = iou_matrix(reference, candidate)
+    iou[reference[:, None, 5] != candidate[None, :, 5]] = 0.0
+
+    # Greedy one-to-one matching, best overlaps first
+    matched, iou_sum = 0, 0.0
+    for flat in np.argsort(iou, axis=None)[::-1]:
+        i, j = np.unravel_index(flat, iou.shape)
+        if iou[i, j] < iou_threshold:
+            break
+        matched += 1
+        iou_sum += float(iou[i, j])
+        iou[i, :] = 0.0
+        iou[:, j] = 0.0
+
+    return {"matched": matched, "reference": len(reference), "candidate": len(candidate), "iou_sum": iou_sum}
+
+
+def compare_models(fp32_model: Any, int8_model: Any, images: List[np.ndarray]) -> Dict[str, Any]:
+    """
+    Accuracy and latency of the INT8 model relative to FP32 on `images`.
+
+    Agreement is the F1 score of INT8 boxes against FP32 boxes (same class,
+    IoU >= 0.5), i.e. 1.0 when both models find the same animals.
+    """
+    totals = {"matched": 0, "reference": 0, "candidate": 0, "iou_sum": 0.0}
+    fp32_time = int8_time = 0.0
+    conf = settings.DETECTION_CONFIDENCE
+
+    for image in images:
+        start = time.perf_counter()
+        reference = fp32_model(image, conf=conf, verbose=False)[0].boxes.data.cpu().numpy()
+        fp32_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        candidate = int8_model(image, conf=conf, verbose=False)[0].boxes.data.cpu().numpy()
+        int8_time += time.perf_counter() - start
+
+        for key, value in box_agreement(reference, candidate).items():
+            totals[key] += value
+
+    boxes = totals["reference"] + totals["candidate"]
+    agreement = 2.0 * totals["matched"] / boxes if boxes else 1.0
+
+    return {
+        "images": len(images),
+        "agreement": agreement,
+        "accuracy_delta": agreement - 1.0,
+        "mean_iou": totals["iou_sum"] / totals["matched"] if totals["matched"] else 0.0,
+        "fp32_ms": fp32_time / max(1, len(images)) * 1000.0,
+        "int8_ms": int8_time / max(1, len(images)) * 1000.0,
+        "speedup": fp32_time / int8_time if int8_time else 0.0
+    }
+
+
+def resolve_int8_model(model: Any, weights: str) -> Optional[str]:
+    """
+    Path of a validated INT8 ONNX model for `weights`, quantizing on first use.
+
+    Args:
+        model: FP32 PyTorch YOLO model loaded from `weights`
+        weights: .pt weights path
+
+    Returns:
+        The INT8 model path, or None to keep FP32 (no calibration frames,
+        missing runtime or failed accuracy check)
+    """
+    from ultralytics import YOLO
+    from services.model_backends import backend_available, export_model, exported_path
+
+    if not backend_available("onnx"):
+        logger.warning("INT8 mode needs onnx and onnxruntime installed, using FP32")
+        return None
+
+    int8_path = exported_path(weights, "onnx").with_suffix(".int8.onnx")
+    report_path = int8_path.with_suffix(".json")
+
+    if report_path.exists():
+        report = json.loads(report_path.read_text())
+    else:
+        images = load_calibration_images()
+        if not images:
+            logger.warning(
+                f"No calibration images in {settings.INT8_CALIBRATION_DIR}, "
+                f"keeping FP32 for {weights}"
+            )
+            return None
+
+        fp32_path = export_model(model, weights, "onnx")
+        logger.info(f"Quantizing {weights} to INT8 on {len(images)} calibration frames")
+        quantize_onnx(fp32_path, int8_path, images)
+
+        report = compare_models(
+            YOLO(str(fp32_path), task=model.task),
+            YOLO(str(int8_path), task=model.task),
+            images
+        )
+        report_path.write_text(json.dumps(report, indent=2))
+
+    # Re-checked on every start so a changed threshold takes effect
+    report["min_agreement"] = settings.INT8_MIN_AGREEMENT
+    report["passed"] = report["agreement"] >= settings.INT8_MIN_AGREEMENT
+    _reports[str(weights)] = report
+
+    if not report["passed"] or not int8_path.exists():
+        logger.warning(
+            f"INT8 {Path(weights).name} rejected: agreement {report['agreement']:.3f} "
+            f"< {report['min_agreement']:.3f}, using FP32"
+        )
+        return None
+
+    logger.info(
+        f"Using INT8 {Path(weights).name}: {report['speedup']:.2f}x faster, "
+        f"agreement {report['agreement']:.3f} (delta {report['accuracy_delta']:+.3f})"
+    )
+    return str(int8_path)
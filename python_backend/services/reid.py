@@ -0,0 +1,161 @@
+"""Re-identification of animals across cameras and long occlusions."""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from models.schemas import AnimalType
+from services.appearance import EMBEDDING_DIM, appearance_embeddings, crop_batch
+from services.embedding_index import EmbeddingIndex
+
+logger = logging.getLogger(__name__)
+
+# Index labels, so only animals of the same type are relinked
+_TYPE_LABELS = {animal_type.value: label for label, animal_type in enumerate(AnimalType)}
+
+
+class _ActiveTrack:
+    """Animal ID and running appearance of one camera track."""
+
+    __slots__ = ("animal_id", "label", "embedding", "last_seen")
+
+    def __init__(self, animal_id: int, label: int, embedding: np.ndarray, now: float):
+        self.animal_id = animal_id
+        self.label = label
+        self.embedding = embedding
+        self.last_seen = now
+
+
+class ReIdentifier:
+    """
+    Gives camera tracks a global animal ID, relinking new tracks to
+    recently departed ones that look alike.
+
+    Works on ByteTracker track events: tracks are embedded in one batch
+    per frame from crops of their boxes when they start and on each
+    (throttled) track_updated, and an active track's embedding is a
+    running average. When a track is lost or ends, its embedding is
+    indexed under its animal ID for `ttl` seconds. A newly started track
+    that is similar enough to an indexed animal of the same type takes
+    over that animal's ID, whether it is the same camera after a long
+    occlusion or another camera.
+    """
+
+    def __init__(self, min_similarity: float = 0.9, ttl: float = 300.0,
+                 partitions: int = 0, momentum: float = 0.8):
+        """
+        Args:
+            min_similarity: Cosine similarity needed to relink a track
+            ttl: Seconds a departed animal can be relinked
+            partitions: IVF partitions of the index, 0 = brute force
+            momentum: Weight of the running embedding against a new crop
+        """
+        self.min_similarity = min_similarity
+        self.ttl = ttl
+        self.momentum = momentum
+        self.index = EmbeddingIndex(EMBEDDING_DIM, ttl, partitions)
+
+        # (camera ID, track ID) -> active track
+        self.tracks: Dict[Tuple[str, int], _ActiveTrack] = {}
+        self.next_animal_id = 1
+        self.relinked = 0
+        self._last_prune = time.time()
+
+    @property
+    def unique_animals(self) -> int:
+        """Animal IDs handed out, i.e. unique animals after relinking."""
+        return self.next_animal_id - 1
+
+    def process(self, camera_id: str, events: List[Dict], frame: Optional[np.ndarray],
+                now: Optional[float] = None):
+        """
+        Add "animal_id" to one camera frame's track events, in place.
+
+        Relinked track_started events also get "relinked": True.
+
+        Args:
+            camera_id: Camera the events came from
+            events: ByteTracker events of the frame
+            frame: The frame the events' boxes are on; None when there is
+                   none (e.g. tracks ended by a closed stream), in which
+                   case no tracks are embedded
+        """
+        now = time.time() if now is None else now
+
+        seen = [event for event in events if event["event"] in ("track_started", "track_updated")]
+        if seen and frame is not None:
+            boxes = np.array([event["bounding_box"] for event in seen], dtype=np.float32)
+            embeddings = appearance_embeddings(crop_batch(frame, boxes))
+
+            # Tracks unknown so far: started, or restored from a checkpoint
+            new = [i for i, event in enumerate(seen) if (camera_id, event["track_id"]) not in self.tracks]
+            known = [i for i, event in enumerate(seen) if (camera_id, event["track_id"]) in self.tracks]
+            self._link(camera_id, [seen[i] for i in new], embeddings[new], now)
+
+            for i in known:
+                track = self.tracks[(camera_id, seen[i]["track_id"])]
+                embedding = self.momentum * track.embedding + (1.0 - self.momentum) * embeddings[i]
+                track.embedding = embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+                track.last_seen = now
+                # Found again after being lost
+                self.index.remove([track.animal_id])
+
+        for event in events:
+            key = (camera_id, event["track_id"])
+            track = self.tracks.get(key)
+            if track is None:
+                continue
+
+            event["animal_id"] = track.animal_id
+            if event["event"] in ("track_lost", "track_ended"):
+                self.index.add([track.animal_id], track.embedding[None], [track.label], now)
+            if event["event"] == "track_ended":
+                del self.tracks[key]
+
+        if now - self._last_prune > min(self.ttl, 60.0):
+            self._prune(now)
+
+    def _link(self, camera_id: str, events: List[Dict], embeddings: np.ndarray, now: float):
+        """Give new tracks the ID of a matching departed animal, or a new one."""
+        if not events:
+            return
+
+        labels = np.array([_TYPE_LABELS.get(event["animal_type"], 0) for event in events])
+        matches, similarity = self.index.search(embeddings, labels, now)
+
+        # Most similar first, so two new tracks cannot take the same animal
+        taken = set()
+        animal_ids: List[Optional[int]] = [None] * len(events)
+        for i in np.argsort(-similarity).tolist():
+            if matches[i] is not None and similarity[i] >= self.min_similarity and matches[i] not in taken:
+                taken.add(matches[i])
+                animal_ids[i] = matches[i]
+
+        self.index.remove(list(taken))
+        for event, label, embedding, animal_id in zip(events, labels.tolist(), embeddings, animal_ids):
+            if animal_id is None:
+                animal_id = self.next_animal_id
+                self.next_animal_id += 1
+            elif event["event"] == "track_started":
+                event["relinked"] = True
+                self.relinked += 1
+            self.tracks[(camera_id, event["track_id"])] = _ActiveTrack(animal_id, label, embedding, now)
+
+        if taken:
+            logger.debug(f"Relinked {len(taken)} tracks on {camera_id}")
+
+    def _prune(self, now: float):
+        """Forget tracks of cameras that stopped sending events (e.g. evicted trackers)."""
+        self._last_prune = now
+        stale = [key for key, track in self.tracks.items() if now - track.last_seen > self.ttl]
+        for key in stale:
+            del self.tracks[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "unique_animals": self.unique_animals,
+            "relinked": self.relinked,
+            "active_tracks": len(self.tracks),
+            "index": self.index.stats()
+        }
@@ -0,0 +1,185 @@
+"""Disk-backed, content-addressed cache for video analysis results."""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Weights file hashes, keyed by (path, size, mtime)
+_weights_versions: Dict[tuple, str] = {}
+
+
+def weights_version(model_path: str) -> str:
+    """
+    Short content hash of a model weights file.
+
+    Directories (e.g. OpenVINO exports) hash every file they contain. Falls
+    back to the file name when the weights are not on disk (e.g. a model
+    name Ultralytics resolves itself).
+    """
+    path = Path(model_path)
+    if not path.exists():
+        return path.name
+
+    files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+    stats = [p.stat() for p in files]
+    key = (
+        str(path.resolve()),
+        sum(s.st_size for s in stats),
+        max((s.st_mtime for s in stats), default=0.0)
+    )
+    if key not in _weights_versions:
+        digest = hashlib.sha256()
+        for file in files:
+            with open(file, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        _weights_versions[key] = digest.hexdigest()[:16]
+    return _weights_versions[key]
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of JSON results stored one file per entry.
+
+    Keys combine the content hash of the uploaded video, the model weights
+    version and the analysis parameters, so a re-upload of the same clip
+    analysed the same way is served without running inference again.
+    """
+
+    def __init__(self, cache_dir: Path = None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir or settings.RESULT_CACHE_DIR)
+        self.max_bytes = (
+            settings.RESULT_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> entry size in bytes, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @staticmethod
+    def make_key(content_hash: str, model_version: str, analysis: str, params: Dict[str, Any] = None) -> str:
+        """Cache key for one analysis of one video."""
+        material = json.dumps(
+            [content_hash, model_version, analysis, params or {}],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def contains(self, key: str) -> bool:
+        """Whether a result is cached (does not count as a hit or miss)."""
+        with self._lock:
+            self._load()
+            return key in self._entries
+
+    def lookup(self, *keys: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the first cached result among `keys`, counting one hit or miss.
+        """
+        with self._lock:
+            self._load()
+
+            for key in keys:
+                if key not in self._entries:
+                    continue
+
+                value = self._read(key)
+                if value is None:
+                    continue
+
+                self._entries.move_to_end(key)
+                try:
+                    os.utime(self._path(key))
+                except OSError:
+                    pass
+                self.hits += 1
+                return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store a result, evicting least recently used entries over the size limit."""
+        data = json.dumps(
+            value,
+            default=lambda v: v.item() if hasattr(v, 'item') else str(v)
+        ).encode()
+
+        with self._lock:
+            self._load()
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            tmp_path = self._path(key).with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                self.evictions += 1
+                try:
+                    os.unlink(self._path(old_key))
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            self._load()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return json.loads(f.read())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+            self._total_bytes -= self._entries.pop(key, 0)
+            return None
+
+    def _load(self):
+        """Index existing entries on first use, oldest access first."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not self.cache_dir.exists():
+            return
+
+        files = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+
+        logger.info(f"Result cache: {len(self._entries)} entries, {self._total_bytes} bytes")
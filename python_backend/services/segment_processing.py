@@ -0,0 +1,191 @@
+"""
+Time-segment parallel video processing.
+
+Splits a video into contiguous frame ranges and runs the single-pass
+VideoPipeline on each range in its own worker process, with its own
+capture and model. Segment boundaries are aligned to the consumers' sample
+rates, so every segment samples exactly the frames a sequential run would,
+and the per-segment consumers are merged back in segment order.
+"""
+import asyncio
+import math
+import os
+import cv2
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from functools import reduce
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from config import settings
+from services.batch_inference import resolve_batch_size
+from services.video_pipeline import FrameConsumer, VideoPipeline
+
+logger = logging.getLogger(__name__)
+
+# Model loaded once per worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_path: str, torch_threads: int):
+    """Process pool initializer: limit torch threads and load the model on the configured backend."""
+    global _worker_model
+
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+    from services.model_registry import model_registry
+    _worker_model = model_registry.get(model_path)
+
+
+def _process_segment(
+    video_path: str,
+    consumers: List[FrameConsumer],
+    start_frame: int,
+    end_frame: Optional[int]
+) -> List[FrameConsumer]:
+    """Run the pipeline over one frame range and return the fed consumers."""
+    VideoPipeline(
+        _worker_model,
+        consumers,
+        batch_size=resolve_batch_size(_worker_model)
+    ).feed(video_path, start_frame, end_frame)
+    return consumers
+
+
+def plan_segments(
+    total_frames: int,
+    fps: float,
+    sample_rates: List[int],
+    workers: int,
+    min_segment_seconds: float
+) -> List[Tuple[int, Optional[int]]]:
+    """
+    Split [1, total_frames] into at most `workers` frame ranges.
+
+    Boundaries fall on multiples of the least common multiple of the sample
+    rates, so each consumer's sampled frames are unchanged by the split.
+
+    Returns:
+        List of (start_frame, end_frame) with 1-based inclusive bounds; the
+        last range is open-ended (None) in case the frame count is short
+    """
+    align = reduce(lambda a, b: a * b // math.gcd(a, b), sample_rates, 1)
+    min_frames = max(align, int(min_segment_seconds * (fps or settings.CAMERA_FPS)))
+
+    count = max(1, min(workers, total_frames // min_frames))
+    if count == 1:
+        return [(1, None)]
+
+    step = math.ceil(total_frames / count / align) * align
+    boundaries = list(range(0, total_frames, step))
+
+    segments = []
+    for i, start in enumerate(boundaries):
+        end = boundaries[i + 1] if i + 1 < len(boundaries) else None
+        segments.append((start + 1, end))
+    return segments
+
+
+class SegmentedVideoProcessor:
+    """Runs VideoPipeline consumers over time segments in a process pool."""
+
+    def __init__(self, model_path: str, workers: int = None):
+        """
+        Args:
+            model_path: YOLOv8 weights each worker loads
+            workers: Worker processes (settings.VIDEO_SEGMENT_WORKERS,
+                0 = one per CPU core)
+        """
+        if workers is None:
+            workers = settings.VIDEO_SEGMENT_WORKERS
+        self.workers = workers or os.cpu_count() or 1
+        self.model_path = model_path
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_path, torch_threads)
+            )
+            logger.info(f"Started {self.workers} video segment workers")
+        return self._pool
+
+    def plan(self, video_path: str, consumers: List[FrameConsumer]) -> List[Tuple[int, Optional[int]]]:
+        """Segments to process the video in."""
+        cap = cv2.VideoCapture(video_path)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        cap.release()
+
+        return plan_segments(
+            total_frames,
+            fps,
+            [c.sample_rate for c in consumers],
+            self.workers,
+            settings.VIDEO_MIN_SEGMENT_SECONDS
+        )
+
+    async def run(
+        self,
+        video_path: str,
+        consumers: List[FrameConsumer],
+        progress: Optional[Callable[[float], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Process the video across the pool.
+
+        Args:
+            video_path: Path to video file
+            consumers: Fresh consumers; each segment gets its own copy
+            progress: Called with the fraction of segments finished
+
+        Returns:
+            One result dict per consumer, in registration order
+        """
+        segments = self.plan(video_path, consumers)
+        logger.info(f"Processing {video_path} in {len(segments)} segments")
+
+        pool = self._get_pool()
+        pool_futures = [
+            pool.submit(_process_segment, video_path, consumers, start, end)
+            for start, end in segments
+        ]
+
+        if progress:
+            finished = []
+
+            def segment_done(_):
+                finished.append(1)
+                progress(len(finished) / len(pool_futures))
+
+            for future in pool_futures:
+                future.add_done_callback(segment_done)
+
+        segment_consumers = await asyncio.gather(
+            *(asyncio.wrap_future(future) for future in pool_futures)
+        )
+
+        # Merge in segment order so results are deterministic
+        merged = segment_consumers[0]
+        for later in segment_consumers[1:]:
+            for consumer, other in zip(merged, later):
+                consumer.merge(other)
+
+        return [consumer.result() for consumer in merged]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,116 @@
+"""Concurrent, optionally lazy service initialization."""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceUnavailableError(Exception):
+    """Raised when a service needed for a request failed to initialize."""
+
+
+class _ServiceState:
+    def __init__(self, initialize: Callable[[], Awaitable[None]], lazy: bool):
+        self.initialize = initialize
+        self.lazy = lazy
+        self.state = "lazy" if lazy else "pending"
+        self.task: Optional[asyncio.Task] = None
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+
+
+class ServiceStartup:
+    """
+    Runs service initializers concurrently off the event loop.
+
+    Each initializer runs on its own thread with its own event loop, so
+    heavy imports and model loading never block requests. Lazy services
+    are initialized on first use instead of at startup.
+    """
+
+    def __init__(self):
+        self._services: Dict[str, _ServiceState] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def register(self, name: str, initialize: Callable[[], Awaitable[None]], lazy: bool = False):
+        """
+        Args:
+            name: Service name used by wait_ready() and status()
+            initialize: The service's async initialize method
+            lazy: Defer initialization until the service is first needed
+        """
+        self._services[name] = _ServiceState(initialize, lazy)
+
+    def start(self):
+        """Start initializing all non-lazy services in the background."""
+        self._loop = asyncio.get_running_loop()
+        for name, service in self._services.items():
+            if not service.lazy:
+                self._schedule(name)
+
+    async def wait_ready(self, name: str):
+        """
+        Wait until a service is initialized, starting it if it is lazy.
+
+        Can be awaited from any event loop (e.g. background job threads).
+
+        Raises:
+            ServiceUnavailableError: If the service failed to initialize
+        """
+        if asyncio.get_running_loop() is self._loop:
+            await self._ensure(name)
+        else:
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(self._ensure(name), self._loop)
+            )
+
+    async def wait_all(self):
+        """Wait for every service that has started initializing."""
+        tasks = [s.task for s in self._services.values() if s.task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def is_ready(self, name: str) -> bool:
+        service = self._services.get(name)
+        return service is not None and service.state == "ready"
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """State ("lazy", "pending", "loading", "ready", "failed") and init time per service."""
+        return {
+            name: {
+                "state": service.state,
+                "seconds": round(service.seconds, 2),
+                "error": service.error
+            }
+            for name, service in self._services.items()
+        }
+
+    def _schedule(self, name: str) -> asyncio.Task:
+        service = self._services[name]
+        if service.task is None:
+            service.task = asyncio.create_task(self._initialize(name, service))
+        return service.task
+
+    async def _ensure(self, name: str):
+        service = self._services[name]
+        await asyncio.shield(self._schedule(name))
+        if service.state != "ready":
+            raise ServiceUnavailableError(f"{name} service unavailable: {service.error}")
+
+    async def _initialize(self, name: str, service: _ServiceState):
+        service.state = "loading"
+        start = time.perf_counter()
+
+        try:
+            await asyncio.to_thread(lambda: asyncio.run(service.initialize()))
+            service.state = "ready"
+        except Exception as e:
+            service.state = "failed"
+            service.error = str(e)
+            logger.error(f"❌ {name} service failed to initialize: {e}")
+        finally:
+            service.seconds = time.perf_counter() - start
+
+        if service.state == "ready":
+            logger.info(f"{name} service ready in {service.seconds:.1f}s")
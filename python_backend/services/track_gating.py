@@ -0,0 +1,132 @@
+"""Spatial-grid candidate gating and sparse assignment for the tracker."""
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+from models.detections import box_iou
+
+# Row multiplier for packing (cell x, cell y) into one int64 key
+_KEY_STRIDE = 1 << 32
+
+
+def _cell_keys(boxes: np.ndarray, cell_size: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grid cells covered by each box.
+
+    Returns:
+        (K,) cell keys and (K,) the index of the box each key belongs to
+    """
+    low = np.floor(boxes[:, :2] / cell_size).astype(np.int64)
+    high = np.floor(boxes[:, 2:4] / cell_size).astype(np.int64)
+    span = np.maximum(high - low + 1, 1)
+    counts = span[:, 0] * span[:, 1]
+
+    owner = np.repeat(np.arange(len(boxes)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cell_x = low[owner, 0] + offset % span[owner, 0]
+    cell_y = low[owner, 1] + offset // span[owner, 0]
+    return cell_x * _KEY_STRIDE + cell_y, owner
+
+
+def default_cell_size(*box_sets: np.ndarray) -> float:
+    """Cell edge of about one typical box, so most boxes cover 1-4 cells."""
+    boxes = np.concatenate([b.reshape(-1, 4) for b in box_sets])
+    sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    return max(float(np.median(sizes)), 1.0)
+
+
+def candidate_pairs(boxes_a: np.ndarray, boxes_b: np.ndarray,
+                    cell_size: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairs of boxes that share a cell of a uniform grid.
+
+    Every box is hashed into all cells it covers, so any two overlapping
+    boxes share at least one cell: pairs left out have an IoU of 0.
+
+    Returns:
+        (P,) indices into boxes_a and (P,) indices into boxes_b, unique pairs
+    """
+    if not len(boxes_a) or not len(boxes_b):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+    cell_size = cell_size or default_cell_size(boxes_a, boxes_b)
+    keys_a, owner_a = _cell_keys(boxes_a, cell_size)
+    keys_b, owner_b = _cell_keys(boxes_b, cell_size)
+
+    order = np.argsort(keys_a, kind="stable")
+    keys_a, owner_a = keys_a[order], owner_a[order]
+
+    # For each cell of a b-box, the run of a-boxes in the same cell
+    left = np.searchsorted(keys_a, keys_b, side="left")
+    counts = np.searchsorted(keys_a, keys_b, side="right") - left
+    total = counts.sum()
+
+    index_b = np.repeat(owner_b, counts)
+    position = np.repeat(left, counts) + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    index_a = owner_a[position]
+
+    # Boxes spanning several cells can meet more than once
+    pairs = np.unique(index_a * len(boxes_b) + index_b)
+    return (pairs // len(boxes_b)).astype(np.intp), (pairs % len(boxes_b)).astype(np.intp)
+
+
+def sparse_assignment(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray,
+                      n_rows: int, n_cols: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maximum-weight one-to-one matching over a sparse set of candidate pairs.
+
+    Solved as a full min-cost matching on a sparse graph where every row
+    and column may also stay unmatched at cost 0.5: each row gets a dummy
+    column and each column a dummy row, and dummies of a candidate pair
+    can pair up at no cost. Matching a pair then costs 1 - weight instead
+    of 1 for leaving both unmatched, so the minimum cost matching maximizes
+    the total weight of real pairs.
+
+    Args:
+        rows, cols: (E,) candidate pairs
+        weights: (E,) weights in (0, 1]
+
+    Returns:
+        Matched row and column indices
+    """
+    if not len(rows):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+    # Explicit zeros would be dropped from the sparse graph
+    eps = 1e-9
+    edges = len(rows)
+    row_ids = np.arange(n_rows)
+    col_ids = np.arange(n_cols)
+
+    graph = csr_matrix(
+        (
+            np.concatenate([1.0 - weights + eps, np.full(n_rows, 0.5), np.full(edges, eps), np.full(n_cols, 0.5)]),
+            (
+                np.concatenate([rows, row_ids, n_rows + cols, n_rows + col_ids]),
+                np.concatenate([cols, n_cols + row_ids, n_cols + rows, col_ids])
+            )
+        ),
+        shape=(n_rows + n_cols, n_cols + n_rows)
+    )
+    matched_rows, matched_cols = min_weight_full_bipartite_matching(graph)
+
+    real = (matched_rows < n_rows) & (matched_cols < n_cols)
+    return matched_rows[real].astype(np.intp), matched_cols[real].astype(np.intp)
+
+
+def gated_iou_assignment(boxes_a: np.ndarray, boxes_b: np.ndarray,
+                         iou_threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Match boxes_a to boxes_b maximizing total IoU, considering only pairs
+    that share a grid cell and overlap by at least iou_threshold.
+
+    Returns:
+        Matched indices into boxes_a and boxes_b
+    """
+    rows, cols = candidate_pairs(boxes_a, boxes_b)
+    iou = box_iou(boxes_a[rows], boxes_b[cols])
+
+    keep = iou >= max(iou_threshold, 1e-6)
+    return sparse_assignment(rows[keep], cols[keep], iou[keep], len(boxes_a), len(boxes_b))
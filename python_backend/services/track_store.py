@@ -0,0 +1,200 @@
+"""Bounded, array-backed position history for tracked animals."""
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Per-slot arrays saved by export() (everything but the active flags)
+_SLOT_ARRAYS = (
+    "track_id", "class_id", "first_seen", "last_seen", "observations", "score_sum",
+    "boxes", "times", "scores", "start", "length"
+)
+
+
+class TrackStore:
+    """
+    Track metadata and position history as a struct of numpy arrays.
+
+    Each track occupies one slot: a row in the per-track arrays (id,
+    class, first/last seen, confidence sum) and a fixed-capacity ring
+    buffer of boxes, timestamps and confidences. Memory per track is
+    bounded no matter how long an animal stays in view; slots of ended
+    tracks are reused.
+
+    With `downsample`, a full history is not overwritten: its older half
+    is thinned to every other sample instead, so old positions are kept
+    at progressively coarser spacing.
+    """
+
+    def __init__(self, capacity: int = 256, downsample: bool = False, initial_slots: int = 16):
+        """
+        Args:
+            capacity: History entries kept per track
+            downsample: Thin old history instead of dropping it
+            initial_slots: Slots allocated up front (grows by doubling)
+        """
+        self.capacity = max(4, capacity)
+        self.downsample = downsample
+
+        self.track_id = np.zeros(0, dtype=np.int64)
+        self.class_id = np.zeros(0, dtype=np.int16)
+        self.first_seen = np.zeros(0, dtype=np.float64)
+        self.last_seen = np.zeros(0, dtype=np.float64)
+        self.observations = np.zeros(0, dtype=np.int64)
+        self.score_sum = np.zeros(0, dtype=np.float64)
+        self.active = np.zeros(0, dtype=bool)
+
+        # Ring buffers: entry k of slot s is at (start[s] + k) % capacity
+        self.boxes = np.zeros((0, self.capacity, 4), dtype=np.float32)
+        self.times = np.zeros((0, self.capacity), dtype=np.float64)
+        self.scores = np.zeros((0, self.capacity), dtype=np.float32)
+        self.start = np.zeros(0, dtype=np.int64)
+        self.length = np.zeros(0, dtype=np.int64)
+
+        self._grow(initial_slots)
+
+    def __len__(self) -> int:
+        """Number of active tracks."""
+        return int(self.active.sum())
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the store's arrays."""
+        return sum(
+            array.nbytes for array in (
+                self.track_id, self.class_id, self.first_seen, self.last_seen,
+                self.observations, self.score_sum, self.active, self.boxes,
+                self.times, self.scores, self.start, self.length
+            )
+        )
+
+    def _grow(self, slots: int):
+        """Add `slots` free slots."""
+        def extend(array: np.ndarray) -> np.ndarray:
+            return np.concatenate([array, np.zeros((slots,) + array.shape[1:], dtype=array.dtype)])
+
+        self.track_id, self.class_id = extend(self.track_id), extend(self.class_id)
+        self.first_seen, self.last_seen = extend(self.first_seen), extend(self.last_seen)
+        self.observations, self.score_sum = extend(self.observations), extend(self.score_sum)
+        self.active = extend(self.active)
+        self.boxes, self.times, self.scores = extend(self.boxes), extend(self.times), extend(self.scores)
+        self.start, self.length = extend(self.start), extend(self.length)
+
+    def add(self, track_ids: np.ndarray, class_ids: np.ndarray, timestamp: float,
+            boxes: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """
+        Start new tracks with their first observation.
+
+        Returns:
+            (K,) slots of the new tracks
+        """
+        count = len(track_ids)
+        free = np.flatnonzero(~self.active)
+        if len(free) < count:
+            self._grow(max(count - len(free), len(self.active)))
+            free = np.flatnonzero(~self.active)
+        slots = free[:count]
+
+        self.active[slots] = True
+        self.track_id[slots] = track_ids
+        self.class_id[slots] = class_ids
+        self.first_seen[slots] = timestamp
+        self.observations[slots] = 0
+        self.score_sum[slots] = 0.0
+        self.start[slots] = 0
+        self.length[slots] = 0
+
+        self.append(slots, timestamp, boxes, scores)
+        return slots
+
+    def append(self, slots: np.ndarray, timestamp: float, boxes: np.ndarray, scores: np.ndarray):
+        """Record one observation for each of the given slots."""
+        if not len(slots):
+            return
+
+        if self.downsample:
+            for slot in slots[self.length[slots] == self.capacity].tolist():
+                self._thin(slot)
+
+        full = self.length[slots] == self.capacity
+        position = (self.start[slots] + self.length[slots]) % self.capacity
+
+        self.boxes[slots, position] = boxes
+        self.times[slots, position] = timestamp
+        self.scores[slots, position] = scores
+
+        # A full ring overwrites its oldest entry
+        self.start[slots] = np.where(full, (self.start[slots] + 1) % self.capacity, self.start[slots])
+        self.length[slots] = np.minimum(self.length[slots] + 1, self.capacity)
+
+        self.last_seen[slots] = timestamp
+        self.observations[slots] += 1
+        self.score_sum[slots] += scores
+
+    def _thin(self, slot: int):
+        """Keep every other entry of the older half of a full history."""
+        order = (self.start[slot] + np.arange(self.length[slot])) % self.capacity
+        half = len(order) // 2
+        keep = np.concatenate([order[:half:2], order[half:]])
+
+        self.boxes[slot, :len(keep)] = self.boxes[slot, keep]
+        self.times[slot, :len(keep)] = self.times[slot, keep]
+        self.scores[slot, :len(keep)] = self.scores[slot, keep]
+        self.start[slot] = 0
+        self.length[slot] = len(keep)
+
+    def release(self, slots: np.ndarray):
+        """Free the slots of ended tracks for reuse."""
+        self.active[slots] = False
+
+    def confidence(self, slots: np.ndarray) -> np.ndarray:
+        """Mean observed confidence per slot."""
+        return self.score_sum[slots] / np.maximum(self.observations[slots], 1)
+
+    def latest(self, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Most recent box and confidence per slot."""
+        last = (self.start[slots] + self.length[slots] - 1) % self.capacity
+        return self.boxes[slots, last], self.scores[slots, last]
+
+    def history(self, slot: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Timestamps, boxes and confidences of one track, oldest first.
+
+        Returns:
+            (N,) epoch seconds, (N, 4) xyxy boxes, (N,) confidences
+        """
+        order = (self.start[slot] + np.arange(self.length[slot])) % self.capacity
+        return self.times[slot, order], self.boxes[slot, order], self.scores[slot, order]
+
+    def export(self, slots: np.ndarray) -> Dict[str, np.ndarray]:
+        """Copies of the given slots' arrays, in slot order (see load)."""
+        return {name: getattr(self, name)[slots].copy() for name in _SLOT_ARRAYS}
+
+    def load(self, state: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Replace the store's contents with exported slots.
+
+        Returns:
+            The slots of the loaded tracks, in export order
+        """
+        count = len(state["track_id"])
+        if state["boxes"].shape[1] != self.capacity:
+            raise ValueError(f"History capacity {state['boxes'].shape[1]} does not match {self.capacity}")
+
+        self.active[:] = False
+        if len(self.active) < count:
+            self._grow(count - len(self.active))
+
+        slots = np.arange(count)
+        for name in _SLOT_ARRAYS:
+            getattr(self, name)[slots] = state[name]
+        self.active[slots] = True
+        return slots
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active_tracks": len(self),
+            "slots": len(self.active),
+            "history_capacity": self.capacity,
+            "history_entries": int(self.length[self.active].sum()),
+            "bytes": self.nbytes
+        }
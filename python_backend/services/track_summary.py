@@ -0,0 +1,135 @@
+"""Incremental per-video summary of tracker output."""
+from typing import Any, Dict, List
+from collections import defaultdict
+
+import numpy as np
+
+from models.detections import class_animal_type
+
+
+class _TrackRecord:
+    """Running totals for one track ID."""
+
+    __slots__ = ("class_id", "first_frame", "last_frame", "detections", "score_sum", "stride", "trajectory")
+
+    def __init__(self, class_id: int, frame_index: int):
+        self.class_id = class_id
+        self.first_frame = frame_index
+        self.last_frame = frame_index
+        self.detections = 0
+        self.score_sum = 0.0
+        # Every `stride`-th detection is kept as a trajectory point
+        self.stride = 1
+        self.trajectory: List[List[float]] = []
+
+
+class TrackSummary:
+    """
+    Reduces per-frame tracks to unique counts, dwell times and trajectories.
+
+    Only a constant amount of state is kept per track: trajectories are
+    capped at `trajectory_points` by halving their resolution whenever
+    they fill up, so memory does not grow with video length.
+    """
+
+    def __init__(self, fps: float, min_hits: int = 3, trajectory_points: int = 64, stale_frames: int = 300):
+        """
+        Args:
+            fps: Video frame rate, for converting frames to seconds
+            min_hits: Detections before a track counts as a unique animal
+            trajectory_points: Maximum trajectory points kept per track
+            stale_frames: Forget unconfirmed tracks not seen for this many frames
+        """
+        self.fps = fps or 1.0
+        self.min_hits = min_hits
+        self.trajectory_points = max(2, trajectory_points)
+        self.stale_frames = stale_frames
+
+        self.tracks: Dict[int, _TrackRecord] = {}
+        self.unique_by_type: Dict[str, int] = defaultdict(int)
+        self.unique_animals = 0
+        self.peak_concurrent = 0
+        self.frames = 0
+        self._last_prune = 0
+
+    def add(self, frame_index: int, track_ids: np.ndarray, class_ids: np.ndarray,
+            boxes: np.ndarray, scores: np.ndarray):
+        """
+        Fold in the tracks matched to detections on one frame.
+
+        Args:
+            frame_index: 1-based frame number
+            track_ids, class_ids, scores: (N,) per matched track
+            boxes: (N, 4) matched xyxy boxes
+        """
+        self.frames = max(self.frames, frame_index)
+        centers = ((boxes[:, :2] + boxes[:, 2:4]) / 2).tolist()
+        concurrent = 0
+
+        for track_id, class_id, center, score in zip(
+            track_ids.tolist(), class_ids.tolist(), centers, scores.tolist()
+        ):
+            record = self.tracks.get(track_id)
+            if record is None:
+                record = self.tracks[track_id] = _TrackRecord(class_id, frame_index)
+
+            record.last_frame = frame_index
+            record.detections += 1
+            record.score_sum += score
+
+            if record.detections == self.min_hits:
+                self.unique_animals += 1
+                self.unique_by_type[class_animal_type(class_id).value] += 1
+            if record.detections >= self.min_hits:
+                concurrent += 1
+
+            if (record.detections - 1) % record.stride == 0:
+                record.trajectory.append([round(frame_index / self.fps, 2)] + [round(c, 1) for c in center])
+                if len(record.trajectory) > self.trajectory_points:
+                    record.trajectory = record.trajectory[::2]
+                    record.stride *= 2
+
+        self.peak_concurrent = max(self.peak_concurrent, concurrent)
+
+        # Drop short-lived false tracks now and then, however sparsely frames are sampled
+        if frame_index - self._last_prune >= self.stale_frames:
+            self._prune(frame_index)
+
+    def _prune(self, frame_index: int):
+        self._last_prune = frame_index
+        stale = [
+            track_id for track_id, record in self.tracks.items()
+            if record.detections < self.min_hits and frame_index - record.last_frame > self.stale_frames
+        ]
+        for track_id in stale:
+            del self.tracks[track_id]
+
+    def result(self, include_trajectories: bool = True) -> Dict[str, Any]:
+        """Summary so far; confirmed tracks only."""
+        tracks = []
+        for track_id, record in self.tracks.items():
+            if record.detections < self.min_hits:
+                continue
+
+            track = {
+                "track_id": track_id,
+                "animal_type": class_animal_type(record.class_id).value,
+                "first_seen_seconds": round(record.first_frame / self.fps, 2),
+                "last_seen_seconds": round(record.last_frame / self.fps, 2),
+                "dwell_seconds": round((record.last_frame - record.first_frame + 1) / self.fps, 2),
+                "detections": record.detections,
+                "confidence_avg": record.score_sum / record.detections
+            }
+            if include_trajectories:
+                # Points are [seconds, center x, center y]
+                track["trajectory"] = record.trajectory
+            tracks.append(track)
+
+        return {
+            "frames_processed": self.frames,
+            "duration_seconds": round(self.frames / self.fps, 2),
+            "unique_animals": self.unique_animals,
+            "unique_by_type": dict(self.unique_by_type),
+            "peak_concurrent": self.peak_concurrent,
+            "tracks": tracks
+        }
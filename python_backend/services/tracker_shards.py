@@ -0,0 +1,85 @@
+"""Camera trackers spread across worker processes."""
+import asyncio
+import multiprocessing
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# In-process TrackingService of a worker, created by _init_worker
+_worker_service = None
+
+
+def _init_worker():
+    """Process pool initializer: a TrackingService that tracks in this process."""
+    global _worker_service
+
+    from services.tracking_service import TrackingService
+    _worker_service = TrackingService(workers=0)
+
+
+def _call(method: str, *args) -> Any:
+    return getattr(_worker_service, method)(*args)
+
+
+def parse_assignments(spec: str) -> Dict[str, int]:
+    """Parse "camera_id:worker,..." (e.g. TRACKING_SHARDS) into a dict."""
+    assignments = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        camera_id, _, worker = item.rpartition(":")
+        assignments[camera_id] = int(worker)
+    return assignments
+
+
+class TrackerShards:
+    """
+    Single-process pools that each own the trackers of a set of cameras.
+
+    A camera always goes to the same worker, so its tracker state stays
+    in one process. Cameras are assigned explicitly (TRACKING_SHARDS) or
+    by a stable hash of the camera ID.
+    """
+
+    def __init__(self, workers: int, assignments: str = ""):
+        """
+        Args:
+            workers: Number of worker processes
+            assignments: "camera_id:worker,..." pinning cameras to workers
+        """
+        self.workers = workers
+        self.assignments = parse_assignments(assignments)
+        self._pools: List[ProcessPoolExecutor] = []
+
+    def shard_for(self, camera_id: str) -> int:
+        """Worker index that owns a camera's tracker."""
+        if camera_id in self.assignments:
+            return self.assignments[camera_id] % self.workers
+        return zlib.crc32(camera_id.encode()) % self.workers
+
+    def _get_pools(self) -> List[ProcessPoolExecutor]:
+        if not self._pools:
+            context = multiprocessing.get_context("spawn")
+            self._pools = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_worker)
+                for _ in range(self.workers)
+            ]
+            logger.info(f"Started {self.workers} tracking workers")
+        return self._pools
+
+    async def call(self, camera_id: str, method: str, *args) -> Any:
+        """Call a TrackingService method on the camera's worker."""
+        pool = self._get_pools()[self.shard_for(camera_id)]
+        return await asyncio.wrap_future(pool.submit(_call, method, *args))
+
+    async def call_all(self, method: str, *args) -> List[Any]:
+        """Call a TrackingService method on every worker, in worker order."""
+        return await asyncio.gather(
+            *(asyncio.wrap_future(pool.submit(_call, method, *args)) for pool in self._get_pools())
+        )
+
+    def shutdown(self):
+        for pool in self._pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools = []
@@ -1,223 +1,910 @@
 """Animal tracking service using ByteTrack."""
 import cv2
 import numpy as np
-from typing import List, Dict, Optional
+import asyncio
+import itertools
+import time
+from typing import AsyncIterator, Callable, List, Dict, Optional, Tuple
 from collections import defaultdict
 from datetime import datetime
 import logging
 
-from models.schemas import AnimalDetection, TrackingInfo, BoundingBox, AnimalType
+from scipy.optimize import linear_sum_assignment
+
+from config import settings
+from models.detections import Detections, class_animal_type, iou_matrix
+from services.frame_sampler import FrameSampler
+from services.kalman_filter import BoxKalmanFilter
+from services.reid import ReIdentifier
+from services.track_gating import gated_iou_assignment
+from services.track_store import TrackStore
+from services.track_summary import TrackSummary
+from services.tracker_shards import TrackerShards
+from services.tracking_snapshot import TrackerStates, read_snapshot, write_snapshot
 
 logger = logging.getLogger(__name__)
 
+# Tracker key for callers that do not name a camera or job
+DEFAULT_CAMERA = "default"
+
+# Track event deltas buffered per subscriber before new ones are dropped
+EVENT_QUEUE_SIZE = 1000
+
 
 class ByteTracker:
     """
     ByteTrack implementation for animal tracking.
     Assigns unique IDs to each detected animal across frames.
+    
+    A constant-velocity Kalman filter predicts every track's box each
+    frame, so tracks carry on through frames that detection skipped.
+    Tracks are first matched to high-confidence detections; tracks left
+    over are then matched to low-confidence detections, which keeps IDs
+    through partial occlusion. Only high-confidence detections start new
+    tracks. Track metadata and bounded position history live in a
+    TrackStore.
+    
+    With `emit_events`, the tracker also logs what changed on each frame
+    (see drain_events) and keeps running unique-animal totals, so
+    consumers need not diff full track lists:
+    
+    - track_started: a track reached min_hits detections (counted once)
+    - track_updated: a confirmed track's position, at most once per
+      `update_interval` seconds, and when it is found again after being lost
+    - track_lost: a confirmed track was missed on a detection frame
+    - track_ended: a confirmed track was dropped after max_age misses
     """
     
-    def __init__(self, max_age=30, min_hits=3, iou_threshold=0.3):
+    def __init__(self, max_age=30, min_hits=3, iou_threshold=0.3,
+                 high_threshold=0.5, low_threshold=0.1, low_iou_threshold=0.5,
+                 history_size=256, history_downsample=False, grid_min_pairs=160000,
+                 emit_events=False, update_interval=1.0):
         """
         Args:
-            max_age: Maximum frames to keep track without detection
+            max_age: Maximum detection frames to keep track without a match
             min_hits: Minimum consecutive detections to confirm track
-            iou_threshold: IOU threshold for matching
+            iou_threshold: IOU threshold for matching high-confidence detections
+            high_threshold: Confidence at or above which a detection is high
+            low_threshold: Confidence below which detections are ignored
+            low_iou_threshold: IOU threshold for matching low-confidence detections
+            history_size: Positions kept per track
+            history_downsample: Thin old positions instead of dropping them
+            grid_min_pairs: Track x detection count from which candidate
+                            pairs are gated with a spatial grid
+            emit_events: Log track events and unique totals
+            update_interval: Minimum seconds between track_updated events
+                             of one track
         """
         self.max_age = max_age
         self.min_hits = min_hits
         self.iou_threshold = iou_threshold
+        self.high_threshold = high_threshold
+        self.low_threshold = low_threshold
+        self.low_iou_threshold = low_iou_threshold
+        self.grid_min_pairs = grid_min_pairs
+        self.emit_events = emit_events
+        self.update_interval = update_interval
         
-        self.tracks: Dict[int, TrackingInfo] = {}
+        self.store = TrackStore(history_size, history_downsample)
         self.next_id = 1
         self.frame_count = 0
+        
+        # Active tracks: store slot, motion state, miss count and whether
+        # matched this frame, one row per track
+        self.slots = np.zeros(0, dtype=np.intp)
+        self.motion = BoxKalmanFilter()
+        self._misses = np.zeros(0, dtype=np.int32)
+        self._detected = np.zeros(0, dtype=bool)
+        
+        # Event state per row: reached min_hits, reported lost, and when
+        # the last event was logged
+        self._confirmed = np.zeros(0, dtype=bool)
+        self._lost = np.zeros(0, dtype=bool)
+        self._reported = np.zeros(0, dtype=np.float64)
+        
+        # Events since the last drain_events(), and confirmed tracks per class
+        self.events: List[Dict] = []
+        self.unique_by_class: Dict[int, int] = defaultdict(int)
+    
+    def __len__(self) -> int:
+        """Number of active tracks."""
+        return len(self.slots)
+    
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Copy of the tracker's state as arrays (see set_state)."""
+        state = {f"store.{name}": array for name, array in self.store.export(self.slots).items()}
+        state.update({
+            "next_id": np.array(self.next_id),
+            "frame_count": np.array(self.frame_count),
+            "motion.mean": self.motion.mean.copy(),
+            "motion.covariance": self.motion.covariance.copy(),
+            "misses": self._misses.copy(),
+            "confirmed": self._confirmed.copy(),
+            "lost": self._lost.copy(),
+            "reported": self._reported.copy(),
+            "unique_by_class": np.array(list(self.unique_by_class.items()), dtype=np.int64).reshape(-1, 2)
+        })
+        return state
     
-    def update(self, detections: List[AnimalDetection]) -> List[TrackingInfo]:
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """Resume from get_state() output, e.g. after a restart."""
+        self.slots = self.store.load({
+            name[len("store."):]: array for name, array in state.items() if name.startswith("store.")
+        })
+        self.next_id = int(state["next_id"])
+        self.frame_count = int(state["frame_count"])
+        self.motion.mean = state["motion.mean"]
+        self.motion.covariance = state["motion.covariance"]
+        self._misses = state["misses"]
+        self._detected = np.zeros(len(self.slots), dtype=bool)
+        
+        # Snapshots from before track events: tracks with enough detections
+        # count as confirmed, but earlier tracks are not in the totals
+        self._confirmed = state.get("confirmed", self.store.observations[self.slots] >= self.min_hits)
+        self._lost = state.get("lost", self._confirmed & (self._misses > 0))
+        self._reported = state.get("reported", np.zeros(len(self.slots)))
+        self.unique_by_class = defaultdict(int, {
+            int(class_id): int(count) for class_id, count in state.get("unique_by_class", np.zeros((0, 2))).tolist()
+        })
+    
+    def update(self, detections: Optional[Detections] = None):
         """
-        Update tracks with new detections.
+        Advance tracks by one frame and match them to its detections.
         
         Args:
-            detections: List of detections from current frame
-            
-        Returns:
-            List of active tracks
+            detections: Detections from current frame, or None for a frame
+                        detection did not run on (tracks are only predicted)
         """
         self.frame_count += 1
-        current_time = datetime.utcnow()
+        self.motion.predict()
+        self._detected[:] = False
+        
+        if detections is None:
+            return
+        
+        now = time.time()
         
         # Match detections to existing tracks
-        matched_tracks = self._match_detections(detections)
+        matched_rows, matched_dets, unmatched = self._match_detections(detections)
         
         # Update existing tracks
-        for track_id, detection in matched_tracks.items():
-            track = self.tracks[track_id]
-            track.last_seen = current_time
-            track.positions.append(detection.bounding_box)
-            track.frame_count += 1
-            
-            # Update confidence average
-            track.confidence_avg = (
-                (track.confidence_avg * (track.frame_count - 1) + detection.confidence) 
-                / track.frame_count
-            )
+        self.motion.update(matched_rows, detections.boxes[matched_dets])
+        self.store.append(
+            self.slots[matched_rows], now, detections.boxes[matched_dets], detections.scores[matched_dets]
+        )
+        self._misses += 1
+        self._misses[matched_rows] = 0
+        self._detected[matched_rows] = True
         
-        # Create new tracks for unmatched detections
-        unmatched = [d for i, d in enumerate(detections) 
-                     if i not in matched_tracks.values()]
-        
-        for detection in unmatched:
-            self.tracks[self.next_id] = TrackingInfo(
-                track_id=self.next_id,
-                animal_type=detection.animal_type,
-                first_seen=current_time,
-                last_seen=current_time,
-                positions=[detection.bounding_box],
-                confidence_avg=detection.confidence,
-                frame_count=1
-            )
-            self.next_id += 1
+        # Create new tracks for unmatched high-confidence detections
+        new_ids = np.arange(self.next_id, self.next_id + len(unmatched))
+        self.next_id += len(unmatched)
+        new_slots = self.store.add(
+            new_ids, detections.class_ids[unmatched], now,
+            detections.boxes[unmatched], detections.scores[unmatched]
+        )
+        
+        self.slots = np.concatenate([self.slots, new_slots])
+        self.motion.add(detections.boxes[unmatched])
+        self._misses = np.concatenate([self._misses, np.zeros(len(unmatched), dtype=np.int32)])
+        self._detected = np.concatenate([self._detected, np.ones(len(unmatched), dtype=bool)])
+        self._confirmed = np.concatenate([self._confirmed, np.zeros(len(unmatched), dtype=bool)])
+        self._lost = np.concatenate([self._lost, np.zeros(len(unmatched), dtype=bool)])
+        self._reported = np.concatenate([self._reported, np.zeros(len(unmatched))])
+        
+        if self.emit_events:
+            self._log_events(now)
         
         # Remove old tracks
-        self._remove_old_tracks()
+        self._remove_old_tracks(now)
+    
+    def end_tracks(self) -> List[Dict]:
+        """
+        End every open track, e.g. when its camera stops sending frames.
+        
+        Returns:
+            Events not drained yet, ending with track_ended of the
+            confirmed tracks
+        """
+        self._misses[:] = self.max_age + 1
+        self._remove_old_tracks(time.time())
+        return self.drain_events()
+    
+    def drain_events(self) -> List[Dict]:
+        """Events logged since the last call, oldest first."""
+        events, self.events = self.events, []
+        return events
+    
+    def totals(self) -> Dict:
+        """Running totals of confirmed tracks."""
+        return {
+            "unique_animals": sum(self.unique_by_class.values()),
+            "unique_by_type": {
+                _animal_type(class_id): count for class_id, count in self.unique_by_class.items()
+            },
+            "in_view": int((self._confirmed & ~self._lost).sum())
+        }
+    
+    def _log_events(self, now: float):
+        """Log the events of a detection frame from the rows' state changes."""
+        observations = self.store.observations[self.slots]
+        detected, confirmed = self._detected, self._confirmed
+        
+        started = detected & ~confirmed & (observations >= self.min_hits)
+        found = detected & self._lost
+        updated = detected & confirmed & ~found & (now - self._reported >= self.update_interval)
+        lost = ~detected & confirmed & ~self._lost
+        
+        for class_id in self.store.class_id[self.slots[started]].tolist():
+            self.unique_by_class[class_id] += 1
+        
+        self._confirmed = confirmed | started
+        self._lost = (self._lost & ~found) | lost
+        self._reported[started | found | updated] = now
+        
+        self._append_events("track_started", np.flatnonzero(started), now)
+        self._append_events("track_updated", np.flatnonzero(found | updated), now)
+        self._append_events("track_lost", np.flatnonzero(lost), now)
+    
+    def _append_events(self, event: str, rows: np.ndarray, now: float):
+        if not len(rows):
+            return
+        
+        slots = self.slots[rows]
+        timestamp = _isoformat(now)
+        boxes = np.round(self.motion.boxes()[rows], 1).tolist()
+        
+        for track_id, class_id, confidence, box in zip(
+            self.store.track_id[slots].tolist(),
+            self.store.class_id[slots].tolist(),
+            self.store.confidence(slots).tolist(),
+            boxes
+        ):
+            self.events.append({
+                "event": event,
+                "track_id": track_id,
+                "animal_type": _animal_type(class_id),
+                "confidence": round(confidence, 3),
+                "bounding_box": box,
+                "timestamp": timestamp
+            })
+    
+    def _log_ended(self, rows: np.ndarray, now: float):
+        slots = self.slots[rows]
+        timestamp = _isoformat(now)
+        
+        for track_id, class_id, confidence, first_seen, last_seen, detections in zip(
+            self.store.track_id[slots].tolist(),
+            self.store.class_id[slots].tolist(),
+            self.store.confidence(slots).tolist(),
+            self.store.first_seen[slots].tolist(),
+            self.store.last_seen[slots].tolist(),
+            self.store.observations[slots].tolist()
+        ):
+            self.events.append({
+                "event": "track_ended",
+                "track_id": track_id,
+                "animal_type": _animal_type(class_id),
+                "confidence": round(confidence, 3),
+                "first_seen": _isoformat(first_seen),
+                "last_seen": _isoformat(last_seen),
+                "dwell_seconds": round(last_seen - first_seen, 1),
+                "detections": detections,
+                "timestamp": timestamp
+            })
+    
+    def current_tracks(self) -> List[Dict]:
+        """
+        JSON-ready state of every active track for the current frame.
+        
+        Boxes come from the motion model, so they are predicted positions
+        on frames without detections ("detected" is False).
+        """
+        boxes = self.motion.boxes().tolist()
         
-        return list(self.tracks.values())
+        return [
+            {
+                "track_id": track_id,
+                "animal_type": _animal_type(class_id),
+                "confidence": confidence,
+                "bounding_box": dict(zip(("x1", "y1", "x2", "y2"), box)),
+                "detected": detected
+            }
+            for track_id, class_id, confidence, box, detected in zip(
+                self.store.track_id[self.slots].tolist(),
+                self.store.class_id[self.slots].tolist(),
+                self.store.confidence(self.slots).tolist(),
+                boxes,
+                self._detected.tolist()
+            )
+        ]
     
-    def _match_detections(self, detections: List[AnimalDetection]) -> Dict[int, int]:
+    def matched_tracks(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Match detections to existing tracks using IOU.
+        Tracks matched to a detection on the current frame.
         
         Returns:
-            Dict mapping track_id to detection index
+            (K,) track IDs, (K,) class IDs, (K, 4) detected boxes and
+            (K,) detection confidences
         """
-        if not self.tracks or not detections:
-            return {}
+        slots = self.slots[self._detected]
+        boxes, scores = self.store.latest(slots)
+        return self.store.track_id[slots], self.store.class_id[slots], boxes, scores
+    
+    def _match_detections(self, detections: Detections) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Two-stage ByteTrack association of detections to predicted track boxes.
         
-        matches = {}
+        Returns:
+            Matched track rows, their detection indices, and the indices of
+            unmatched high-confidence detections
+        """
+        scores = detections.scores
+        high = np.flatnonzero(scores >= self.high_threshold)
+        low = np.flatnonzero((scores >= self.low_threshold) & (scores < self.high_threshold))
         
-        # Calculate IOU matrix
-        track_ids = list(self.tracks.keys())
-        iou_matrix = np.zeros((len(track_ids), len(detections)))
+        if not len(self.slots) or not len(detections):
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp), high
         
-        for i, track_id in enumerate(track_ids):
-            track = self.tracks[track_id]
-            last_bbox = track.positions[-1] if track.positions else None
-            
-            if last_bbox:
-                for j, detection in enumerate(detections):
-                    iou = self._calculate_iou(last_bbox, detection.bounding_box)
-                    iou_matrix[i, j] = iou
+        track_boxes = self.motion.boxes()
         
-        # Hungarian matching (greedy for simplicity)
-        used_detections = set()
+        # First stage: all tracks against high-confidence detections
+        pairs, unmatched_tracks, unmatched_high = self._associate(
+            track_boxes, detections.boxes[high], self.iou_threshold
+        )
+        rows = [t for t, _ in pairs]
+        dets = [high[d] for _, d in pairs]
         
-        for i, track_id in enumerate(track_ids):
-            max_iou_idx = np.argmax(iou_matrix[i, :])
-            max_iou = iou_matrix[i, max_iou_idx]
-            
-            if max_iou >= self.iou_threshold and max_iou_idx not in used_detections:
-                matches[track_id] = max_iou_idx
-                used_detections.add(max_iou_idx)
+        # Second stage: remaining tracks against low-confidence detections
+        pairs, _, _ = self._associate(
+            track_boxes[unmatched_tracks], detections.boxes[low], self.low_iou_threshold
+        )
+        rows += [unmatched_tracks[t] for t, _ in pairs]
+        dets += [low[d] for _, d in pairs]
         
-        return matches
+        return np.array(rows, dtype=np.intp), np.array(dets, dtype=np.intp), high[unmatched_high]
     
-    def _calculate_iou(self, bbox1: BoundingBox, bbox2: BoundingBox) -> float:
-        """Calculate Intersection over Union."""
-        # Intersection area
-        x1 = max(bbox1.x1, bbox2.x1)
-        y1 = max(bbox1.y1, bbox2.y1)
-        x2 = min(bbox1.x2, bbox2.x2)
-        y2 = min(bbox1.y2, bbox2.y2)
+    def _associate(self, track_boxes: np.ndarray, det_boxes: np.ndarray,
+                   iou_threshold: float) -> Tuple[List[Tuple[int, int]], np.ndarray, np.ndarray]:
+        """
+        Optimal one-to-one assignment maximizing total IOU.
         
-        if x2 < x1 or y2 < y1:
-            return 0.0
+        Pairs below iou_threshold are never matched. In dense scenes only
+        pairs sharing a spatial grid cell are scored (see track_gating).
         
-        intersection = (x2 - x1) * (y2 - y1)
+        Returns:
+            Matched (track row, detection row) pairs, unmatched track rows
+            and unmatched detection rows
+        """
+        if not len(track_boxes) or not len(det_boxes):
+            return [], np.arange(len(track_boxes)), np.arange(len(det_boxes))
         
-        # Union area
-        area1 = bbox1.area
-        area2 = bbox2.area
-        union = area1 + area2 - intersection
+        if len(track_boxes) * len(det_boxes) >= self.grid_min_pairs:
+            rows, cols = gated_iou_assignment(track_boxes, det_boxes, iou_threshold)
+        else:
+            iou = iou_matrix(track_boxes, det_boxes)
+            iou[iou < iou_threshold] = 0.0
+            rows, cols = linear_sum_assignment(iou, maximize=True)
+            keep = iou[rows, cols] > 0.0
+            rows, cols = rows[keep], cols[keep]
         
-        return intersection / union if union > 0 else 0.0
+        unmatched_tracks = np.setdiff1d(np.arange(len(track_boxes)), rows)
+        unmatched_dets = np.setdiff1d(np.arange(len(det_boxes)), cols)
+        return list(zip(rows.tolist(), cols.tolist())), unmatched_tracks, unmatched_dets
     
-    def _remove_old_tracks(self):
-        """Remove tracks that haven't been updated."""
-        current_time = datetime.utcnow()
-        to_remove = []
+    def _remove_old_tracks(self, now: float):
+        """Remove tracks missed on more than max_age detection frames."""
+        keep = self._misses <= self.max_age
+        if keep.all():
+            return
         
-        for track_id, track in self.tracks.items():
-            age = (current_time - track.last_seen).total_seconds()
-            if age > self.max_age:
-                to_remove.append(track_id)
+        if self.emit_events:
+            self._log_ended(np.flatnonzero(~keep & self._confirmed), now)
         
-        for track_id in to_remove:
-            del self.tracks[track_id]
+        self.store.release(self.slots[~keep])
+        self.slots = self.slots[keep]
+        self.motion.keep(keep)
+        self._misses = self._misses[keep]
+        self._detected = self._detected[keep]
+        self._confirmed = self._confirmed[keep]
+        self._lost = self._lost[keep]
+        self._reported = self._reported[keep]
+
+
+def _animal_type(class_id: int) -> str:
+    return class_animal_type(class_id).value
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.utcfromtimestamp(timestamp).isoformat()
+
+
+def _video_fps(video_path: str) -> float:
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return fps or settings.CAMERA_FPS
 
 
 class TrackingService:
-    """Animal tracking and counting service."""
+    """
+    Animal tracking and counting service.
     
-    def __init__(self):
-        self.tracker = ByteTracker()
+    Keeps one ByteTracker per camera (or video job), so detections from
+    different cameras are never matched against each other. Trackers idle
+    for TRACKER_IDLE_SECONDS are evicted. With TRACKING_WORKERS > 0 each
+    camera's tracker lives in one of several worker processes instead
+    (see TrackerShards), spreading tracking across cores.
+    """
+    
+    def __init__(self, workers: int = None):
+        """
+        Args:
+            workers: Tracking worker processes (settings.TRACKING_WORKERS,
+                0 = track in this process)
+        """
+        if workers is None:
+            workers = settings.TRACKING_WORKERS
+        
+        self.trackers: Dict[str, ByteTracker] = {}
+        self.idle_seconds = settings.TRACKER_IDLE_SECONDS
+        self._last_used: Dict[str, float] = {}
+        self._last_eviction = time.monotonic()
+        self.shards = TrackerShards(workers, settings.TRACKING_SHARDS) if workers > 0 else None
+        self.snapshot_path = settings.TRACKING_SNAPSHOT_PATH
+        self._checkpoint_task: Optional[asyncio.Task] = None
+        
+        # track_ended deltas of evicted trackers, handed out with the next update()
+        self._evicted: List[Dict] = []
+        
+        # Track event subscribers: (camera ID or None for all, queue)
+        self._subscribers: List[Tuple[Optional[str], asyncio.Queue]] = []
+        self.events_dropped = 0
+        
+        # Cross-camera animal IDs from appearance (API process only)
+        self.reid = ReIdentifier(
+            min_similarity=settings.REID_MIN_SIMILARITY,
+            ttl=settings.REID_TTL_SECONDS,
+            partitions=settings.REID_INDEX_PARTITIONS
+        ) if settings.REID_ENABLED else None
         self._ready = True
     
     def is_ready(self) -> bool:
         """Check if service is ready."""
         return self._ready
     
-    def update(self, frame: np.ndarray, detections: List[AnimalDetection]) -> List[TrackingInfo]:
+    async def start(self):
+        """Resume from a recent snapshot and start periodic checkpoints."""
+        await self.restore()
+        if settings.TRACKING_SNAPSHOT_INTERVAL > 0:
+            self._checkpoint_task = asyncio.create_task(
+                self._checkpoint_loop(settings.TRACKING_SNAPSHOT_INTERVAL)
+            )
+    
+    async def stop(self):
+        """Write a final checkpoint so a restart resumes where this one ended."""
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            self._checkpoint_task = None
+            await self.checkpoint()
+        self.shutdown()
+    
+    def shutdown(self):
+        if self.shards is not None:
+            self.shards.shutdown()
+    
+    def create_tracker(self, emit_events: bool = True) -> ByteTracker:
+        """A new tracker configured from settings."""
+        return ByteTracker(
+            high_threshold=settings.DETECTION_CONFIDENCE,
+            low_threshold=settings.TRACK_LOW_CONFIDENCE,
+            history_size=settings.TRACK_HISTORY_SIZE,
+            history_downsample=settings.TRACK_HISTORY_DOWNSAMPLE,
+            grid_min_pairs=settings.TRACK_GRID_MIN_PAIRS,
+            emit_events=emit_events,
+            update_interval=settings.TRACK_EVENT_UPDATE_INTERVAL
+        )
+    
+    def get_tracker(self, camera_id: str = DEFAULT_CAMERA) -> ByteTracker:
+        """The tracker for a camera or job, created on first use."""
+        now = time.monotonic()
+        if now - self._last_eviction > min(self.idle_seconds, 60):
+            self.evict_idle()
+        
+        if camera_id not in self.trackers:
+            self.trackers[camera_id] = self.create_tracker()
+            logger.info(f"Started tracker for {camera_id}")
+        self._last_used[camera_id] = now
+        return self.trackers[camera_id]
+    
+    def evict_idle(self) -> List[str]:
+        """
+        Drop trackers not updated for idle_seconds; returns their camera IDs.
+        
+        Their open tracks are ended first. The track_ended deltas go out
+        with the next update(), so update_async() publishes them in the API
+        process even when the trackers live in a tracking worker.
+        """
+        now = time.monotonic()
+        self._last_eviction = now
+        
+        idle = [
+            camera_id for camera_id, last_used in self._last_used.items()
+            if now - last_used > self.idle_seconds
+        ]
+        for camera_id in idle:
+            delta = self.end_tracks(camera_id)
+            del self.trackers[camera_id]
+            del self._last_used[camera_id]
+            if delta["events"]:
+                self._evicted.append(delta)
+            logger.info(f"Evicted idle tracker for {camera_id}")
+        return idle
+    
+    def end_tracks(self, camera_id: str) -> Dict:
+        """
+        End all open tracks of a camera in this process (see ByteTracker.end_tracks).
+        
+        Returns:
+            Delta like update() with the track_ended events
+        """
+        tracker = self.trackers.get(camera_id)
+        if tracker is None:
+            return {"camera_id": camera_id, "events": []}
+        
+        delta = {"camera_id": camera_id, "events": tracker.end_tracks()}
+        if delta["events"]:
+            delta["totals"] = tracker.totals()
+        return delta
+    
+    async def end_camera(self, camera_id: str):
+        """End a camera's open tracks, e.g. when its stream closes, and publish the events."""
+        if self.shards is not None:
+            delta = await self.shards.call(camera_id, "end_tracks", camera_id)
+        else:
+            delta = self.end_tracks(camera_id)
+        self._deliver(delta)
+    
+    def update(self, frame: Optional[np.ndarray], detections: Optional[Detections] = None,
+               camera_id: str = DEFAULT_CAMERA) -> Dict:
         """
-        Update tracking with new detections.
+        Update tracking for one frame of a camera, in this process.
         
         Args:
             frame: Current frame (not used currently, for future enhancements)
-            detections: List of detections
+            detections: Detections for the frame, or None if detection was
+                        skipped on it (tracks are propagated by their motion)
+            camera_id: Camera or job the frame belongs to
             
         Returns:
-            List of tracked animals
+            Delta of the frame: camera_id, its track events (see ByteTracker)
+            and, if there were any, the camera's updated totals
         """
-        return self.tracker.update(detections)
+        tracker = self.get_tracker(camera_id)
+        tracker.update(detections)
+        
+        delta = {"camera_id": camera_id, "events": tracker.drain_events()}
+        if delta["events"]:
+            delta["totals"] = tracker.totals()
+        if self._evicted:
+            delta["evicted"], self._evicted = self._evicted, []
+        return delta
     
-    async def process_video(self, video_path: str) -> Dict:
+    async def update_async(self, camera_id: str, detections: Optional[Detections] = None,
+                           frame: Optional[np.ndarray] = None) -> Dict:
         """
-        Process entire video for tracking.
+        update() on the worker process that owns the camera, if sharded.
+        
+        With re-identification enabled and the frame given, events get the
+        tracks' cross-camera "animal_id". Deltas with events are also
+        published to subscribe() iterators.
+        """
+        if self.shards is not None:
+            delta = await self.shards.call(camera_id, "update", None, detections, camera_id)
+        else:
+            delta = self.update(None, detections, camera_id)
+        
+        # Trackers a worker evicted since the last update
+        for evicted in delta.pop("evicted", []):
+            self._deliver(evicted)
+        
+        self._deliver(delta, frame)
+        return delta
+    
+    def _deliver(self, delta: Dict, frame: Optional[np.ndarray] = None):
+        """Add re-identification to a delta with events and publish it."""
+        if not delta["events"]:
+            return
+        if self.reid is not None:
+            self.reid.process(delta["camera_id"], delta["events"], frame)
+            delta["totals"]["reid_unique_animals"] = self.reid.unique_animals
+        self._publish(delta)
+    
+    async def subscribe(self, camera_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """
+        Async iterator of the track event deltas of one camera, or of all.
+        
+        A subscriber that falls more than EVENT_QUEUE_SIZE deltas behind
+        misses the newest ones rather than holding up tracking.
+        """
+        updates: asyncio.Queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        subscriber = (camera_id, updates)
+        self._subscribers.append(subscriber)
+        
+        try:
+            while True:
+                yield await updates.get()
+        finally:
+            self._subscribers.remove(subscriber)
+    
+    def _publish(self, delta: Dict):
+        for camera_id, updates in self._subscribers:
+            if camera_id is not None and camera_id != delta["camera_id"]:
+                continue
+            try:
+                updates.put_nowait(delta)
+            except asyncio.QueueFull:
+                self.events_dropped += 1
+    
+    def camera_stats(self, camera_id: str) -> Optional[Dict]:
+        """Statistics of one camera's tracker in this process (None if unknown)."""
+        tracker = self.trackers.get(camera_id)
+        if tracker is None:
+            return None
+        
+        return {
+            "active_tracks": len(tracker),
+            "total_tracked": tracker.next_id - 1,
+            "frame_count": tracker.frame_count,
+            "idle_seconds": round(time.monotonic() - self._last_used[camera_id], 1),
+            "history": tracker.store.stats(),
+            **tracker.totals()
+        }
+    
+    def local_stats(self) -> Dict[str, Dict]:
+        """camera_stats() of every tracker in this process."""
+        return {camera_id: self.camera_stats(camera_id) for camera_id in list(self.trackers)}
+    
+    def tracked_animals(self, camera_id: str, positions: bool = False) -> List[Dict]:
+        """
+        Currently tracked animals of one camera in this process.
+        
+        Args:
+            camera_id: Camera to list
+            positions: Also list each track's position history, oldest first
+        """
+        tracker = self.trackers.get(camera_id)
+        if tracker is None:
+            return []
+        
+        store, slots = tracker.store, tracker.slots
+        animals = [
+            {
+                "camera_id": camera_id,
+                "track_id": track_id,
+                "animal_type": _animal_type(class_id),
+                "confidence": confidence,
+                "first_seen": _isoformat(first_seen),
+                "last_seen": _isoformat(last_seen),
+                "position_count": position_count
+            }
+            for track_id, class_id, confidence, first_seen, last_seen, position_count in zip(
+                store.track_id[slots].tolist(),
+                store.class_id[slots].tolist(),
+                store.confidence(slots).tolist(),
+                store.first_seen[slots].tolist(),
+                store.last_seen[slots].tolist(),
+                store.length[slots].tolist()
+            )
+        ]
+        if positions:
+            for animal, slot in zip(animals, slots.tolist()):
+                times, boxes, scores = store.history(slot)
+                animal["positions"] = [
+                    {"timestamp": _isoformat(timestamp), "bounding_box": box, "confidence": score}
+                    for timestamp, box, score in zip(times.tolist(), boxes.tolist(), scores.tolist())
+                ]
+        return animals
+    
+    def all_tracked_animals(self, positions: bool = False) -> List[Dict]:
+        """tracked_animals() of every camera in this process."""
+        return [
+            animal
+            for camera_id in list(self.trackers)
+            for animal in self.tracked_animals(camera_id, positions)
+        ]
+    
+    async def stream_video(self, video_path: str, detection_service, detect_interval: int = None,
+                           partial_every: int = 0,
+                           progress: Optional[Callable[[float], None]] = None) -> AsyncIterator[Dict]:
+        """
+        Detect and track animals through a video, yielding summaries.
+        
+        Frames are decoded lazily, detected in batches on the detection
+        service's inference workers (the next batch is decoded while one is
+        in flight) and tracked with a fresh tracker for this video only.
+        Tracker output is folded into a TrackSummary as it goes, so memory
+        does not grow with video length.
         
         Args:
             video_path: Path to video file
+            detection_service: Initialized DetectionService
+            detect_interval: Detect every Nth frame (default
+                             VIDEO_TRACK_DETECT_INTERVAL); tracks are
+                             predicted on the frames in between
+            partial_every: Also yield a partial summary (without
+                           trajectories) every this many frames, 0 = never
+            progress: Called with the fraction of the video processed
             
-        Returns:
-            Processing results
+        Yields:
+            Partial summaries ("partial": True), then the final summary
         """
-        cap = cv2.VideoCapture(video_path)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        detect_interval = max(1, detect_interval or settings.VIDEO_TRACK_DETECT_INTERVAL)
+        sampler = FrameSampler(video_path, sample_rates=(detect_interval,))
+        tracker = self.create_tracker(emit_events=False)
+        summary = TrackSummary(_video_fps(video_path), min_hits=tracker.min_hits)
+        batch_size = max(1, detection_service.batch_size)
+        
+        last_partial = 0
+        frames = iter(sampler)
+        batch = list(itertools.islice(frames, batch_size))
         
-        results = {
-            "total_frames": total_frames,
-            "unique_animals": 0,
-            "tracks": []
+        while batch:
+            pending = detection_service.submit_batch([frame for _, frame in batch], settings.TRACK_LOW_CONFIDENCE)
+            indices = [frame_index for frame_index, _ in batch]
+            batch = list(itertools.islice(frames, batch_size))
+            
+            for frame_index, detections in zip(indices, await asyncio.wrap_future(pending)):
+                # Predict through the frames detection skipped
+                for _ in range(frame_index - tracker.frame_count - 1):
+                    tracker.update(None)
+                tracker.update(detections)
+                summary.add(frame_index, *tracker.matched_tracks())
+            
+            if progress is not None:
+                progress(sampler.progress)
+            if partial_every and indices[-1] - last_partial >= partial_every:
+                last_partial = indices[-1]
+                yield {**summary.result(include_trajectories=False), "partial": True}
+        
+        yield {
+            **summary.result(),
+            "total_frames": sampler.total_frames,
+            "detect_interval": detect_interval,
+            "partial": False
         }
+    
+    async def process_video(self, video_path: str, detection_service,
+                            progress: Optional[Callable[[float], None]] = None) -> Dict:
+        """
+        Process entire video for tracking.
         
-        cap.release()
+        Args:
+            video_path: Path to video file
+            detection_service: Initialized DetectionService
+            progress: Called with the fraction of the video processed
+            
+        Returns:
+            Unique animal counts, per-track dwell times and trajectories
+            (see stream_video)
+        """
+        async for results in self.stream_video(video_path, detection_service, progress=progress):
+            pass
         return results
     
-    async def get_stats(self) -> Dict:
-        """Get tracking statistics."""
+    def snapshot_state(self) -> TrackerStates:
+        """Copies of every tracker's state in this process."""
+        return {camera_id: tracker.get_state() for camera_id, tracker in self.trackers.items()}
+    
+    def restore_state(self, states: TrackerStates):
+        """Recreate trackers in this process from snapshot_state() output."""
+        now = time.monotonic()
+        for camera_id, state in states.items():
+            tracker = self.create_tracker()
+            try:
+                tracker.set_state(state)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"⚠️ Not restoring tracker for {camera_id}: {e}")
+                continue
+            self.trackers[camera_id] = tracker
+            self._last_used[camera_id] = now
+    
+    async def checkpoint(self):
+        """
+        Save all trackers to the snapshot file.
+        
+        State is copied between frames; the file is written on a thread so
+        tracking is not held up by disk I/O.
+        """
+        start = time.perf_counter()
+        if self.shards is not None:
+            states = {}
+            for shard_states in await self.shards.call_all("snapshot_state"):
+                states.update(shard_states)
+        else:
+            states = self.snapshot_state()
+        captured = time.perf_counter() - start
+        
+        size = await asyncio.to_thread(write_snapshot, self.snapshot_path, states)
+        logger.debug(
+            f"Tracking checkpoint: {len(states)} cameras, {size / 1e3:.0f} kB, "
+            f"state copied in {captured * 1000:.1f} ms"
+        )
+    
+    async def restore(self) -> int:
+        """
+        Restore trackers from the snapshot file if it is recent enough
+        (TRACKING_SNAPSHOT_MAX_AGE).
+        
+        Returns:
+            Number of cameras restored
+        """
+        states = await asyncio.to_thread(
+            read_snapshot, self.snapshot_path, settings.TRACKING_SNAPSHOT_MAX_AGE
+        )
+        if not states:
+            return 0
+        
+        if self.shards is not None:
+            by_shard: Dict[int, TrackerStates] = {}
+            for camera_id, state in states.items():
+                by_shard.setdefault(self.shards.shard_for(camera_id), {})[camera_id] = state
+            await asyncio.gather(*(
+                self.shards.call(next(iter(group)), "restore_state", group)
+                for group in by_shard.values()
+            ))
+        else:
+            self.restore_state(states)
+        
+        logger.info(f"✅ Restored trackers for {len(states)} cameras")
+        return len(states)
+    
+    async def _checkpoint_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                logger.error(f"Tracking checkpoint failed: {e}")
+    
+    async def get_stats(self, camera_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Get tracking statistics.
+        
+        Args:
+            camera_id: One camera's statistics (None if it has no tracker);
+                       by default totals over all cameras plus per-camera stats
+        """
+        if camera_id is not None:
+            if self.shards is not None:
+                stats = await self.shards.call(camera_id, "camera_stats", camera_id)
+                return stats and {**stats, "worker": self.shards.shard_for(camera_id)}
+            return self.camera_stats(camera_id)
+        
+        if self.shards is not None:
+            cameras = {}
+            for shard, shard_stats in enumerate(await self.shards.call_all("local_stats")):
+                cameras.update({key: {**value, "worker": shard} for key, value in shard_stats.items()})
+        else:
+            cameras = self.local_stats()
+        
         return {
-            "active_tracks": len(self.tracker.tracks),
-            "total_tracked": self.tracker.next_id - 1,
-            "frame_count": self.tracker.frame_count
+            "active_tracks": sum(c["active_tracks"] for c in cameras.values()),
+            "total_tracked": sum(c["total_tracked"] for c in cameras.values()),
+            "frame_count": sum(c["frame_count"] for c in cameras.values()),
+            "unique_animals": sum(c["unique_animals"] for c in cameras.values()),
+            "events_dropped": self.events_dropped,
+            "reid": self.reid.stats() if self.reid is not None else None,
+            "cameras": cameras
         }
     
-    async def get_tracked_animals(self) -> List[Dict]:
-        """Get all currently tracked animals."""
-        return [
-            {
-                "track_id": track.track_id,
-                "animal_type": track.animal_type.value,
-                "confidence": track.confidence_avg,
-                "first_seen": track.first_seen.isoformat(),
-                "last_seen": track.last_seen.isoformat(),
-                "position_count": len(track.positions)
-            }
-            for track in self.tracker.tracks.values()
-        ]
+    async def get_tracked_animals(self, camera_id: Optional[str] = None, positions: bool = False) -> List[Dict]:
+        """Get currently tracked animals of one camera, or of all cameras, optionally with their positions."""
+        if self.shards is None:
+            if camera_id is not None:
+                return self.tracked_animals(camera_id, positions)
+            return self.all_tracked_animals(positions)
+        
+        if camera_id is not None:
+            return await self.shards.call(camera_id, "tracked_animals", camera_id, positions)
+        return [animal for shard in await self.shards.call_all("all_tracked_animals", positions) for animal in shard]
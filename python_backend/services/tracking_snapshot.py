@@ -0,0 +1,77 @@
+"""Binary checkpoints of tracker state for resuming after a restart."""
+import io
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Camera ID -> ByteTracker.get_state() arrays
+TrackerStates = Dict[str, Dict[str, np.ndarray]]
+
+
+def write_snapshot(path: Path, states: TrackerStates) -> int:
+    """
+    Write tracker states as one uncompressed .npz file, atomically.
+
+    Returns:
+        Bytes written
+    """
+    cameras = list(states)
+    arrays = {
+        "saved_at": np.array(time.time()),
+        "cameras": np.array(cameras, dtype=str)
+    }
+    for index, camera_id in enumerate(cameras):
+        for name, array in states[camera_id].items():
+            arrays[f"{index}:{name}"] = array
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as f:
+        f.write(buffer.getbuffer())
+    os.replace(temp_path, path)
+    return buffer.tell()
+
+
+def read_snapshot(path: Path, max_age: float) -> Optional[TrackerStates]:
+    """
+    Read tracker states written by write_snapshot.
+
+    Args:
+        path: Snapshot file
+        max_age: Ignore snapshots older than this many seconds
+
+    Returns:
+        None if there is no usable snapshot
+    """
+    if not path.exists():
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            age = time.time() - float(data["saved_at"])
+            if age > max_age:
+                logger.info(f"Tracking snapshot is {age:.0f}s old, starting fresh")
+                return None
+
+            states = {str(camera_id): {} for camera_id in data["cameras"]}
+            cameras = list(states)
+            for key in data.files:
+                index, sep, name = key.partition(":")
+                if sep:
+                    states[cameras[int(index)]][name] = data[key]
+
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"⚠️ Ignoring unreadable tracking snapshot {path}: {e}")
+        return None
+
+    logger.info(f"Loaded tracking snapshot of {len(states)} cameras, {age:.0f}s old")
+    return states
@@ -0,0 +1,138 @@
+"""Chunked streaming of uploaded videos to disk."""
+import hashlib
+import os
+import threading
+from typing import AsyncIterator, Dict, Optional
+import logging
+
+import aiofiles
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Uploads still being received, keyed by final video path
+_active_uploads: Dict[str, "UploadStream"] = {}
+
+
+def remove_file(path: str):
+    """Delete a file if it exists, logging (not raising) on failure."""
+    try:
+        if path and os.path.exists(path):
+            os.unlink(path)
+    except OSError as e:
+        logger.warning(f"Failed to remove {path}: {e}")
+
+
+async def save_upload(file, video_path: str) -> str:
+    """
+    Copy an uploaded file to disk in UPLOAD_CHUNK_SIZE chunks.
+
+    Memory use stays constant regardless of the upload size. The partial
+    file is removed if the copy fails.
+
+    Args:
+        file: FastAPI UploadFile (anything with an async read(size))
+        video_path: Destination path
+
+    Returns:
+        SHA-256 hex digest of the contents
+    """
+    digest = hashlib.sha256()
+
+    try:
+        async with aiofiles.open(video_path, "wb") as out:
+            while True:
+                chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        remove_file(video_path)
+        raise
+
+    return digest.hexdigest()
+
+
+def get_active_upload(video_path: str) -> Optional["UploadStream"]:
+    """The in-progress upload for a video path, if it is still arriving."""
+    return _active_uploads.get(video_path)
+
+
+class UploadStream:
+    """
+    A video that is analysed while it is still being uploaded.
+
+    Chunks are appended to `<video_path>.part`; once the upload completes the
+    file is renamed to `video_path`. Readers (FrameSampler) wait on the
+    stream for more data when they reach the end of what has arrived.
+    """
+
+    def __init__(self, video_path: str):
+        self.video_path = video_path
+        self.partial_path = f"{video_path}.part"
+        self.bytes_received = 0
+        self.complete = False
+        self.failed = False
+        self.content_hash: Optional[str] = None
+        self._changed = threading.Condition()
+
+        _active_uploads[video_path] = self
+
+    @property
+    def current_path(self) -> str:
+        """Path readers should open right now."""
+        return self.video_path if self.complete else self.partial_path
+
+    def wait_for_data(self, seen_bytes: int, timeout: float = 1.0) -> bool:
+        """
+        Block until more than `seen_bytes` have arrived or the upload ended.
+
+        Returns:
+            False if the upload failed, True otherwise
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self.bytes_received > seen_bytes or self.complete or self.failed,
+                timeout
+            )
+        return not self.failed
+
+    async def receive(self, chunks: AsyncIterator[bytes]) -> str:
+        """
+        Write incoming chunks to disk, waking readers after each one.
+
+        Returns:
+            SHA-256 hex digest of the contents
+        """
+        digest = hashlib.sha256()
+
+        try:
+            async with aiofiles.open(self.partial_path, "wb") as out:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    digest.update(chunk)
+                    await out.write(chunk)
+                    await out.flush()
+                    self._notify(bytes_received=self.bytes_received + len(chunk))
+
+            os.replace(self.partial_path, self.video_path)
+            self.content_hash = digest.hexdigest()
+            self._notify(complete=True)
+            return self.content_hash
+
+        except BaseException:
+            self._notify(failed=True)
+            remove_file(self.partial_path)
+            raise
+
+        finally:
+            _active_uploads.pop(self.video_path, None)
+
+    def _notify(self, **changes):
+        with self._changed:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self._changed.notify_all()
@@ -0,0 +1,420 @@
+"""
+Single-pass video analysis pipeline.
+
+Decodes an uploaded video once, runs YOLOv8 once (batched) on the union of
+the frames sampled by the registered consumers, and feeds the shared per-frame
+detections to each consumer (animal counting, milking, lameness).
+"""
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+from typing import Callable, Dict, List, Any, Iterator, Optional, Tuple
+import logging
+
+from services.batch_inference import iter_batched
+from services.frame_sampler import FrameSampler
+
+logger = logging.getLogger(__name__)
+
+CATTLE_CLASSES = ('cow', 'cattle')
+BUFFALO_CLASSES = ('buffalo', 'ox')
+OTHER_ANIMAL_CLASSES = ('dog', 'cat', 'horse', 'sheep', 'bird', 'person')
+
+
+def get_bbox_center(bbox: List[float]) -> tuple:
+    """Calculate center point of bounding box"""
+    return ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+
+
+class FrameConsumer(ABC):
+    """
+    Base class for an analysis fed from the shared frame loop.
+
+    Subclasses set `sample_rate` (analyse every Nth frame, 1-based like the
+    original per-analysis loops) and implement `consume` and `result`.
+    `merge` folds in a consumer that processed the following time segment
+    of the same video, so segments can be processed in parallel.
+    """
+
+    sample_rate = 1
+
+    def wants(self, frame_index: int) -> bool:
+        """Whether this consumer analyses the given (1-based) frame."""
+        return frame_index % self.sample_rate == 0
+
+    @abstractmethod
+    def consume(self, frame_index: int, frame: np.ndarray, detections: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def merge(self, other: 'FrameConsumer'):
+        raise NotImplementedError
+
+    @abstractmethod
+    def result(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class AnimalCountConsumer(FrameConsumer):
+    """Counts cattle and buffalo and collects other animal classes."""
+
+    sample_rate = 10
+
+    def __init__(self, confidence_threshold: float = 0.5):
+        self.confidence_threshold = confidence_threshold
+        self.cattle_detections = []
+        self.buffalo_detections = []
+        self.other_animals = set()
+        self.frames_processed = 0
+
+    def consume(self, frame_index, frame, detections):
+        self.frames_processed += 1
+
+        for det in detections:
+            if det['confidence'] <= self.confidence_threshold:
+                continue
+
+            class_name = det['class_name']
+            if class_name in CATTLE_CLASSES:
+                target = self.cattle_detections
+            elif class_name in BUFFALO_CLASSES:
+                target = self.buffalo_detections
+            else:
+                if class_name in OTHER_ANIMAL_CLASSES:
+                    self.other_animals.add(class_name)
+                continue
+
+            target.append({
+                'frame': frame_index,
+                'confidence': det['confidence'],
+                'bbox': det['bbox'],
+                'center': get_bbox_center(det['bbox'])
+            })
+
+    def merge(self, other):
+        self.cattle_detections.extend(other.cattle_detections)
+        self.buffalo_detections.extend(other.buffalo_detections)
+        self.other_animals |= other.other_animals
+        self.frames_processed += other.frames_processed
+
+    def result(self):
+        # Estimate unique animals using spatial clustering
+        cattle_count = self._estimate_unique_count(self.cattle_detections)
+        buffalo_count = self._estimate_unique_count(self.buffalo_detections)
+
+        logger.info(f"Detection complete: {cattle_count} cattle, {buffalo_count} buffalo")
+
+        return {
+            'total_count': cattle_count + buffalo_count + len(self.other_animals),
+            'cattle_count': cattle_count,
+            'buffalo_count': buffalo_count,
+            'other_animals': list(self.other_animals),
+            'total_frames_processed': self.frames_processed
+        }
+
+    @staticmethod
+    def _estimate_unique_count(detections: List[Dict]) -> int:
+        """
+        Estimate unique animal count using spatial clustering
+        Groups nearby detections across frames
+        """
+        if not detections:
+            return 0
+
+        # Group detections by frame
+        frames = {}
+        for det in detections:
+            frames.setdefault(det['frame'], []).append(det['center'])
+
+        # Find maximum concurrent detections
+        max_concurrent = max(len(frame_detections) for frame_detections in frames.values())
+
+        return max(1, max_concurrent)
+
+
+class MilkingConsumer(FrameConsumer):
+    """Looks for milking equipment in the udder region of detected cattle."""
+
+    sample_rate = 15
+
+    def __init__(self):
+        self.milking_indicators = 0
+        self.total_frames = 0
+
+    def consume(self, frame_index, frame, detections):
+        self.total_frames += 1
+
+        for det in detections:
+            if det['class_name'] not in CATTLE_CLASSES:
+                continue
+
+            bbox = det['bbox']
+
+            # Analyze lower third of bounding box (udder region)
+            height = bbox[3] - bbox[1]
+            udder_region = frame[
+                int(bbox[1] + height * 0.66):int(bbox[3]),
+                int(bbox[0]):int(bbox[2])
+            ]
+
+            # Check for milking indicators (white/gray equipment)
+            if self._detect_milking_equipment(udder_region):
+                self.milking_indicators += 1
+
+    def merge(self, other):
+        self.milking_indicators += other.milking_indicators
+        self.total_frames += other.total_frames
+
+    def result(self):
+        # Determine milking status
+        if self.total_frames == 0:
+            is_milking = False
+            confidence = 0.0
+        else:
+            milking_ratio = self.milking_indicators / self.total_frames
+            is_milking = milking_ratio > 0.3
+            confidence = min(0.95, 0.6 + milking_ratio)
+
+        logger.info(f"Milking assessment: {is_milking} (confidence: {confidence:.2f})")
+
+        return {
+            'is_milking': is_milking,
+            'milking_confidence': confidence,
+            'frames_with_milking': self.milking_indicators,
+            'total_frames_analyzed': self.total_frames
+        }
+
+    @staticmethod
+    def _detect_milking_equipment(region: np.ndarray) -> bool:
+        """
+        Detect milking equipment in udder region
+        Looks for white/gray metallic surfaces
+        """
+        if region.size == 0:
+            return False
+
+        try:
+            # Convert to grayscale
+            gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+
+            # Look for bright metallic surfaces (milking cups)
+            bright_ratio = np.count_nonzero(gray > 180) / gray.size
+
+            # If > 15% bright pixels, likely milking equipment
+            return bright_ratio > 0.15
+
+        except Exception:
+            return False
+
+
+class LamenessConsumer(FrameConsumer):
+    """Measures frame-to-frame movement irregularity of detected cattle."""
+
+    sample_rate = 5
+
+    def __init__(self):
+        self.movement_data = []
+        self.prev_positions = {}
+        # Positions in the first analysed frame, for stitching segments
+        self.first_positions = None
+
+    def consume(self, frame_index, frame, detections):
+        current_positions = {}
+
+        for idx, det in enumerate(detections):
+            if det['class_name'] not in CATTLE_CLASSES:
+                continue
+
+            center = get_bbox_center(det['bbox'])
+
+            # Track individual cattle (simplified)
+            animal_id = f"cattle_{idx}"
+            current_positions[animal_id] = center
+
+            # Calculate movement if previous position exists
+            if animal_id in self.prev_positions:
+                prev_center = self.prev_positions[animal_id]
+
+                # Movement irregularity (sudden changes indicate lameness)
+                dx = center[0] - prev_center[0]
+                dy = center[1] - prev_center[1]
+                self.movement_data.append(np.sqrt(dx**2 + dy**2))
+
+        if self.first_positions is None:
+            self.first_positions = current_positions
+        self.prev_positions = current_positions
+
+    def merge(self, other):
+        if other.first_positions is None:
+            return
+
+        # Stitch tracks across the segment boundary: movement between the
+        # last frame of this segment and the first frame of the next
+        for animal_id, center in other.first_positions.items():
+            if animal_id in self.prev_positions:
+                prev_center = self.prev_positions[animal_id]
+                dx = center[0] - prev_center[0]
+                dy = center[1] - prev_center[1]
+                self.movement_data.append(np.sqrt(dx**2 + dy**2))
+
+        self.movement_data.extend(other.movement_data)
+        if self.first_positions is None:
+            self.first_positions = other.first_positions
+        self.prev_positions = other.prev_positions
+
+    def result(self):
+        # Analyze gait pattern
+        if self.movement_data:
+            avg_movement = np.mean(self.movement_data)
+            std_movement = np.std(self.movement_data)
+
+            # High std deviation indicates irregular gait (lameness)
+            irregularity_score = std_movement / (avg_movement + 1e-6)
+
+            # Map to lameness score (0-5)
+            lameness_score = min(5, int(irregularity_score * 3))
+
+            if lameness_score == 0:
+                severity = 'Normal'
+            elif lameness_score <= 2:
+                severity = 'Mild Lameness'
+            elif lameness_score <= 4:
+                severity = 'Moderate Lameness'
+            else:
+                severity = 'Severe Lameness'
+
+            confidence = min(0.95, 0.70 + (len(self.movement_data) / 200))
+        else:
+            lameness_score = 0
+            severity = 'Normal'
+            confidence = 0.5
+
+        logger.info(f"Lameness detection: Score {lameness_score} - {severity}")
+
+        return {
+            'lameness_score': lameness_score,
+            'lameness_severity': severity,
+            'lameness_confidence': confidence,
+            'is_lame': lameness_score > 1,
+            'movement_samples': len(self.movement_data)
+        }
+
+
+class VideoPipeline:
+    """
+    Decode a video once and share detections between consumers.
+
+    Only frames wanted by at least one consumer are decoded (see
+    FrameSampler). The detector runs on them in batches of `batch_size`
+    frames, and every consumer that wants the frame receives the same
+    detections. In fast-scan mode one frame per interval is decoded and
+    every consumer receives it.
+    """
+
+    def __init__(
+        self,
+        model,
+        consumers: List[FrameConsumer],
+        batch_size: int = 1,
+        fast_scan: bool = False
+    ):
+        self.model = model
+        self.consumers = consumers
+        self.batch_size = batch_size
+        self.fast_scan = fast_scan
+
+    def run(
+        self,
+        video_path: str,
+        progress: Optional[Callable[[float], None]] = None,
+        upload=None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run all consumers over the video.
+
+        Args:
+            progress: Called with the fraction of the video processed
+            upload: UploadStream if the video is still being uploaded
+
+        Returns:
+            One result dict per consumer, in registration order
+        """
+        self.feed(video_path, progress=progress, upload=upload)
+        return [consumer.result() for consumer in self.consumers]
+
+    def feed(
+        self,
+        video_path: str,
+        start_frame: int = 1,
+        end_frame: int = None,
+        progress: Optional[Callable[[float], None]] = None,
+        upload=None
+    ):
+        """
+        Feed a frame range of the video to the consumers without
+        producing results (used for per-segment processing).
+
+        Args:
+            progress: Called with the fraction of the range processed
+            upload: UploadStream if the video is still being uploaded
+        """
+        sampler = FrameSampler(
+            video_path,
+            sample_rates=[c.sample_rate for c in self.consumers],
+            start_frame=start_frame,
+            end_frame=end_frame,
+            fast_scan=self.fast_scan,
+            upload=upload
+        )
+
+        if self.model is None:
+            for (frame_index, active), frame in self._sampled_frames(sampler):
+                for consumer in active:
+                    consumer.consume(frame_index, frame, [])
+                if progress:
+                    progress(sampler.progress)
+        else:
+            for ((frame_index, active), frame), result in iter_batched(
+                self.model, self._frames_with_payload(sampler), self.batch_size
+            ):
+                detections = self._parse_result(result)
+                for consumer in active:
+                    consumer.consume(frame_index, frame, detections)
+                if progress:
+                    progress(sampler.progress)
+
+        if progress:
+            progress(1.0)
+
+    def _sampled_frames(self, sampler: FrameSampler) -> Iterator[Tuple[Tuple[int, List[FrameConsumer]], np.ndarray]]:
+        """Yield ((frame_index, consumers), frame) for each decoded frame."""
+        for frame_index, frame in sampler:
+            if self.fast_scan:
+                active = self.consumers
+            else:
+                active = [c for c in self.consumers if c.wants(frame_index)]
+            yield (frame_index, active), frame
+
+    def _frames_with_payload(self, sampler: FrameSampler):
+        """Pair each sampled frame with itself so consumers receive the pixels."""
+        for payload, frame in self._sampled_frames(sampler):
+            yield (payload, frame), frame
+
+    @staticmethod
+    def _parse_result(result) -> List[Dict[str, Any]]:
+        """Flatten one frame's boxes to plain dicts (one device-to-host copy)."""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+
+        # Rows are x1, y1, x2, y2, [track id,] confidence, class
+        names = result.names
+        return [
+            {
+                'class_name': names[int(row[-1])],
+                'confidence': row[-2],
+                'bbox': row[:4]
+            }
+            for row in boxes.data.cpu().numpy().tolist()
+        ]
@@ -1,61 +1,110 @@
 """
 Video Processing Service with YOLOv8 for Animal Detection, Milking, and Lameness
 """
-import cv2
-import numpy as np
-from typing import Dict, List, Any, Optional
+import asyncio
+from typing import Callable, Dict, List, Any, Optional
 import logging
-from pathlib import Path
+
+from services.video_pipeline import (
+    VideoPipeline,
+    AnimalCountConsumer,
+    MilkingConsumer,
+    LamenessConsumer
+)
+from services.batch_inference import resolve_batch_size
+from services.segment_processing import SegmentedVideoProcessor
+from services.result_cache import ResultCache, weights_version
+from services.model_registry import model_registry
+from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Keys of the animal detection result (a subset of the process_video result)
+ANIMAL_RESULT_KEYS = (
+    'total_count', 'cattle_count', 'buffalo_count', 'other_animals', 'total_frames_processed'
+)
+
 class VideoProcessingService:
     def __init__(self):
-        self.yolo_model = None
-        self.load_models()
+        self.model_path = 'yolov8n.pt'  # Replace with your trained model
+        self.segment_processor = SegmentedVideoProcessor(self.model_path)
+        self.result_cache = ResultCache()
+        self._model_unavailable = False
     
-    def load_models(self):
-        """Load YOLOv8 and custom ML models"""
+    @property
+    def yolo_model(self):
+        """Shared YOLOv8 model from the registry, loaded on first use (None if unavailable)"""
+        if self._model_unavailable:
+            return None
         try:
-            from ultralytics import YOLO
-            
-            # Load YOLOv8 model (use custom trained model if available)
-            model_path = 'yolov8n.pt'  # Replace with your trained model
-            self.yolo_model = YOLO(model_path)
-            logger.info(f"YOLOv8 model loaded successfully")
-            
+            return model_registry.get(self.model_path)
         except Exception as e:
             logger.error(f"Error loading models: {e}")
             logger.warning("YOLOv8 not available - using fallback detection")
+            self._model_unavailable = True
+            return None
     
-    async def process_video(self, video_path: str) -> Dict[str, Any]:
+    async def process_video(
+        self,
+        video_path: str,
+        progress: Optional[Callable[[str, float], None]] = None,
+        content_hash: Optional[str] = None,
+        upload=None
+    ) -> Dict[str, Any]:
         """
         Complete video processing pipeline:
         1. Detect and classify animals
         2. Assess milking status
         3. Detect lameness
+        
+        The video is decoded once and YOLOv8 runs once per sampled frame;
+        all three analyses share the same per-frame detections.
+        
+        progress, if given, is called as progress("analysis", fraction).
+        With content_hash (SHA-256 of the upload), results are served from
+        and stored in the result cache. With upload (an UploadStream),
+        analysis starts while the video is still arriving.
         """
+        cache_key = self._cache_key(content_hash, 'process_video')
+        if cache_key:
+            cached = self.result_cache.lookup(cache_key)
+            if cached is not None:
+                logger.info(f"Result cache hit for video {content_hash[:12]}")
+                return cached
+        
         try:
-            animal_results = await self.detect_animals(video_path)
+            if self.yolo_model is None:
+                logger.warning("YOLOv8 not loaded, using fallback")
+                animal_results = self._fallback_animal_detection()
+                milking_results, lameness_results = await self._run(
+                    video_path, MilkingConsumer(), LamenessConsumer(),
+                    progress=progress, upload=upload
+                )
+            else:
+                animal_results, milking_results, lameness_results = await self._run(
+                    video_path, AnimalCountConsumer(), MilkingConsumer(), LamenessConsumer(),
+                    progress=progress, upload=upload
+                )
             
-            # Only proceed if cattle/buffalo detected
+            # Only report health results if cattle/buffalo detected
             if animal_results['cattle_count'] == 0 and animal_results['buffalo_count'] == 0:
-                return {
+                results = {
                     'success': False,
                     'message': self._generate_error_message(animal_results),
                     **animal_results
                 }
+            else:
+                results = {
+                    'success': True,
+                    'message': f"Detected {animal_results['cattle_count']} cattle, {animal_results['buffalo_count']} buffalo",
+                    **animal_results,
+                    **milking_results,
+                    **lameness_results
+                }
             
-            milking_results = await self.assess_milking(video_path)
-            lameness_results = await self.detect_lameness(video_path)
-            
-            return {
-                'success': True,
-                'message': f"Detected {animal_results['cattle_count']} cattle, {animal_results['buffalo_count']} buffalo",
-                **animal_results,
-                **milking_results,
-                **lameness_results
-            }
+            if cache_key:
+                self.result_cache.put(cache_key, results)
+            return results
             
         except Exception as e:
             logger.error(f"Error processing video: {e}")
@@ -64,80 +113,41 @@ class VideoProcessingService:
                 'message': f'Error processing video: {str(e)}'
             }
     
-    async def detect_animals(self, video_path: str) -> Dict[str, Any]:
+    async def detect_animals(
+        self,
+        video_path: str,
+        fast_scan: bool = False,
+        progress: Optional[Callable[[str, float], None]] = None,
+        content_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Detect and classify animals using YOLOv8
         Returns cattle count, buffalo count, and other animals
+        
+        With fast_scan, only one frame every FAST_SCAN_INTERVAL seconds is
+        decoded (seeking by timestamp) for a rough count of long recordings.
+        With content_hash, a cached detect_animals or process_video result
+        for the same upload is reused.
         """
         if self.yolo_model is None:
             logger.warning("YOLOv8 not loaded, using fallback")
             return self._fallback_animal_detection()
         
+        cache_keys = self._animal_cache_keys(content_hash, fast_scan)
+        if cache_keys:
+            cached = self.result_cache.lookup(*cache_keys)
+            if cached is not None:
+                logger.info(f"Result cache hit for video {content_hash[:12]}")
+                return {k: cached[k] for k in ANIMAL_RESULT_KEYS if k in cached}
+        
         try:
-            cap = cv2.VideoCapture(video_path)
+            results = (await self._run(
+                video_path, AnimalCountConsumer(), fast_scan=fast_scan, progress=progress
+            ))[0]
             
-            # Track detections across frames
-            cattle_detections = []
-            buffalo_detections = []
-            other_animals = set()
-            
-            frame_count = 0
-            sample_rate = 10  # Process every 10th frame for efficiency
-            
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                frame_count += 1
-                if frame_count % sample_rate != 0:
-                    continue
-                
-                # Run YOLOv8 detection
-                results = self.yolo_model(frame, verbose=False)
-                
-                for result in results:
-                    boxes = result.boxes
-                    for box in boxes:
-                        cls = int(box.cls[0])
-                        conf = float(box.conf[0])
-                        class_name = result.names[cls]
-                        
-                        if conf > 0.5:  # Confidence threshold
-                            bbox = box.xyxy[0].tolist()
-                            
-                            if class_name in ['cow', 'cattle']:
-                                cattle_detections.append({
-                                    'frame': frame_count,
-                                    'confidence': conf,
-                                    'bbox': bbox,
-                                    'center': self._get_bbox_center(bbox)
-                                })
-                            elif class_name in ['buffalo', 'ox']:
-                                buffalo_detections.append({
-                                    'frame': frame_count,
-                                    'confidence': conf,
-                                    'bbox': bbox,
-                                    'center': self._get_bbox_center(bbox)
-                                })
-                            elif class_name in ['dog', 'cat', 'horse', 'sheep', 'bird', 'person']:
-                                other_animals.add(class_name)
-            
-            cap.release()
-            
-            # Estimate unique animals using spatial clustering
-            cattle_count = self._estimate_unique_count(cattle_detections)
-            buffalo_count = self._estimate_unique_count(buffalo_detections)
-            
-            logger.info(f"Detection complete: {cattle_count} cattle, {buffalo_count} buffalo")
-            
-            return {
-                'total_count': cattle_count + buffalo_count + len(other_animals),
-                'cattle_count': cattle_count,
-                'buffalo_count': buffalo_count,
-                'other_animals': list(other_animals),
-                'total_frames_processed': frame_count // sample_rate
-            }
+            if cache_keys:
+                self.result_cache.put(cache_keys[0], results)
+            return results
             
         except Exception as e:
             logger.error(f"Error in animal detection: {e}")
@@ -149,66 +159,7 @@ class VideoProcessingService:
         Analyzes udder region and milking equipment presence
         """
         try:
-            cap = cv2.VideoCapture(video_path)
-            
-            milking_indicators = 0
-            total_frames = 0
-            sample_rate = 15
-            frame_count = 0
-            
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                frame_count += 1
-                if frame_count % sample_rate != 0:
-                    continue
-                
-                total_frames += 1
-                
-                if self.yolo_model:
-                    results = self.yolo_model(frame, verbose=False)
-                    
-                    for result in results:
-                        boxes = result.boxes
-                        for box in boxes:
-                            cls = int(box.cls[0])
-                            class_name = result.names[cls]
-                            
-                            if class_name in ['cow', 'cattle']:
-                                bbox = box.xyxy[0].tolist()
-                                
-                                # Analyze lower third of bounding box (udder region)
-                                height = bbox[3] - bbox[1]
-                                udder_region = frame[
-                                    int(bbox[1] + height * 0.66):int(bbox[3]),
-                                    int(bbox[0]):int(bbox[2])
-                                ]
-                                
-                                # Check for milking indicators (white/gray equipment)
-                                if self._detect_milking_equipment(udder_region):
-                                    milking_indicators += 1
-            
-            cap.release()
-            
-            # Determine milking status
-            if total_frames == 0:
-                is_milking = False
-                confidence = 0.0
-            else:
-                milking_ratio = milking_indicators / total_frames
-                is_milking = milking_ratio > 0.3
-                confidence = min(0.95, 0.6 + milking_ratio)
-            
-            logger.info(f"Milking assessment: {is_milking} (confidence: {confidence:.2f})")
-            
-            return {
-                'is_milking': is_milking,
-                'milking_confidence': confidence,
-                'frames_with_milking': milking_indicators,
-                'total_frames_analyzed': total_frames
-            }
+            return (await self._run(video_path, MilkingConsumer()))[0]
             
         except Exception as e:
             logger.error(f"Error assessing milking: {e}")
@@ -225,92 +176,7 @@ class VideoProcessingService:
         Uses pose estimation and movement irregularity analysis
         """
         try:
-            cap = cv2.VideoCapture(video_path)
-            
-            movement_data = []
-            prev_positions = {}
-            frame_count = 0
-            sample_rate = 5
-            
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                frame_count += 1
-                if frame_count % sample_rate != 0:
-                    continue
-                
-                if self.yolo_model:
-                    results = self.yolo_model(frame, verbose=False)
-                    
-                    current_positions = {}
-                    
-                    for result in results:
-                        boxes = result.boxes
-                        for idx, box in enumerate(boxes):
-                            cls = int(box.cls[0])
-                            class_name = result.names[cls]
-                            
-                            if class_name in ['cow', 'cattle']:
-                                bbox = box.xyxy[0].tolist()
-                                center = self._get_bbox_center(bbox)
-                                
-                                # Track individual cattle (simplified)
-                                animal_id = f"cattle_{idx}"
-                                current_positions[animal_id] = center
-                                
-                                # Calculate movement if previous position exists
-                                if animal_id in prev_positions:
-                                    prev_center = prev_positions[animal_id]
-                                    
-                                    # Calculate movement vector
-                                    dx = center[0] - prev_center[0]
-                                    dy = center[1] - prev_center[1]
-                                    
-                                    # Movement irregularity (sudden changes indicate lameness)
-                                    movement_magnitude = np.sqrt(dx**2 + dy**2)
-                                    movement_data.append(movement_magnitude)
-                    
-                    prev_positions = current_positions
-            
-            cap.release()
-            
-            # Analyze gait pattern
-            if movement_data:
-                avg_movement = np.mean(movement_data)
-                std_movement = np.std(movement_data)
-                
-                # High std deviation indicates irregular gait (lameness)
-                irregularity_score = std_movement / (avg_movement + 1e-6)
-                
-                # Map to lameness score (0-5)
-                lameness_score = min(5, int(irregularity_score * 3))
-                
-                if lameness_score == 0:
-                    severity = 'Normal'
-                elif lameness_score <= 2:
-                    severity = 'Mild Lameness'
-                elif lameness_score <= 4:
-                    severity = 'Moderate Lameness'
-                else:
-                    severity = 'Severe Lameness'
-                
-                confidence = min(0.95, 0.70 + (len(movement_data) / 200))
-            else:
-                lameness_score = 0
-                severity = 'Normal'
-                confidence = 0.5
-            
-            logger.info(f"Lameness detection: Score {lameness_score} - {severity}")
-            
-            return {
-                'lameness_score': lameness_score,
-                'lameness_severity': severity,
-                'lameness_confidence': confidence,
-                'is_lame': lameness_score > 1,
-                'movement_samples': len(movement_data)
-            }
+            return (await self._run(video_path, LamenessConsumer()))[0]
             
         except Exception as e:
             logger.error(f"Error detecting lameness: {e}")
@@ -322,58 +188,77 @@ class VideoProcessingService:
                 'movement_samples': 0
             }
     
-    def _get_bbox_center(self, bbox: List[float]) -> tuple:
-        """Calculate center point of bounding box"""
-        return ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
-    
-    def _estimate_unique_count(self, detections: List[Dict]) -> int:
+    async def _run(
+        self,
+        video_path: str,
+        *consumers,
+        fast_scan: bool = False,
+        progress: Optional[Callable[[str, float], None]] = None,
+        upload=None
+    ) -> List[Dict[str, Any]]:
         """
-        Estimate unique animal count using spatial clustering
-        Groups nearby detections across frames
+        Run consumers over the video, split into time segments across the
+        worker pool when VIDEO_SEGMENT_WORKERS allows it (not for fast scans
+        or videos still being uploaded).
         """
-        if not detections:
-            return 0
-        
-        # Group detections by frame
-        frames = {}
-        for det in detections:
-            frame = det['frame']
-            if frame not in frames:
-                frames[frame] = []
-            frames[frame].append(det['center'])
+        report = (lambda fraction: progress("analysis", fraction)) if progress else None
         
-        # Find maximum concurrent detections
-        max_concurrent = 0
-        for frame_detections in frames.values():
-            # Simple clustering: count non-overlapping detections
-            count = len(frame_detections)
-            max_concurrent = max(max_concurrent, count)
-        
-        return max(1, max_concurrent)
+        if (self.yolo_model is not None and not fast_scan and upload is None
+                and self.segment_processor.enabled):
+            return await self.segment_processor.run(video_path, list(consumers), progress=report)
+        return self._pipeline(*consumers, fast_scan=fast_scan).run(
+            video_path, progress=report, upload=upload
+        )
     
-    def _detect_milking_equipment(self, region: np.ndarray) -> bool:
-        """
-        Detect milking equipment in udder region
-        Looks for white/gray metallic surfaces
+    def _pipeline(self, *consumers, fast_scan: bool = False) -> VideoPipeline:
+        """Build a single-pass pipeline with its own predictor over the shared YOLOv8 weights"""
+        model = model_registry.instance(self.model_path) if self.yolo_model is not None else None
+        return VideoPipeline(
+            model,
+            list(consumers),
+            batch_size=resolve_batch_size(model),
+            fast_scan=fast_scan
+        )
+    
+    async def has_cached_result(self, analysis: str, content_hash: str, fast_scan: bool = False) -> bool:
         """
-        if region.size == 0:
-            return False
+        Whether `analysis` ("process_video" or "detect_animals") is cached for the upload
         
-        try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
-            
-            # Look for bright metallic surfaces (milking cups)
-            bright_pixels = np.sum(gray > 180)
-            total_pixels = gray.size
-            
-            bright_ratio = bright_pixels / total_pixels
-            
-            # If > 15% bright pixels, likely milking equipment
-            return bright_ratio > 0.15
-            
-        except:
-            return False
+        Runs on a thread: the cache key may load the model and hash its
+        weights on first use.
+        """
+        return await asyncio.to_thread(self._has_cached_result, analysis, content_hash, fast_scan)
+    
+    def _has_cached_result(self, analysis: str, content_hash: str, fast_scan: bool) -> bool:
+        if analysis == 'detect_animals':
+            keys = self._animal_cache_keys(content_hash, fast_scan)
+        else:
+            keys = [self._cache_key(content_hash, analysis)]
+        return any(key and self.result_cache.contains(key) for key in keys)
+    
+    def _cache_key(self, content_hash: Optional[str], analysis: str, **params) -> Optional[str]:
+        """Result cache key, or None when caching does not apply"""
+        if not content_hash or not settings.RESULT_CACHE_ENABLED or self.yolo_model is None:
+            return None
+        return ResultCache.make_key(content_hash, self.model_version, analysis, params)
+    
+    def _animal_cache_keys(self, content_hash: Optional[str], fast_scan: bool) -> List[str]:
+        """Own cache key first, then the process_video key whose result contains the counts"""
+        key = self._cache_key(content_hash, 'detect_animals', fast_scan=fast_scan)
+        if key is None:
+            return []
+        if fast_scan:
+            return [key]
+        return [key, self._cache_key(content_hash, 'process_video')]
+    
+    @property
+    def model_version(self) -> str:
+        """Content hash of the loaded weights (part of the result cache key)"""
+        return weights_version(getattr(self.yolo_model, 'ckpt_path', None) or self.model_path)
+    
+    def shutdown(self):
+        """Stop the segment worker pool"""
+        self.segment_processor.shutdown()
     
     def _fallback_animal_detection(self) -> Dict[str, Any]:
         """Fallback when YOLOv8 is not available"""
@@ -0,0 +1,11 @@
+-- ============================================
+-- CAMERA REGIONS OF INTEREST
+-- Polygons the backend runs detection in, per camera
+-- ============================================
+
+-- List of polygons, each a list of [x, y] points. Coordinates are
+-- fractions of the frame (0-1) or pixels; NULL means the whole frame.
+-- Example: [[[0.05, 0.3], [0.95, 0.3], [0.95, 1.0], [0.05, 1.0]]]
+ALTER TABLE cameras ADD COLUMN IF NOT EXISTS roi JSONB;
+
+COMMENT ON COLUMN cameras.roi IS 'Detection regions: list of polygons of [x, y] points (0-1 fractions of the frame or pixels)';
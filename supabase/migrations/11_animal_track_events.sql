@@ -0,0 +1,11 @@
+-- ============================================
+-- ANIMAL TRACKS FROM TRACK EVENTS
+-- The backend saves tracks as they end (TRACK_EVENTS_TO_DB)
+-- ============================================
+
+-- Track IDs restart per camera and when a camera's tracker is recreated,
+-- so a track is identified by camera, track ID and start time
+ALTER TABLE animal_tracks DROP CONSTRAINT IF EXISTS animal_tracks_track_id_key;
+ALTER TABLE animal_tracks DROP CONSTRAINT IF EXISTS animal_tracks_camera_track_key;
+ALTER TABLE animal_tracks
+    ADD CONSTRAINT animal_tracks_camera_track_key UNIQUE (camera_id, track_id, first_seen);